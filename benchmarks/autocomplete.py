@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+
+'''
+This module benchmarks autocomplete lookups against the articles in
+`runebot.db`, comparing the original list comprehension (a linear
+substring scan over every title) with the trigram posting-list index in
+`utils.search`.
+
+Usage (from the root of the project directory):
+    python benchmarks/autocomplete.py [--repeat N]
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import argparse
+import os
+import sqlite3
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import ARTICLE_PARTITIONS
+from utils.search import ArticleIndex
+
+QUERIES = [
+    'ab',
+    'whip',
+    'abyssal',
+    'dragon',
+    'rune pl',
+    'zulrah',
+    'of the',
+    'godsword',
+    'xyzzy',
+    'potion(4)'
+]
+
+
+def list_comprehension(titles: list, search_query: str) -> list:
+    '''
+    The original autocomplete lookup (a linear scan over every title.)
+
+    :param titles: (List[String]) -
+        Represents the article titles.
+    :param search_query: (String) -
+        Represents a search query.
+
+    :return: (List[String]) -
+        The first 25 matching titles.
+    '''
+
+    return [a for a in titles if search_query.lower() in a.lower()][:25]
+
+
+def main() -> None:
+    '''
+    Runs the benchmark and prints the per-query latency of each lookup.
+
+    :return: (None)
+    '''
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', default='runebot.db')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with sqlite3.connect(args.database) as connection:
+        articles = connection.execute(
+            'SELECT article_title, article_category FROM all_articles'
+        ).fetchall()
+
+    index = ArticleIndex(ARTICLE_PARTITIONS)
+    build_time = timeit.timeit(lambda: index.reload(articles), number=1)
+    titles = index.titles('wikipedia')
+
+    print(f'{len(articles)} articles, {len(titles)} in the `wikipedia` partition.')
+    print(f'Index built in {build_time * 1000:.1f} ms.\n')
+    print(f'{"query":<12}{"scan (us)":>12}{"trigram (us)":>15}{"speed-up":>10}')
+
+    for search_query in QUERIES:
+        assert list_comprehension(titles, search_query) == index.search(
+            'wikipedia', search_query
+        )
+        scan = timeit.timeit(
+            lambda: list_comprehension(titles, search_query),
+            number=args.repeat
+        ) / args.repeat
+        trigram = timeit.timeit(
+            lambda: index.search('wikipedia', search_query),
+            number=args.repeat
+        ) / args.repeat
+        print(
+            f'{search_query!r:<12}{scan * 1e6:>12.1f}{trigram * 1e6:>15.1f}'
+            f'{scan / trigram:>9.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
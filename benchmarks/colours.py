@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+
+'''
+This module benchmarks thumbnail colour extraction, comparing the
+original approach (ColorThief at `quality=1` over every pixel of the full
+image) with `utils.colours.quantise_colour` (quantising a downsampled
+thumbnail.)
+
+Usage (from the root of the project directory):
+    python benchmarks/colours.py [--size N] [--repeat N] [IMAGE ...]
+
+By default every PNG in `assets/` is used.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import argparse
+import glob
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from colorthief import ColorThief as ColourThief
+from PIL import Image
+
+from utils.colours import quantise_colour
+
+
+def full_quality(image_data: bytes) -> tuple:
+    '''
+    The original colour extraction (ColorThief over every pixel.)
+
+    :param image_data: (Bytes) -
+        Represents the encoded image.
+
+    :return: (Tuple[Integer, Integer, Integer]) -
+        The dominant RGB colour of the image.
+    '''
+
+    return ColourThief(io.BytesIO(image_data)).get_color(quality=1)
+
+
+def main() -> None:
+    '''
+    Runs the benchmark and prints the per-image latency of each approach.
+
+    :return: (None)
+    '''
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('images', nargs='*')
+    parser.add_argument('--size', type=int, default=128)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f'{"image":<24}{"pixels":>10}{"full (ms)":>12}{"thumb (ms)":>12}'
+        f'{"speed-up":>10}  colours'
+    )
+    for path in args.images or sorted(glob.glob('assets/*.png')):
+        with open(path, 'rb') as image_file:
+            image_data = image_file.read()
+        width, height = Image.open(io.BytesIO(image_data)).size
+
+        full = timeit.timeit(
+            lambda: full_quality(image_data),
+            number=args.repeat
+        ) / args.repeat
+        thumbnail = timeit.timeit(
+            lambda: quantise_colour(image_data, args.size),
+            number=args.repeat
+        ) / args.repeat
+        print(
+            f'{os.path.basename(path):<24}{width * height:>10}'
+            f'{full * 1000:>12.1f}{thumbnail * 1000:>12.1f}'
+            f'{full / thumbnail:>9.1f}x  {full_quality(image_data)} -> '
+            f'{quantise_colour(image_data, args.size)}'
+        )
+
+
+if __name__ == '__main__':
+    main()
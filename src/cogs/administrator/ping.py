@@ -8,7 +8,9 @@ The `ping` command displays two latency values: `WS` for WebSocket, and
 `REST` for REST API. The `WS` value measures the latency of the WebSocket
 connection between the bot and Discord's servers, while the `REST` value
 measures the latency of the REST API requests made by the bot to
-Discord's servers.
+Discord's servers. The page cache counters (hits, revalidations, misses
+and evictions) and the number of upstream requests collapsed into an
+identical in-flight request are shown alongside.
 
 Classes:
     - `Ping`:
@@ -125,6 +127,43 @@ class Ping(commands.Cog, name='ping'):
             )
         )
 
+        page_cache = self.bot.page_cache.stats()
+        embed.add_field(
+            name='Page cache',
+            value=(
+                f'```{page_cache["entries"]}/{self.bot.page_cache.max_entries}'
+                f' pages • {page_cache["hits"]} hits • '
+                f'{page_cache["revalidations"]} revalidated • '
+                f'{page_cache["misses"]} misses • '
+                f'{page_cache["evictions"]} evicted • '
+                f'{page_cache["loads"]} loaded from disk```'
+            ),
+            inline=False
+        )
+
+        graph_cache = self.bot.graph_cache.stats()
+        embed.add_field(
+            name='Graph cache',
+            value=(
+                f'```{graph_cache["entries"]}/{self.bot.graph_cache.max_entries}'
+                f' graphs • {graph_cache["hits"]} hits • '
+                f'{graph_cache["loads"]} loaded from disk • '
+                f'{graph_cache["misses"]} rendered```'
+            ),
+            inline=False
+        )
+
+        http_client = self.bot.http_client.stats()
+        embed.add_field(
+            name='Upstream requests',
+            value=(
+                f'```{http_client["requests"]} requests • '
+                f'{http_client["collapsed"]} collapsed • '
+                f'{http_client["in_flight"]} in flight```'
+            ),
+            inline=False
+        )
+
         embed.timestamp = inter.created_at
         embed.set_footer(text=f'Runebot {VER}')
         await inter.edit_original_message(embed=embed, view=view)
@@ -0,0 +1,306 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the functionality and logic for the `compare`
+command, allowing users to compare the stats of several players from the
+official API.
+
+Classes:
+    - `Compare`:
+            A class for handling the `compare` command.
+
+Key Functions:
+    - `compare_hiscores(...)`, `compare(...)`:
+            Functions for fetching and comparing the Hiscore data of several
+            players at once, as well as creating a slash command and
+            autocomplete query for the `compare` command.
+    - `summarise(...)`:
+            A function which summarises a player's Hiscore data.
+    - `setup(bot: Bot)`:
+            A function for defining the bot setup for the `compare` command.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import asyncio
+
+from disnake.ext import commands
+from disnake import ApplicationCommandInteraction, Option, OptionType
+
+from templates.bot import Bot
+from config import *
+from utils import *
+
+
+class Compare(commands.Cog, name='compare'):
+    '''
+    A class which represents the Compare cog.
+    '''
+
+    def __init__(self, bot: Bot) -> None:
+        '''
+        Initialises the Compare cog.
+
+        :param self: -
+            Represents this object.
+        :param bot: (Bot) -
+            An instance of the Bot class.
+
+        return: (None)
+        '''
+        self.bot = bot
+
+
+    async def summarise(self, hiscore_data: HiscoreRecord) -> Tuple[str, str, int]:
+        '''
+        Function which summarises a player's Hiscore data.
+
+        :param self: -
+            Represents this object.
+        :param hiscore_data: (HiscoreRecord) -
+            Represents the player's parsed Hiscore data.
+
+        :return: (Tuple[String, String, Integer]) -
+            The player's total level, total experience and combat level.
+        '''
+
+        # Hitpoints starts at level 10, even without any experience.
+        combat_levels = {
+            skill: max(hiscore_data.level_of(skill), 1)
+            for skill in COMBAT_SKILLS
+        }
+        combat_levels['Hitpoints'] = max(combat_levels['Hitpoints'], 10)
+        combat_level = await calculate_combat_level(combat_levels)
+
+        total_level = hiscore_data.level_of('Overall')
+        total_level = '--' if total_level == MISSING else f'{total_level:,}'
+        total_exp = hiscore_data.experience_of('Overall')
+        total_exp = '--' if total_exp == MISSING else f'{total_exp:,}'
+
+        return total_level, total_exp, combat_level
+
+
+    async def compare_hiscores(
+        self,
+        inter: ApplicationCommandInteraction,
+        usernames: str,
+        account_type: str = None
+    ) -> disnake.Embed:
+        '''
+        Function which takes a comma-separated list of usernames, fetches
+        every player's Hiscores concurrently and returns a comparison.
+
+        :param self: -
+            Represents this object.
+        :param inter: (ApplicationCommandInteraction) -
+            Represents an interaction with an application command.
+        :param usernames: (String) -
+            Represents the players' usernames, separated by commas.
+        :param account_type: (String[Optional]) -
+            Represents an account type (Ex: Ironman, 1 Defence etc.) If
+            Auto-detect, each player is compared on their own game mode.
+
+        :return: (disnake.Embed) -
+            An embed containing the comparison.
+        '''
+
+        usernames = list(dict.fromkeys(
+            username.strip() for username in usernames.split(',')
+            if username.strip()
+        ))
+        if len(usernames) < 2 or len(usernames) > MAX_COMPARE:
+            raise exceptions.UsernameInvalid(
+                f'Please provide between 2 and {MAX_COMPARE} usernames, '
+                'separated by commas.\n\n'
+                '**Usage**: `/compare <USERNAME>, <USERNAME>, ... '
+                '[ACCOUNT_TYPE (optional)]`'
+            )
+        for username in usernames:
+            if len(username) > MAX_CHARS or any(char in username for char in BLACKLIST_CHARS):
+                raise exceptions.UsernameInvalid
+
+        if account_type != AUTO_DETECT and account_type not in HISCORE_API_URLS:
+            account_type = 'Normal'
+
+        # Auto-detect probes every player's game mode at once, otherwise
+        # every player is looked up on the same Hiscores.
+        if account_type == AUTO_DETECT:
+            probed = await asyncio.gather(*[
+                probe_hiscores(
+                    self,
+                    [(mode, HISCORE_API_URLS.get(mode)) for mode in AUTO_DETECT_ORDER],
+                    HEADERS,
+                    HISCORES_ORDER,
+                    username
+                )
+                for username in usernames
+            ])
+            player_types = {
+                username: found_type
+                for username, (found_type, _) in zip(usernames, probed)
+            }
+            hiscore_data = {
+                username: data
+                for username, (_, data) in zip(usernames, probed)
+            }
+        else:
+            player_types = {}
+            hiscore_data = await parse_hiscores(
+                self,
+                HISCORE_API_URLS.get(account_type),
+                HEADERS,
+                HISCORES_ORDER,
+                usernames
+            )
+        players = {
+            username: data for username, data in hiscore_data.items()
+            if data is not None
+        }
+        missing = [username for username in usernames if username not in players]
+        if len(players) < 2:
+            raise exceptions.NoHiscoreData(
+                'At least two of the players you have searched for need to '
+                'appear on the **Hiscores** to be compared (or the **API** is '
+                'currently unavailable.) Please try other usernames or try '
+                'again later.\n\n'
+                '**Usage**: `/compare <USERNAME>, <USERNAME>, ... '
+                '[ACCOUNT_TYPE (optional)]`'
+            )
+
+        emote = ACCOUNT_EMOTES.get(account_type)
+        compared = f'{len(players)} {emote} players' if emote else f'{len(players)} players'
+        description = f'Comparing {compared}.\n\u200b\n'
+        if missing:
+            description = (
+                f'Comparing {compared} '
+                f'(**{", ".join(missing)}** not found.)\n\u200b\n'
+            )
+        embed = EmbedFactory().create(
+            title='Hiscores Comparison',
+            description=description
+        )
+
+        summary = []
+        for username, data in players.items():
+            total_level, total_exp, combat_level = await self.summarise(data)
+            player_emote = ACCOUNT_EMOTES.get(player_types.get(username), '')
+            player = f'{player_emote} **{username}**' if player_emote else f'**{username}**'
+            summary.append(
+                f'{player}: {total_level} total • {total_exp} XP • '
+                f'{combat_level} combat'
+            )
+        embed.add_field(
+            name=f'{SKILL_EMOTES.get("overall")} Overall',
+            value='\n'.join(summary) + '\n\u200b\n',
+            inline=False
+        )
+
+        # The highest level (then experience) in each skill, and who has it.
+        for column_data in STAT_COLUMNS:
+            column_text = []
+            for skill, data in column_data:
+                ranked = []
+                for username, stats in players.items():
+                    level = stats.level_of(data)
+                    if level != MISSING:
+                        ranked.append((level, stats.experience_of(data), username))
+                if not ranked:
+                    column_text.append(f'{SKILL_EMOTES.get(skill)} --')
+                    continue
+                level, _, username = max(ranked)
+                column_text.append(
+                    f'{SKILL_EMOTES.get(skill)} {level} {username}'
+                )
+            embed.add_field(
+                name='\u200a',
+                value='\n'.join(column_text) + '\n\u200b\n',
+                inline=True
+            )
+
+        embed.set_footer(
+            text=(
+                'Experience data from the official Hiscores API.\n'
+                f'Runebot {VER}'
+            )
+        )
+        embed.timestamp = inter.created_at
+        return embed
+
+
+    @commands.slash_command(
+        name='compare',
+        description='Compare the stats of several players from the official Hiscores.',
+        options=[
+            Option(
+                name='usernames',
+                description=f'Enter 2 to {MAX_COMPARE} usernames, separated by commas.',
+                type=OptionType.string,
+                required=True
+            ),
+            Option(
+                name='account_type',
+                description='Select an Account Type (optional.)',
+                type=OptionType.string,
+                required=False
+            )
+        ]
+    )
+    async def compare(
+        self,
+        inter: ApplicationCommandInteraction,
+        usernames: str,
+        account_type: str = None
+    ) -> None:
+        '''
+        Creates a slash command for the `compare_hiscores` function.
+
+        :param self: -
+            Represents this object.
+        :param inter: (ApplicationCommandInteraction) -
+            Represents an interaction with an application command.
+        :param usernames: (String) -
+            Represents the players' usernames, separated by commas.
+        :param account_type: (String[Optional]) -
+            Represents an account type (Ex: Ironman, 1 Defence etc.)
+
+        :return: (None)
+        '''
+
+        await inter.response.defer()
+        embed = await self.compare_hiscores(inter, usernames, account_type)
+        await inter.followup.send(embed=embed)
+
+
+    @compare.autocomplete('account_type')
+    async def account_type_autocomplete(self, account_type: str) -> List[str]:
+        '''
+        Creates a selection of autocomplete suggestions once the user begins
+        typing.
+
+        :param self: -
+            Represents this object.
+        :param account_type: (String) -
+            Represents an account type (Ex: Ironman, 1 Defence etc.)
+
+        :return: (List[String]) -
+            A list of autocomplete suggestions.
+        '''
+
+        _ = account_type
+        return ACCOUNT_TYPES + [AUTO_DETECT]
+
+
+def setup(bot: Bot) -> None:
+    '''
+    Defines the bot setup function for the `compare` command.
+
+    :param bot: (Bot) -
+        An instance of the Bot class.
+
+    :return: (None)
+    '''
+    bot.add_cog(Compare(bot))
@@ -0,0 +1,271 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the functionality and logic for the `gains`
+command, allowing users to see the experience a player has gained over a
+period, from the XP tracker's snapshots (without a live Hiscores lookup.)
+
+Classes:
+    - `Gains`:
+            A class for handling the `gains` command.
+
+Key Functions:
+    - `search_gains(...)`, `gains(...)`:
+            Functions for rebuilding a player's experience gains from
+            local snapshots, as well as creating a slash command and
+            autocomplete queries for the `gains` command.
+    - `setup(bot: Bot)`:
+            A function for defining the bot setup for the `gains` command.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import time
+
+from disnake.ext import commands
+from disnake import ApplicationCommandInteraction, Option, OptionType
+
+from templates.bot import Bot
+from config import *
+from utils import *
+
+
+class Gains(commands.Cog, name='gains'):
+    '''
+    A class which represents the Gains cog.
+    '''
+
+    def __init__(self, bot: Bot) -> None:
+        '''
+        Initialises the Gains cog.
+
+        :param self: -
+            Represents this object.
+        :param bot: (Bot) -
+            An instance of the Bot class.
+
+        return: (None)
+        '''
+        self.bot = bot
+
+
+    async def search_gains(
+        self,
+        inter: ApplicationCommandInteraction,
+        username: str = None,
+        period: str = None,
+        account_type: str = None
+    ) -> disnake.Embed:
+        '''
+        Function which takes a username and returns the experience the
+        player has gained over a period, from the XP tracker's snapshots.
+
+        :param self: -
+            Represents this object.
+        :param inter: (ApplicationCommandInteraction) -
+            Represents an interaction with an application command.
+        :param username: (String[Optional]) -
+            Represents a player's username.
+        :param period: (String[Optional]) -
+            Represents the period (Ex: Day, Week etc.)
+        :param account_type: (String[Optional]) -
+            Represents an account type (Ex: Ironman, 1 Defence etc.) If
+            Auto-detect, the first game mode the player is tracked on.
+
+        :return: (disnake.Embed) -
+            An embed containing the player's gains.
+        '''
+
+        if not username: # If a username wasn't provided...
+            # Try to get a username from Runebot database.
+            username, default_account_type = await get_username(self, inter.author.id)
+            if username == None:
+                raise exceptions.UsernameNonexistent
+            if account_type == None:
+                account_type = default_account_type
+
+        # If the provided username is a Discord user...
+        # Try to get a username from Runebot database.
+        # (Mentions are <@id>, or <@!id> for a nickname.)
+        if username.startswith('<@') and username.endswith('>'):
+            try:
+                user_id = int(username.strip('<@!>'))
+            except ValueError:
+                raise exceptions.UsernameInvalid
+            username, account_type = await get_username(self, user_id)
+            if not username:
+                raise exceptions.UsernameNonexistent
+
+        if len(username) > MAX_CHARS or any(char in username for char in BLACKLIST_CHARS):
+            raise exceptions.UsernameInvalid
+
+        if account_type != AUTO_DETECT and account_type not in HISCORE_API_URLS:
+            account_type = 'Normal'
+        if period not in GAINS_PERIODS:
+            period = 'Week'
+
+        # Auto-detect uses the first game mode (most specific first) the
+        # player has snapshots on.
+        since = int(time.time()) - GAINS_PERIODS.get(period)
+        tracked_types = AUTO_DETECT_ORDER if account_type == AUTO_DETECT else [account_type]
+        for tracked_type in tracked_types:
+            gains = await get_gains(self, username, tracked_type, since)
+            if gains is not None:
+                account_type = tracked_type
+                break
+        else:
+            raise exceptions.NoTrackingData
+        start_at, start, end_at, end = gains
+
+        # Skills which weren't ranked at either end of the period have no
+        # known gain.
+        positions = hiscore_positions(tuple(SKILL_ORDER))
+        gained = {
+            skill: MISSING if MISSING in (start[position], end[position])
+            else end[position] - start[position]
+            for skill, position in positions.items()
+        }
+
+        emote = ACCOUNT_EMOTES.get(account_type, '')
+        description = (
+            f'Experience gained by {emote} **{username}** in the last '
+            f'{period.lower()}.\n'
+        )
+        if start_at > since:
+            description += f'(Tracked since <t:{start_at}:R>.)\n'
+        description += f'Last snapshot <t:{end_at}:R>.\n\u200b\n'
+        embed = EmbedFactory().create(
+            title='XP Gains',
+            description=description
+        )
+
+        for column_data in STAT_COLUMNS:
+            column_text = "\n".join([
+                f"{SKILL_EMOTES.get(skill)} "
+                f"{'--' if gained.get(data) == MISSING else f'{gained.get(data):,}'}"
+                for skill, data in column_data
+            ]) + '\n\u200b\n'
+            embed.add_field(name="\u200a", value=column_text, inline=True)
+
+        overall = gained.get('Overall')
+        embed.add_field(
+            name=f'{SKILL_EMOTES.get("overall")} Overall',
+            value=f'''
+                **XP**: {'--' if overall == MISSING else f'{overall:,}'}\n\u200b\n
+            '''
+        )
+
+        embed.set_footer(
+            text=(
+                'Experience data from Runebot\'s Hiscores snapshots.\n'
+                f'Runebot {VER}'
+            )
+        )
+        embed.timestamp = inter.created_at
+        return embed
+
+
+    @commands.slash_command(
+        name='gains',
+        description='See the experience a player has gained recently.',
+        options=[
+            Option(
+                name='username',
+                description='Enter a username (optional if you have set one.)',
+                type=OptionType.string,
+                required=False
+            ),
+            Option(
+                name='period',
+                description='Select a period (optional, defaults to Week.)',
+                type=OptionType.string,
+                required=False
+            ),
+            Option(
+                name='account_type',
+                description='Select an Account Type (optional.)',
+                type=OptionType.string,
+                required=False
+            )
+        ]
+    )
+    async def gains(
+        self,
+        inter: ApplicationCommandInteraction,
+        username: str = None,
+        period: str = None,
+        account_type: str = None
+    ) -> None:
+        '''
+        Creates a slash command for the `search_gains` function.
+
+        :param self: -
+            Represents this object.
+        :param inter: (ApplicationCommandInteraction) -
+            Represents an interaction with an application command.
+        :param username: (String[Optional]) -
+            Represents a player's username.
+        :param period: (String[Optional]) -
+            Represents the period (Ex: Day, Week etc.)
+        :param account_type: (String[Optional]) -
+            Represents an account type (Ex: Ironman, 1 Defence etc.)
+
+        :return: (None)
+        '''
+
+        embed = await self.search_gains(inter, username, period, account_type)
+        await inter.response.send_message(embed=embed)
+
+
+    @gains.autocomplete('period')
+    async def period_autocomplete(self, period: str) -> List[str]:
+        '''
+        Creates a selection of autocomplete suggestions once the user begins
+        typing.
+
+        :param self: -
+            Represents this object.
+        :param period: (String) -
+            Represents the period (Ex: Day, Week etc.)
+
+        :return: (List[String]) -
+            A list of autocomplete suggestions.
+        '''
+
+        _ = period
+        return list(GAINS_PERIODS)
+
+
+    @gains.autocomplete('account_type')
+    async def account_type_autocomplete(self, account_type: str) -> List[str]:
+        '''
+        Creates a selection of autocomplete suggestions once the user begins
+        typing.
+
+        :param self: -
+            Represents this object.
+        :param account_type: (String) -
+            Represents an account type (Ex: Ironman, 1 Defence etc.)
+
+        :return: (List[String]) -
+            A list of autocomplete suggestions.
+        '''
+
+        _ = account_type
+        return ACCOUNT_TYPES + [AUTO_DETECT]
+
+
+def setup(bot: Bot) -> None:
+    '''
+    Defines the bot setup function for the `gains` command.
+
+    :param bot: (Bot) -
+        An instance of the Bot class.
+
+    :return: (None)
+    '''
+    bot.add_cog(Gains(bot))
@@ -80,9 +80,7 @@ class Setrsn(commands.Cog, name='setrsn'):
         if not account_type:
             account_type = 'Normal'
 
-        if await get_username(self, inter.author.id):
-            await remove_username(self, inter.author.id)
-        await add_username(self, inter.author.id, username, account_type)
+        await upsert_username(self, inter.author.id, username, account_type)
 
         embed, view = EmbedFactory().create(
             title=f'Username has been set.',
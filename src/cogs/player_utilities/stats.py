@@ -91,49 +91,42 @@ class Stats(commands.Cog, name='stats'):
 
         # If the provided username is a Discord user...
         # Try to get a username from Runebot database.
+        # (Mentions are <@id>, or <@!id> for a nickname.)
         if username.startswith('<@') and username.endswith('>'):
-            username, account_type = await get_username(
-                self, username.replace('<@', '').replace('>', '')
-            )
+            try:
+                user_id = int(username.strip('<@!>'))
+            except ValueError:
+                raise exceptions.UsernameInvalid
+            username, account_type = await get_username(self, user_id)
             if not username:
                 raise exceptions.UsernameNonexistent
 
         if len(username) > MAX_CHARS or any(char in username for char in BLACKLIST_CHARS):
             raise exceptions.UsernameInvalid
 
-        if not account_type:
+        if account_type != AUTO_DETECT and account_type not in HISCORE_API_URLS:
             account_type = 'Normal'
 
-        if account_type == 'Normal':
-            try:
-                hiscore_data = parse_hiscores(
-                    HISCORE_API_URLS.get(account_type),
-                    HEADERS,
-                    HISCORES_ORDER,
-                    [username]
-                )
-            except IndexError as exc:
-                raise exceptions.NoHiscoreData from exc
-
+        # Auto-detect probes every Hiscores at once, and other game modes
+        # probe the Normal Hiscores alongside their own, so a player who
+        # isn't on the game mode's Hiscores is told apart in one round trip.
+        if account_type == AUTO_DETECT:
+            probed_types = AUTO_DETECT_ORDER
         else:
-            try:
-                hiscore_data = parse_hiscores(
-                    HISCORE_API_URLS.get(account_type),
-                    HEADERS,
-                    HISCORES_ORDER,
-                    [username]
-                )
-            except IndexError as exc1:
-                try:
-                    hiscore_data = parse_hiscores(
-                        NORMAL_API,
-                        HEADERS,
-                        HISCORES_ORDER,
-                        [username]
-                    )
-                except IndexError as exc2:
-                    raise exceptions.NoHiscoreData from exc2
-                raise exceptions.NoGameModeData from exc1
+            probed_types = list(dict.fromkeys([account_type, 'Normal']))
+
+        found_type, hiscore_data = await probe_hiscores(
+            self,
+            [(probed, HISCORE_API_URLS.get(probed)) for probed in probed_types],
+            HEADERS,
+            HISCORES_ORDER,
+            username
+        )
+        if hiscore_data is None:
+            raise exceptions.NoHiscoreData
+        if account_type != AUTO_DETECT and found_type != account_type:
+            raise exceptions.NoGameModeData
+        account_type = found_type
 
         emote = ACCOUNT_EMOTES.get(account_type, '')
         embed = EmbedFactory().create(
@@ -147,21 +140,15 @@ class Stats(commands.Cog, name='stats'):
 
             # Gets all combat levels of the player with the provided
             # Hiscore data.
-            combat_levels = {}
-            for skill in COMBAT_SKILLS:
-                combat_levels.update(
-                    {skill: int(hiscore_data.get(skill).split(',')[1])}
-                )
+            combat_levels = {
+                skill: hiscore_data.level_of(skill) for skill in COMBAT_SKILLS
+            }
 
             # Corrects Hitpoints level if the player has no experience.
             # (Replace Level 1 with Level 10.)
-            hp_rank = hiscore_data.get('Hitpoints').split(',')[0]
-            hp_level = hiscore_data.get('Hitpoints').split(',')[1]
-            hp_experience = hiscore_data.get('Hitpoints').split(',')[2]
-            if int(hp_level) < 10:
-                hiscore_data.update(
-                    {'Hitpoints':f'{hp_rank},{int(10)},{hp_experience}'}
-                )
+            # (The Hiscores record is cached and shared, so the corrected
+            # level is only used for display.)
+            if combat_levels['Hitpoints'] < 10:
                 combat_levels.update({'Hitpoints': int(10)})
 
             # Calculates combat level and experience of the player.
@@ -169,20 +156,21 @@ class Stats(commands.Cog, name='stats'):
             combat_experience = await calculate_combat_exp(COMBAT_SKILLS, hiscore_data)
 
             # Gets the overall rank of the player.
-            overall_rank = f'{int(hiscore_data.get("Overall").split(",")[0]):,}'
+            overall_rank = f'{hiscore_data.rank_of("Overall"):,}'
             if overall_rank == '-1':
                 overall_rank = '--'
 
             # Gets the overall experience of the player.
-            overall_exp = f'{int(hiscore_data.get("Overall").split(",")[2]):,}'
+            overall_exp = f'{hiscore_data.experience_of("Overall"):,}'
             if overall_exp == '0':
                 overall_exp = '--'
 
             for column_data in STAT_COLUMNS:
                 column_text = "\n".join([
                     f"{SKILL_EMOTES.get(skill)} "
-                    f"{hiscore_data.get(data).split(',')[1].replace('-1', '--')}"
+                    f"{'--' if level == MISSING else level}"
                     for skill, data in column_data
+                    for level in [combat_levels.get(data, hiscore_data.level_of(data))]
                 ]) + '\n\u200b\n'
                 embed.add_field(name="\u200a", value=column_text, inline=True)
 
@@ -227,8 +215,8 @@ class Stats(commands.Cog, name='stats'):
 
             for column_data in BOSS_COLUMNS:
                 column_text = "\n".join([
-                    f"{BOSS_EMOTES.get(boss)} {int(hiscore_data.get(data).split(',')[1]):,}"
-                    if hiscore_data.get(data).split(',')[1] != '-1' 
+                    f"{BOSS_EMOTES.get(boss)} {hiscore_data.level_of(data):,}"
+                    if hiscore_data.level_of(data) != MISSING
                     else f"{BOSS_EMOTES.get(boss)} -"
                     for boss, data in column_data
                 ]) + '\n\u200b\n'
@@ -259,8 +247,8 @@ class Stats(commands.Cog, name='stats'):
 
             for column_data in BOUNTY_COLUMNS:
                 column_text = "\n".join([
-                    f"{BOUNTY_EMOTES.get(bounty)} {int(hiscore_data.get(data).split(',')[1]):,}"
-                    if hiscore_data.get(data).split(',')[1] != '-1' 
+                    f"{BOUNTY_EMOTES.get(bounty)} {hiscore_data.level_of(data):,}"
+                    if hiscore_data.level_of(data) != MISSING
                     else f"{BOUNTY_EMOTES.get(bounty)} -"
                     for bounty, data in column_data
                 ]) + '\n\u200b\n'
@@ -291,8 +279,8 @@ class Stats(commands.Cog, name='stats'):
 
             for column_data in CLUE_COLUMNS:
                 column_text = "\n".join([
-                    f"{CLUE_EMOTES.get(clue)} {int(hiscore_data.get(data).split(',')[1]):,}"
-                    if hiscore_data.get(data).split(',')[1] != '-1' 
+                    f"{CLUE_EMOTES.get(clue)} {hiscore_data.level_of(data):,}"
+                    if hiscore_data.level_of(data) != MISSING
                     else f"{CLUE_EMOTES.get(clue)} -"
                     for clue, data in column_data
                 ]) + '\n\u200b\n'
@@ -320,11 +308,11 @@ class Stats(commands.Cog, name='stats'):
                 view.add_item(component)
 
             cluescroll_rank, cluescroll_total = [
-                '-' if (value := hiscore_data.get(
-                    'Clue Scrolls (All)'
-                ).split(',')[index].replace('-1', '-')) == '-'
-                else f'{int(value):,}'
-                for index in range(2)
+                '-' if value == MISSING else f'{value:,}'
+                for value in (
+                    hiscore_data.rank_of('Clue Scrolls (All)'),
+                    hiscore_data.level_of('Clue Scrolls (All)')
+                )
             ]
 
             embed.add_field(
@@ -446,7 +434,7 @@ class Stats(commands.Cog, name='stats'):
         '''
 
         _ = account_type
-        return ACCOUNT_TYPES
+        return ACCOUNT_TYPES + [AUTO_DETECT]
 
 
 def setup(bot: Bot) -> None:
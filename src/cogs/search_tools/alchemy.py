@@ -80,31 +80,44 @@ class Alchemy(commands.Cog, name='alchemy'):
         '''
 
         # Checks if the query is equal to the "I'm feeling lucky" special
-        # query and returns a random article if True.
+        # query and picks a random item if True.
         if search_query == 'I\'m feeling lucky\u200a':
-            tradeable_items = await get_suggestions(self, ['Tradeable items'])
-            page_content = parse_page(
-                BASE_URL,
-                slugify(
-                    random.choice([i for i in tradeable_items if not any(w in i for w in BLACKLIST_ITEMS)])
-                ),
+            search_query = random.choice(self.bot.article_index.titles('items'))
+        else:
+            # Resolves misspelled queries to the closest item title.
+            search_query = self.bot.article_index.resolve(
+                'items', search_query
+            )
+
+        # Reads the item from the local `items` table, falling back to the
+        # wiki page for anything the item mapping doesn't cover.
+        item = await get_item(self, search_query)
+        if item is not None:
+            title = item['name']
+            info = item_infobox(item)
+            thumbnail_url = item['icon_url']
+            exchange_price = await get_exchange_price(
+                self,
+                info['Item ID'],
+                PRICEAPI_URL,
                 HEADERS
             )
+            if exchange_price is not None:
+                info['Exchange'] = exchange_price
         else:
-            page_content = parse_page(
-            BASE_URL,
-            search_query,
-            HEADERS
-        )
-
-        title = parse_title(page_content)
-        info = parse_infobox(page_content)
-        thumbnail_url = parse_thumbnail(page_content)
+            page_content = await parse_page(
+                self,
+                BASE_URL,
+                search_query,
+                HEADERS
+            )
+            title = parse_title(page_content)
+            info = parse_infobox(page_content)
+            thumbnail_url = parse_thumbnail(page_content)
         colour = disnake.Colour.from_rgb(
             *await extract_colour(
                 self,
                 inter.guild_id,
-                inter.guild.owner_id,
                 thumbnail_url,
                 HEADERS
             )
@@ -137,18 +150,22 @@ class Alchemy(commands.Cog, name='alchemy'):
         try:
 
             # Gets the latest `high_price` of the item.
-            price_data = parse_price_data(
-                f'{WIKIAPI_URL}{info["Item ID"]}',
+            price_data = await get_latest_price(
+                self,
+                info['Item ID'],
+                WIKIAPI_URL,
                 HEADERS
             )
-            high_price = price_data['data'][info['Item ID']]['high']
+            high_price = price_data['high']
 
             # Gets the latest price of Nature Runes (ID: 561)
-            nature_data = parse_price_data(
-                f'{WIKIAPI_URL}561',
+            nature_data = await get_latest_price(
+                self,
+                '561',
+                WIKIAPI_URL,
                 HEADERS
             )
-            nature_price = nature_data['data']['561']['high']
+            nature_price = nature_data['high']
 
             # Calculates the profit margin.
             # Uses the latest `high_price` data and `nature_price`.
@@ -227,10 +244,8 @@ class Alchemy(commands.Cog, name='alchemy'):
             or "I'm feeling lucky".
         '''
 
-        tradeable_items = await get_suggestions(self, ['Tradeable items'])
-        autocomplete_suggestions = [i for i in tradeable_items if not any(w in i for w in BLACKLIST_ITEMS)]
         if len(search_query) > 0:
-            return [f'{a}\u200a' for a in autocomplete_suggestions if search_query.lower() in a.lower()][:25]
+            return [f'{a}\u200a' for a in self.bot.article_index.search('items', search_query)]
         return ['I\'m feeling lucky\u200a']
 
 
@@ -83,15 +83,21 @@ class Bestiary(commands.Cog, name='bestiary'):
         # Checks if the query is equal to the "I'm feeling lucky" special
         # query and returns a random article if True.
         if search_query == 'I\'m feeling lucky\u200a':
-            page_content = parse_page(
+            page_content = await parse_page(
+                self,
                 BASE_URL,
                 slugify(
-                    random.choice(await get_suggestions(self, ['Monsters']))
+                    random.choice(self.bot.article_index.titles('monsters'))
                 ),
                 HEADERS
             )
         else:
-            page_content = parse_page(
+            # Resolves misspelled queries to the closest monster title.
+            search_query = self.bot.article_index.resolve(
+                'monsters', search_query
+            )
+            page_content = await parse_page(
+            self,
             BASE_URL,
             search_query,
             HEADERS
@@ -117,7 +123,7 @@ class Bestiary(commands.Cog, name='bestiary'):
         try:
             colour = disnake.Colour.from_rgb(
                 *await extract_colour(
-                    self, inter.guild_id, inter.guild.owner_id,
+                    self, inter.guild_id,
                     f'https://oldschool.runescape.wiki{info["Image"]}',
                     HEADERS
                 )
@@ -220,9 +226,8 @@ class Bestiary(commands.Cog, name='bestiary'):
             or "I'm feeling lucky".
         '''
 
-        autocomplete_suggestions = await get_suggestions(self, ['Monsters'])
         if len(search_query) > 0:
-            return [f'{a}\u200a' for a in autocomplete_suggestions if search_query.lower() in a.lower()][:25]
+            return [f'{a}\u200a' for a in self.bot.article_index.search('monsters', search_query)]
         return ['I\'m feeling lucky\u200a']
 
 
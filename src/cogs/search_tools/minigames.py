@@ -83,23 +83,17 @@ class Minigames(commands.Cog, name='minigames'):
         # Checks if the query is equal to the "I'm feeling lucky" special
         # query and returns a random article if True.
         if search_query == 'I\'m feeling lucky\u200a':
-            page_content = parse_page(
+            page_content = await parse_page(
+                self,
                 BASE_URL,
                 slugify(
-                    random.choice(
-                        [s for s in await get_suggestions(
-                            self, ['Minigames']
-                        ) if s not in (
-                            'Minigames',
-                            'Barrows',
-                            'Creature Creation'
-                        )]
-                    )
+                    random.choice(self.bot.article_index.titles('minigames'))
                 ),
                 HEADERS
             )
         else:
-            page_content = parse_page(
+            page_content = await parse_page(
+            self,
             BASE_URL,
             search_query,
             HEADERS
@@ -108,7 +102,7 @@ class Minigames(commands.Cog, name='minigames'):
         title = parse_title(page_content)
         description = parse_description(page_content).pop()
         info = parse_infobox(page_content)
-        minigames = parse_page(BASE_URL, 'Minigames', HEADERS)
+        minigames = await parse_page(self, BASE_URL, 'Minigames', HEADERS)
         thumbnail_url = parse_minigame_icon(minigames, slugify(title))
 
         if not thumbnail_url:
@@ -119,7 +113,6 @@ class Minigames(commands.Cog, name='minigames'):
                 *await extract_colour(
                     self,
                     inter.guild_id,
-                    inter.guild.owner_id,
                     thumbnail_url,
                     HEADERS
                 )
@@ -209,15 +202,8 @@ class Minigames(commands.Cog, name='minigames'):
             or "I'm feeling lucky".
         '''
 
-        autocomplete_suggestions = [s for s in await get_suggestions(
-            self, ['Minigames']) if s not in (
-            'Minigames',
-            'Barrows',
-            'Creature Creation'
-        )]
-
         if len(search_query) > 0:
-            return [f'{a}\u200a' for a in autocomplete_suggestions if search_query.lower() in a.lower()][:25]
+            return [f'{a}\u200a' for a in self.bot.article_index.search('minigames', search_query)]
         return ['I\'m feeling lucky\u200a']
 
 
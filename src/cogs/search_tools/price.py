@@ -29,6 +29,7 @@ docstrings.
 '''
 
 import datetime
+import io
 import random
 
 from disnake.ext import commands
@@ -80,51 +81,63 @@ class Price(commands.Cog, name='price'):
         '''
 
         # Checks if the query is equal to the "I'm feeling lucky" special
-        # query and returns a random article if True.
+        # query and picks a random item if True.
         if search_query == 'I\'m feeling lucky\u200a':
-            tradeable_items = await get_suggestions(self, ['Tradeable items'])
-            page_content = parse_page(
+            search_query = random.choice(self.bot.article_index.titles('items'))
+        else:
+            # Resolves misspelled queries to the closest item title.
+            search_query = self.bot.article_index.resolve(
+                'items', search_query
+            )
+
+        # Reads the item from the local `items` table, falling back to the
+        # wiki page for anything the item mapping doesn't cover.
+        item = await get_item(self, search_query)
+        if item is not None:
+            info = item_infobox(item)
+            title = item['name']
+            required = ['Value', 'Buy limit']
+        else:
+            page_content = await parse_page(
+                self,
                 BASE_URL,
-                slugify(
-                    random.choice([i for i in tradeable_items if not any(w in i for w in BLACKLIST_ITEMS)])
-                ),
+                search_query,
                 HEADERS
             )
-        else:
-            page_content = parse_page(
-            BASE_URL,
-            search_query,
-            HEADERS
-        )
-
-        info = parse_infobox(page_content)
-        title = parse_title(page_content)
+            info = parse_infobox(page_content)
+            title = parse_title(page_content)
+            required = ['Value', 'Exchange', 'Buy limit']
 
-        try:
-            info['Value']
-            info['Exchange']
-            info['Buy limit']
-        except KeyError:
+        if any(prop not in info for prop in required):
             raise exceptions.NoPriceData
 
-        api_data = parse_price_data(
+        api_data = await parse_price_data(
+            self,
             f"{PRICEAPI_URL}{info['Item ID']}",
             HEADERS
         )
 
-        graphapi_data = parse_price_data(
-            f"{GRAPHAPI_URL}{info['Item ID']}.json",
+        graph = await get_price_graph(
+            self,
+            int(info['Item ID']),
+            GRAPHAPI_URL,
             HEADERS
         )
 
-        filename = await generate_graph(graphapi_data)
+        if 'Exchange' not in info:
+            info['Exchange'] = await get_exchange_price(
+                self,
+                info['Item ID'],
+                PRICEAPI_URL,
+                HEADERS,
+                api_data
+            ) or 'N/A'
 
         thumbnail_url = api_data['item']['icon_large']
         colour = disnake.Colour.from_rgb(
             *await extract_colour(
                 self,
                 inter.guild_id,
-                inter.guild.owner_id,
                 thumbnail_url,
                 HEADERS
             )
@@ -159,12 +172,14 @@ class Price(commands.Cog, name='price'):
         try:
 
             # Calculating the profit margin.
-            price_data = parse_price_data(
-                f'{WIKIAPI_URL}{info["Item ID"]}',
+            price_data = await get_latest_price(
+                self,
+                info['Item ID'],
+                WIKIAPI_URL,
                 HEADERS
             )
-            high_price = price_data['data'][info['Item ID']]['high']
-            low_price = price_data['data'][info['Item ID']]['low']
+            high_price = price_data['high']
+            low_price = price_data['low']
             # Insert a + or - depending on positive or negative profit.
             def operator(i): return f'+{int(i.replace(",", ""))}' if int(i.replace(',', '')) >= 0 else '' + str(i)
             profit_margin = operator(f'{low_price +- high_price:,}')
@@ -181,10 +196,10 @@ class Price(commands.Cog, name='price'):
 
             # Gets the last trade date/time.
             high_time = datetime.datetime.fromtimestamp(
-                price_data['data'][info['Item ID']]['highTime']
+                price_data['highTime']
             )
             low_time = datetime.datetime.fromtimestamp(
-                price_data['data'][info['Item ID']]['lowTime']
+                price_data['lowTime']
             )
             present_time = datetime.datetime.now().replace(microsecond=0)
             high_date_diff = convert_date_to_duration(present_time, high_time)
@@ -232,7 +247,7 @@ class Price(commands.Cog, name='price'):
         embed.set_footer(
             text=f'Runebot {VER} • Exchange data from the Grand Exchange. For more analytics, use the buttons below.'
         )
-        return embed, view, filename
+        return embed, view, graph
 
 
     @commands.slash_command(
@@ -267,12 +282,10 @@ class Price(commands.Cog, name='price'):
         '''
 
         await inter.response.defer()
-        embed, view, filename = await self.search_price(inter, search_query)
-        file = disnake.File(f'assets/{filename}', filename=filename)
-        embed.set_image(url=f'attachment://{filename}')
+        embed, view, graph = await self.search_price(inter, search_query)
+        file = disnake.File(io.BytesIO(graph), filename='graph.png')
+        embed.set_image(url='attachment://graph.png')
         await inter.followup.send(embed=embed, view=view, file=file)
-        file.close()
-        os.remove(f'assets/{filename}')
 
 
     @price.autocomplete('search_query')
@@ -291,10 +304,8 @@ class Price(commands.Cog, name='price'):
             or "I'm feeling lucky".
         '''
 
-        tradeable_items = await get_suggestions(self, ['Tradeable items'])
-        autocomplete_suggestions = [i for i in tradeable_items if not any(w in i for w in BLACKLIST_ITEMS)]
         if len(search_query) > 0:
-            return [f'{a}\u200a' for a in autocomplete_suggestions if search_query.lower() in a.lower()][:25]
+            return [f'{a}\u200a' for a in self.bot.article_index.search('items', search_query)]
         return ['I\'m feeling lucky\u200a']
 
 
@@ -80,16 +80,17 @@ class Quests(commands.Cog, name='quests'):
         # Checks if the query is equal to the "I'm feeling lucky" special
         # query and returns a random article if True.
         if search_query == 'I\'m feeling lucky\u200a':
-            quests = await get_suggestions(self, ['Quests'])
-            page_content = parse_page(
+            page_content = await parse_page(
+                self,
                 BASE_URL,
                 slugify(
-                    random.choice([i for i in quests if not any(w in i for w in BLACKLIST_QUESTS)])
+                    random.choice(self.bot.article_index.titles('quests'))
                 ),
                 HEADERS
             )
         else:
-            page_content = parse_page(
+            page_content = await parse_page(
+            self,
             BASE_URL,
             search_query,
             HEADERS
@@ -187,10 +188,8 @@ class Quests(commands.Cog, name='quests'):
             A list of possible autocomplete suggestions,
             or "I'm feeling lucky".
         '''
-        quests = await get_suggestions(self, ['Quests'])
-        autocomplete_suggestions = [i for i in quests if not any(w in i for w in BLACKLIST_QUESTS)]
         if len(search_query) > 0:
-            return [f'{a}\u200a' for a in autocomplete_suggestions if search_query.lower() in a.lower()][:25]
+            return [f'{a}\u200a' for a in self.bot.article_index.search('quests', search_query)]
         return ['I\'m feeling lucky\u200a']
 
 
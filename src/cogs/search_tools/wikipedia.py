@@ -83,9 +83,14 @@ class Wikipedia(commands.Cog, name='wikipedia'):
         # Checks if the query is equal to the "I'm feeling lucky" special
         # query and returns a random article if True.
         if search_query == 'I\'m feeling lucky\u200a':
-            page_content = parse_page(BASE_URL, FEELING_LUCKY, HEADERS)
+            page_content = await parse_page(self, BASE_URL, FEELING_LUCKY, HEADERS)
         else:
-            page_content = parse_page(
+            # Resolves misspelled queries to the closest article title.
+            search_query = self.bot.article_index.resolve(
+                'wikipedia', search_query
+            )
+            page_content = await parse_page(
+                self,
                 BASE_URL,
                 search_query,
                 HEADERS
@@ -108,7 +113,6 @@ class Wikipedia(commands.Cog, name='wikipedia'):
             *await extract_colour(
                 self,
                 inter.guild_id,
-                inter.guild.owner_id,
                 thumbnail_url,
                 HEADERS
             )
@@ -193,10 +197,8 @@ class Wikipedia(commands.Cog, name='wikipedia'):
             or "I'm feeling lucky".
         '''
 
-        autocomplete_suggestions = await get_wikipedia_suggestions(self)
-
         if len(search_query) > 0:
-            return [f'{a}\u200a' for a in autocomplete_suggestions if search_query.lower() in a.lower()][:25]
+            return [f'{a}\u200a' for a in self.bot.article_index.search('wikipedia', search_query)]
         return ['I\'m feeling lucky\u200a']
 
 
@@ -16,17 +16,68 @@ VER = 'v1.0.5'
 
 # GENERAL
 MAX_CHARS = 12 # Represents maximum character limit for usernames.
+MAX_COMPARE = 10 # Represents maximum number of players compared at once.
 
 # URL / HEADERS
 HEADERS = configuration()['headers']
 URLS = configuration()['urls']
 
+# CACHES
+CACHE = configuration()['cache']
+PAGE_CACHE_SIZE = CACHE['pages']['max_entries'] # Maximum pages held in memory.
+PAGE_CACHE_TTL = CACHE['pages']['ttl'] # Seconds before a page is revalidated.
+PAGE_STORE_MAX_AGE = CACHE['pages']['max_age'] # Seconds a page is kept on disk.
+PRICE_REFRESH = CACHE['prices']['refresh'] # Seconds between price snapshots.
+COLOUR_CACHE_SIZE = CACHE['colours']['max_entries'] # Maximum colours held in memory.
+GRAPH_CACHE_SIZE = CACHE['graphs']['max_entries'] # Maximum graphs held in memory.
+GRAPH_PRERENDER = CACHE['graphs']['prerender'] # Popular graphs pre-rendered daily.
+GRAPH_POLL = CACHE['graphs']['poll'] # Seconds between GE update checks.
+USER_CACHE_SIZE = CACHE['users']['max_entries'] # Maximum users held in memory.
+HISCORE_CACHE_SIZE = CACHE['hiscores']['max_entries'] # Maximum lookups held in memory.
+HISCORE_CACHE_TTL = CACHE['hiscores']['ttl'] # Seconds a lookup is served for.
+
+# RENDERER
+GRAPH_WORKERS = configuration()['renderer']['workers'] # Graph rendering processes.
+
+# COLOUR EXTRACTION
+COLOURS = configuration()['colours']
+COLOUR_WORKERS = COLOURS['workers'] # Colour extraction processes.
+COLOUR_THUMBNAIL_SIZE = COLOURS['thumbnail_size'] # Largest width/height quantised.
+COLOUR_TIME_BUDGET = COLOURS['time_budget'] # Seconds before using the default.
+COLOUR_MAX_PIXELS = COLOURS['max_pixels'] # Largest image (in pixels) quantised.
+
+# ITEMS
+# A local copy of the item mapping dataset, used instead of the API if set.
+ITEM_MAPPING_FILE = configuration()['items']['mapping_file'] or None
+
+# XP TRACKER
+TRACKER = configuration()['tracker']
+TRACKER_INTERVAL = TRACKER['interval'] # Seconds between snapshots of every player.
+TRACKER_CONCURRENCY = TRACKER['concurrency'] # Players snapshotted at once.
+TRACKER_RATE = TRACKER['rate'] # Hiscores requests per second.
+TRACKER_KEYFRAME_INTERVAL = TRACKER['keyframe_interval'] # Snapshots per keyframe.
+TRACKER_MAX_AGE = TRACKER['max_age'] # Seconds a snapshot is kept on disk.
+
+# DATABASE
+DATABASE = configuration()['database']
+DATABASE_PATH = DATABASE['path'] # Path of the SQLite database.
+DATABASE_READERS = DATABASE['readers'] # Read-only connections in the pool.
+DATABASE_MMAP_SIZE = DATABASE['mmap_size'] # Bytes memory-mapped per connection.
+DATABASE_CACHE_SIZE = DATABASE['cache_size'] # Page cache per connection (KiB if negative.)
+DATABASE_WRITE_INTERVAL = DATABASE['write_interval'] # Seconds writes are batched for.
+DATABASE_WRITE_BATCH = DATABASE['write_batch'] # Writes committed per transaction.
+
 # URLs (API)
 BASE_URL = URLS['osrswiki']
+IMAGES_URL = URLS['osrswiki_images']
 HISCORES_URL = URLS['hiscores']
 WIKIAPI_URL = URLS['priceapi_wikipedia']
+LATESTAPI_URL = URLS['priceapi_latest']
+MAPPINGAPI_URL = URLS['priceapi_mapping']
 PRICEAPI_URL = URLS['priceapi_official']
 GRAPHAPI_URL = URLS['graphapi']
+GRAPHINFO_URL = URLS['graphapi_info']
+SPRITES_URL = URLS['itemdb_sprites']
 
 # ACCOUNT TYPES
 ACCOUNT_TYPES = [
@@ -39,6 +90,19 @@ ACCOUNT_TYPES = [
     'Fresh Start Worlds'
 ]
 
+# The account type which looks a player up on every Hiscores at once, and
+# the order account types are preferred in (most specific first.)
+AUTO_DETECT = 'Auto-detect'
+AUTO_DETECT_ORDER = [
+    'Hardcore Ironman',
+    'Ultimate Ironman',
+    'Ironman',
+    '1 Defence',
+    'Skiller',
+    'Fresh Start Worlds',
+    'Normal'
+]
+
 # HISCORE URLs
 NORMAL_HISCORES = HISCORES_URL + URLS['normal']['h']
 IRONMAN_HISCORES = HISCORES_URL + URLS['ironman']['h']
@@ -364,9 +428,17 @@ COMBAT_SKILLS = [
     'Strength'
 ]
 
+SKILL_ORDER = HISCORES_ORDER[0:24]
 CLUE_SCROLL_ORDER = HISCORES_ORDER[28:34]
 BOSS_ORDER = HISCORES_ORDER[39:89]
 
+# The periods `/gains` can report on, in seconds.
+GAINS_PERIODS = {
+    'Day': 86400,
+    'Week': 604800,
+    'Month': 2592000
+}
+
 # URLs (Misc)
 SUPPORT_SERVER = configuration()['configuration']['support_server']
 
@@ -451,3 +523,34 @@ BLACKLIST_QUESTS = [
     'Quests/',
     'Quick guide',
 ]
+
+BLACKLIST_MINIGAMES = [
+    'Barrows',
+    'Creature Creation',
+    'Minigames',
+]
+
+# AUTOCOMPLETE PARTITIONS
+# Maps each partition of the in-memory article index to the categories it
+# includes (or `exclude_categories`), the substrings it filters out
+# (`blacklist`) and the exact titles it filters out (`exclude`.)
+ARTICLE_PARTITIONS = {
+    'wikipedia': {
+        'exclude_categories': ['Dates in RuneScape']
+    },
+    'items': {
+        'categories': ['Tradeable items'],
+        'blacklist': BLACKLIST_ITEMS
+    },
+    'monsters': {
+        'categories': ['Monsters']
+    },
+    'minigames': {
+        'categories': ['Minigames'],
+        'exclude': BLACKLIST_MINIGAMES
+    },
+    'quests': {
+        'categories': ['Quests'],
+        'blacklist': BLACKLIST_QUESTS
+    }
+}
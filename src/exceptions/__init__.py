@@ -11,6 +11,8 @@ For more information about each function and its usage, refer to the
 docstrings.
 '''
 
+from typing import List, Optional
+
 
 class Nonexistence(Exception):
     '''
@@ -20,6 +22,8 @@ class Nonexistence(Exception):
     :param message: (String) -
         A custom message to display when the exception is raised. Defaults to
         a pre-defined message.
+    :param suggestions: (Optional[List[String]]) -
+        A list of similar article titles ("did you mean" suggestions.)
 
     :return: (None)
     '''
@@ -32,17 +36,25 @@ class Nonexistence(Exception):
         'please look for it at [upcoming updates]'
         '(https://oldschool.runescape.wiki/w/Upcoming_updates) or create an '
         'article about it, supplying definite sources and citations.'
-    )) -> None:
+    ), suggestions: Optional[List[str]] = None) -> None:
         '''
         Initialises a new instance of the Nonexistence class.
 
         :param message: (Optional[String]) -
             A custom message to display when the exception is raised.
             Defaults to a pre-defined message.
+        :param suggestions: (Optional[List[String]]) -
+            A list of similar article titles, appended to the message as
+            "did you mean" suggestions.
 
         :return: (None)
         '''
 
+        if suggestions:
+            message = (
+                f'{message}\n\n**Did you mean**: '
+                f'{", ".join(f"`{title}`" for title in suggestions)}?'
+            )
         self.message = message
         super().__init__(self.message)
 
@@ -384,3 +396,36 @@ class NoGameModeData(Exception):
 
         self.message = message
         super().__init__(self.message)
+
+
+class NoTrackingData(Exception):
+    '''
+    Thrown when a player hasn't been snapshotted by the XP tracker yet
+    (only players saved with `/setrsn` are tracked.)
+
+    :param message: (String) -
+        A custom message to display when the exception is raised.
+        Defaults to a pre-defined message.
+
+    :return: (None)
+    '''
+
+    def __init__(self, message: str = (
+        'The player you have searched for isn\'t being tracked yet. Players '
+        'saved with `/setrsn` are tracked automatically, and their gains '
+        'appear after their first snapshot.\n\n'
+        '**Usage**: `/gains <USERNAME> [PERIOD (optional)] '
+        '[ACCOUNT_TYPE (optional)]`'
+    )) -> None:
+        '''
+        Initialises a new instance of the NoTrackingData class.
+
+        :param message: (Optional[String]) -
+            A custom message to display when the exception is raised.
+            Defaults to a pre-defined message.
+
+        :return: (None)
+        '''
+
+        self.message = message
+        super().__init__(self.message)
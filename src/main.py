@@ -26,6 +26,8 @@ if __name__ == '__main__':
 
     bot.load_extensions(exts=[
         'cogs.administrator.ping',
+        'cogs.player_utilities.compare',
+        'cogs.player_utilities.gains',
         'cogs.player_utilities.setrsn',
         'cogs.player_utilities.stats',
         'cogs.player_utilities.unsetrsn',
@@ -37,4 +39,4 @@ if __name__ == '__main__':
         'cogs.search_tools.wikipedia'
     ])
 
-bot.run(env['BOT_TOKEN'])
+    bot.run(env['BOT_TOKEN'])
@@ -0,0 +1,304 @@
+#! /usr/bin/env python3
+
+'''
+This module contains a command-line entry point which precomputes the
+thumbnail colours used by colour mode, so `/price`, `/alchemy` and
+`/bestiary` never need to download an image at runtime.
+
+Every tradeable item (its official sprite and its wiki icon) and every
+monster (its infobox image) is walked. Images are fetched through a
+bounded pool of concurrent fetchers, colours are computed in parallel
+across every core, and the results are bulk-inserted into the
+`thumbnail_colours` table in batches. Images which already have a colour
+are skipped, so the job can be re-run (or resumed) at any time.
+
+Usage (from the root of the project directory):
+    python src/precompute_colours.py [--concurrency N] [--workers N]
+                                     [--batch N] [--only items|monsters]
+                                     [--limit N]
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import argparse
+import asyncio
+import os
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from loguru import logger
+
+from config import *
+from utils import (
+    ColourExtractor,
+    ConnectionPool,
+    HttpClient,
+    get_all_articles_by_category,
+    get_all_items,
+    get_all_thumbnail_urls,
+    load_item_mapping,
+    migrate_database,
+    normalise_image_url,
+    parse_infobox,
+    replace_items,
+    save_thumbnail_colours,
+    slugify
+)
+
+
+class Context:
+    '''
+    A class which stands in for a cog, exposing the shared state the
+    `utils` functions expect on `self.bot`.
+    '''
+
+    def __init__(
+        self,
+        runebotdb: ConnectionPool,
+        http_client: HttpClient,
+        colour_extractor: ColourExtractor
+    ) -> None:
+        '''
+        Initialises a new instance of the Context class.
+
+        :param self: -
+            Represents this object.
+        :param runebotdb: (ConnectionPool) -
+            Represents the database connection pool.
+        :param http_client: (HttpClient) -
+            Represents the shared HTTP client.
+        :param colour_extractor: (ColourExtractor) -
+            Represents the colour extraction process pool.
+
+        :return: (None)
+        '''
+
+        self.bot = self
+        self.runebotdb = runebotdb
+        self.http_client = http_client
+        self.colour_extractor = colour_extractor
+
+
+async def collect_jobs(self, only: Optional[str]) -> List[Tuple[str, str]]:
+    '''
+    Collects every image to be processed, as (kind, target) jobs. Item
+    jobs are image URLs, monster jobs are page titles (whose infobox image
+    is only known once the page has been fetched.)
+
+    :param self: -
+        Represents this object.
+    :param only: (Optional[String]) -
+        Represents the only kind of job to collect ('items' or 'monsters'.)
+
+    :return: (List[Tuple[String, String]]) -
+        A list of ('image', image_url) and ('monster', title) jobs.
+    '''
+
+    jobs = []
+    if only in (None, 'items'):
+        items = await get_all_items(self)
+        if not items:
+            await replace_items(
+                self,
+                await load_item_mapping(
+                    self,
+                    MAPPINGAPI_URL,
+                    IMAGES_URL,
+                    HEADERS,
+                    ITEM_MAPPING_FILE
+                )
+            )
+            items = await get_all_items(self)
+
+        for item_id, icon_url in items:
+            jobs.append(('image', f'{SPRITES_URL}{item_id}'))
+            if icon_url:
+                jobs.append(('image', icon_url))
+
+    if only in (None, 'monsters'):
+        for title, category in await get_all_articles_by_category(self):
+            if category == 'Monsters':
+                jobs.append(('monster', title))
+
+    return jobs
+
+
+async def resolve_image(self, kind: str, target: str) -> Optional[str]:
+    '''
+    Returns the image URL of a job, fetching the monster's page if needed.
+
+    :param self: -
+        Represents this object.
+    :param kind: (String) -
+        Represents the kind of job ('image' or 'monster'.)
+    :param target: (String) -
+        Represents the image URL or monster title.
+
+    :return: (Optional[String]) -
+        The image URL, or None if the monster has no infobox image.
+    '''
+
+    if kind == 'image':
+        return target
+
+    page = await self.bot.http_client.fetch(
+        f'{BASE_URL}{slugify(target)}', HEADERS
+    )
+    if not page.ok:
+        return None
+    info = parse_infobox(BeautifulSoup(page.body, 'html.parser'))
+    if 'Image' not in info:
+        return None
+    return urljoin(BASE_URL, info['Image'])
+
+
+async def fetcher(
+    self,
+    jobs: asyncio.Queue,
+    done: set,
+    results: list,
+    batch: int,
+    stats: dict
+) -> None:
+    '''
+    Takes jobs off the queue until it is empty, fetching each image and
+    computing its colour in the process pool. Results are flushed to the
+    database every `batch` colours.
+
+    :param self: -
+        Represents this object.
+    :param jobs: (asyncio.Queue) -
+        Represents the queue of (kind, target) jobs.
+    :param done: (Set[String]) -
+        Represents the normalised image URLs which already have a colour.
+    :param results: (List) -
+        Represents the (normalised image URL, colour) results not yet saved.
+    :param batch: (Integer) -
+        Represents the number of colours saved per transaction.
+    :param stats: (Dictionary) -
+        Represents the job counters.
+
+    :return: (None)
+    '''
+
+    while True:
+        try:
+            kind, target = jobs.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        try:
+            image_url = await resolve_image(self, kind, target)
+            cache_key = normalise_image_url(image_url) if image_url else None
+            if cache_key is None or cache_key in done:
+                stats['skipped'] += 1
+                continue
+            done.add(cache_key)
+
+            image = await self.bot.http_client.fetch(image_url, HEADERS)
+            if not image.ok:
+                stats['failed'] += 1
+                continue
+            colour = await self.bot.colour_extractor.extract(image.body)
+            if colour is None:
+                stats['failed'] += 1
+                continue
+
+            results.append((cache_key, colour))
+            stats['computed'] += 1
+            if len(results) >= batch:
+                flushed = results[:]
+                results.clear()
+                await save_thumbnail_colours(self, flushed)
+        except Exception as exc:
+            stats['failed'] += 1
+            logger.warning(f'{target}: {type(exc).__name__}: {exc}')
+
+
+async def precompute_colours(args: argparse.Namespace) -> None:
+    '''
+    Precomputes the thumbnail colour of every item and monster image.
+
+    :param args: (argparse.Namespace) -
+        Represents the command-line arguments.
+
+    :return: (None)
+    '''
+
+    context = Context(
+        await ConnectionPool(
+            DATABASE_PATH,
+            1,
+            DATABASE_MMAP_SIZE,
+            DATABASE_CACHE_SIZE
+        ).open(),
+        HttpClient(HEADERS, limit_per_host=args.concurrency),
+        ColourExtractor(args.workers, COLOUR_THUMBNAIL_SIZE, time_budget=60.0)
+    )
+
+    try:
+        await migrate_database(context)
+        all_jobs = await collect_jobs(context, args.only)
+        if args.limit:
+            all_jobs = all_jobs[:args.limit]
+
+        jobs = asyncio.Queue()
+        for job in all_jobs:
+            jobs.put_nowait(job)
+
+        done = await get_all_thumbnail_urls(context)
+        results = []
+        stats = {'computed': 0, 'skipped': 0, 'failed': 0}
+        started_at = time.monotonic()
+        logger.info(
+            f'Precomputing colours for {len(all_jobs)} images '
+            f'({len(done)} already stored.)'
+        )
+
+        await context.colour_extractor.warm()
+        await asyncio.gather(*[
+            fetcher(context, jobs, done, results, args.batch, stats)
+            for _ in range(args.concurrency)
+        ])
+        if results:
+            await save_thumbnail_colours(context, results)
+
+        logger.success(
+            f'{stats["computed"]} colours computed, {stats["skipped"]} '
+            f'skipped and {stats["failed"]} failed in '
+            f'{time.monotonic() - started_at:.1f}s.'
+        )
+    finally:
+        context.colour_extractor.close()
+        await context.http_client.close()
+        await context.runebotdb.close()
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--concurrency', type=int, default=8,
+        help='The number of concurrent fetches. (Default: 8)'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='The number of colour extraction processes. (Default: all cores)'
+    )
+    parser.add_argument(
+        '--batch', type=int, default=500,
+        help='The number of colours saved per transaction. (Default: 500)'
+    )
+    parser.add_argument(
+        '--only', choices=['items', 'monsters'],
+        help='Only precompute colours for items or monsters.'
+    )
+    parser.add_argument(
+        '--limit', type=int,
+        help='Only process the first N images (Ex: for testing.)'
+    )
+
+    asyncio.run(precompute_colours(parser.parse_args()))
@@ -20,6 +20,18 @@ Functions:
         - `async def on_slash_command_error()`:
                 A coroutine that is called when a slash command
                 encounters an error.
+        - `async def send_error()`:
+                A coroutine that sends an error message, as a follow-up
+                if the command has deferred.
+        - `@tasks.loop(seconds=PRICE_REFRESH) async def refresh_prices()`:
+                A coroutine that reloads the price snapshot from the
+                real-time prices API.
+        - `@tasks.loop(seconds=GRAPH_POLL) async def refresh_graphs()`:
+                A coroutine that pre-renders popular price graphs after
+                each Grand Exchange update.
+        - `@tasks.loop(seconds=TRACKER_INTERVAL) async def snapshot_hiscores()`:
+                A coroutine that snapshots the experience of every saved
+                player for `/gains`.
         - `@tasks.loop(minutes=10.0) async def status()`:
                 A coroutine that updates the bot's status every 10
                 minutes.
@@ -29,6 +41,17 @@ Functions:
                 Initialises a new instance of the Bot class.
         - `load_extensions()`:
                 Loads all extensions (cogs) for the bot.
+        - `close()`:
+                Closes the shared HTTP sessions, process pools and database
+                connections before disconnecting.
+        - `reload_article_index()`:
+                Rebuilds the in-memory article index from the database.
+        - `reload_guild_settings()`:
+                Loads the settings of every guild from the database.
+        - `warm_page_cache()`:
+                Pre-warms the page cache from the `page_cache` table.
+        - `reload_items()`:
+                Reloads the `items` table from the item mapping dataset.
 
 Each function has an associated docstring, providing details
 about its functionality, parameters, and return values.
@@ -37,9 +60,9 @@ For more information about each function and its usage, refer to the
 docstrings.
 '''
 
+import asyncio
 import platform
 import os
-import aiosqlite
 import disnake
 
 from disnake.ext import commands, tasks
@@ -47,7 +70,39 @@ from disnake import ApplicationCommandInteraction
 from loguru import logger
 
 from config import *
-from utils import EmbedFactory, configuration, add_guild, remove_guild
+from utils import (
+    ArticleIndex,
+    ColourCache,
+    ColourExtractor,
+    ConnectionPool,
+    EmbedFactory,
+    GraphCache,
+    GraphRenderer,
+    GuildSettings,
+    HiscoreCache,
+    HiscoreTracker,
+    HttpClient,
+    PageCache,
+    PriceSnapshot,
+    UserCache,
+    configuration,
+    add_guild,
+    get_all_articles_by_category,
+    get_all_guild_settings,
+    get_all_usernames,
+    get_price_graph,
+    get_recent_cached_pages,
+    load_item_mapping,
+    migrate_database,
+    parse_price_data,
+    prune_cached_graphs,
+    prune_cached_pages,
+    prune_hiscore_snapshots,
+    reconcile_guilds,
+    remove_guild,
+    replace_items,
+    track_hiscores
+)
 
 
 class Bot(commands.InteractionBot):
@@ -71,6 +126,71 @@ class Bot(commands.InteractionBot):
         self.bot = Bot
         self.config = config or configuration()
 
+        # Shared HTTP client with one pooled, keep-alive session per
+        # upstream host (wiki, hiscores/exchange and real-time prices.)
+        setattr(self.bot, 'http_client', HttpClient(HEADERS))
+
+        # Latest price of every item, refreshed by `refresh_prices`.
+        setattr(self.bot, 'price_snapshot', PriceSnapshot())
+
+        # Price graphs are rendered in a separate process pool.
+        setattr(self.bot, 'graph_renderer', GraphRenderer(GRAPH_WORKERS))
+        setattr(self.bot, 'graph_cache', GraphCache(GRAPH_CACHE_SIZE))
+
+        # Dominant thumbnail colours keyed by normalised image URL, and
+        # the process pool which extracts them.
+        setattr(self.bot, 'colour_cache', ColourCache(COLOUR_CACHE_SIZE))
+        setattr(
+            self.bot,
+            'colour_extractor',
+            ColourExtractor(
+                COLOUR_WORKERS,
+                COLOUR_THUMBNAIL_SIZE,
+                COLOUR_TIME_BUDGET,
+                COLOUR_MAX_PIXELS
+            )
+        )
+
+        # Wiki pages keyed by canonical title, revalidated once stale.
+        setattr(
+            self.bot,
+            'page_cache',
+            PageCache(PAGE_CACHE_SIZE, PAGE_CACHE_TTL)
+        )
+
+        # Colour mode of every guild, loaded from `all_guilds` once the
+        # database is available and written through on every change.
+        setattr(self.bot, 'guild_settings', GuildSettings())
+
+        # Recent Hiscores lookups, so stats views re-render without
+        # fetching the player again.
+        setattr(
+            self.bot,
+            'hiscore_cache',
+            HiscoreCache(HISCORE_CACHE_SIZE, HISCORE_CACHE_TTL)
+        )
+
+        # Saved usernames keyed by Discord user id, written through on
+        # `/setrsn` and `/unsetrsn`.
+        setattr(self.bot, 'user_cache', UserCache(USER_CACHE_SIZE))
+
+        # Last snapshot of every saved player, which the next snapshot is
+        # delta-encoded against.
+        setattr(
+            self.bot,
+            'hiscore_tracker',
+            HiscoreTracker(TRACKER_KEYFRAME_INTERVAL)
+        )
+
+        # In-memory autocomplete index, loaded from `all_articles` once
+        # the database is available.
+        setattr(self.bot, 'article_index', ArticleIndex(ARTICLE_PARTITIONS))
+
+        # Set once `on_connect` has opened, migrated and loaded the
+        # database. `on_ready` and the guild events can fire before then,
+        # so they wait for it.
+        self.database_ready = asyncio.Event()
+
 
     def load_extensions(self, exts: list) -> None:
         '''
@@ -99,6 +219,116 @@ class Bot(commands.InteractionBot):
         logger.info(f'{count} extension(s) have loaded successfully.\n')
 
 
+    async def close(self) -> None:
+        '''
+        Stops the background refreshes and closes the shared HTTP sessions,
+        process pools and database connections before disconnecting from
+        Discord.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.refresh_prices.cancel()
+        self.refresh_graphs.cancel()
+        self.snapshot_hiscores.cancel()
+        self.bot.graph_renderer.close()
+        self.bot.colour_extractor.close()
+        await self.bot.http_client.close()
+        if getattr(self.bot, 'runebotdb', None) is not None:
+            await self.bot.runebotdb.close()
+        await super().close()
+
+
+    async def warm_page_cache(self) -> None:
+        '''
+        Prunes expired pages from the `page_cache` table and pre-warms the
+        in-memory page cache with the most recently validated pages.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        await prune_cached_pages(self, PAGE_STORE_MAX_AGE)
+        for entry in await get_recent_cached_pages(
+            self, self.bot.page_cache.max_entries
+        ):
+            self.bot.page_cache.load(entry)
+        logger.info(
+            f'Page cache warmed ({len(self.bot.page_cache.entries)} pages.)'
+        )
+
+
+    async def reload_article_index(self) -> None:
+        '''
+        Rebuilds the in-memory article index from the `all_articles`
+        table. Should be called whenever the table changes.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        # Building the index takes a moment, so it's done off the event loop.
+        articles = await get_all_articles_by_category(self)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.bot.article_index.reload, articles
+        )
+        logger.info(
+            f'Article index loaded '
+            f'({len(self.bot.article_index.titles("wikipedia"))} articles.)'
+        )
+
+
+    async def reload_guild_settings(self) -> None:
+        '''
+        Loads the settings of every guild from the `all_guilds` table.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        guilds = await get_all_guild_settings(self)
+        self.bot.guild_settings.load(guilds)
+        logger.info(f'Guild settings loaded ({len(guilds)} guilds.)')
+
+
+    async def reload_items(self) -> None:
+        '''
+        Reloads the `items` table from the item mapping dataset (or its
+        local copy.) If the dataset can't be loaded, the existing table is
+        kept.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        try:
+            items = await load_item_mapping(
+                self,
+                MAPPINGAPI_URL,
+                IMAGES_URL,
+                HEADERS,
+                ITEM_MAPPING_FILE
+            )
+        except Exception as exc:
+            return logger.warning(
+                f'Unable to load the item mapping: {type(exc).__name__}: {exc}'
+            )
+
+        await replace_items(self, items)
+        logger.info(f'Item mapping loaded ({len(items)} items.)')
+
+
     async def on_connect(self) -> None:
         '''
         A coroutine that is called when the bot has connected to
@@ -118,34 +348,28 @@ class Bot(commands.InteractionBot):
             f'{platform.release()} {os.name}\n'
         )
 
-        setattr(self.bot, 'runebotdb', await aiosqlite.connect('runebot.db'))
-        async with self.bot.runebotdb.cursor() as cursor:
-            await cursor.execute(
-                '''
-                CREATE TABLE IF NOT EXISTS all_articles (
-                    article_title TEXT NOT NULL,
-                    article_category TEXT NOT NULL
-                )
-                '''
-            )
-            await cursor.execute(
-                '''
-                CREATE TABLE IF NOT EXISTS all_guilds (
-                    guild_id INTEGER NOT NULL,
-                    guild_owner_id INTEGER NOT NULL,
-                    colour_mode BOOLEAN NOT NULL
-                )
-                '''
-            )
-            await cursor.execute(
-                '''
-                CREATE TABLE IF NOT EXISTS all_users (
-                    user_id INTEGER NOT NULL,
-                    username STRING NOT NULL,
-                    account_type STRING NOT NULL
-                )
-                '''
-            )
+        # `on_connect` also runs on every reconnect, so the pool (and its
+        # threads) is only opened, and the database and in-memory caches
+        # only loaded, once.
+        if getattr(self.bot, 'runebotdb', None) is not None:
+            return
+
+        runebotdb = ConnectionPool(
+            DATABASE_PATH,
+            DATABASE_READERS,
+            DATABASE_MMAP_SIZE,
+            DATABASE_CACHE_SIZE,
+            DATABASE_WRITE_INTERVAL,
+            DATABASE_WRITE_BATCH
+        )
+        setattr(self.bot, 'runebotdb', await runebotdb.open())
+        version = await migrate_database(self)
+        logger.info(f'Database schema version: {version}')
+        await self.reload_guild_settings()
+        await self.reload_article_index()
+        await self.warm_page_cache()
+        await self.reload_items()
+        self.database_ready.set()
 
 
     async def on_ready(self) -> None:
@@ -160,6 +384,26 @@ class Bot(commands.InteractionBot):
         '''
 
         await self.wait_until_ready()
+        await self.database_ready.wait()
+        if not self.refresh_prices.is_running():
+            self.refresh_prices.start()
+        if not self.refresh_graphs.is_running():
+            self.refresh_graphs.start()
+        if not self.snapshot_hiscores.is_running():
+            self.snapshot_hiscores.start()
+        await self.bot.graph_renderer.warm()
+        await self.bot.colour_extractor.warm()
+
+        joined, left = await reconcile_guilds(
+            self,
+            [(guild.id, guild.owner_id) for guild in self.guilds]
+        )
+        if joined or left:
+            logger.info(
+                f'Guilds reconciled ({joined} joined and {left} left while '
+                'offline.)'
+            )
+
         total_users = 0
         total_channels = 0
         for guild in self.guilds:
@@ -185,7 +429,10 @@ class Bot(commands.InteractionBot):
         :return: (None)
         '''
 
-        await add_guild(self, guild.id, guild.owner_id, True)
+        # Joins arrive in bursts, so they're group-committed in the
+        # background (and flushed on shutdown.)
+        await self.database_ready.wait()
+        await add_guild(self, guild.id, guild.owner_id, True, wait=False)
 
 
     async def on_guild_remove(self, guild) -> None:
@@ -200,7 +447,8 @@ class Bot(commands.InteractionBot):
         :return: (None)
         '''
 
-        await remove_guild(self, guild.id)
+        await self.database_ready.wait()
+        await remove_guild(self, guild.id, wait=False)
 
 
     async def on_slash_command_error(
@@ -235,7 +483,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -251,7 +500,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -267,7 +517,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.response.send_message(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view,
                     ephemeral=True
@@ -284,7 +535,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -300,7 +552,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -316,7 +569,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -332,7 +586,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -348,7 +603,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view,
                     ephemeral=True
@@ -365,7 +621,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.followup.send(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view
                 )
@@ -381,7 +638,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.response.send_message(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view,
                     ephemeral=True
@@ -398,7 +656,26 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.response.send_message(
+                return await self.send_error(
+                    inter,
+                    embed=embed,
+                    view=view,
+                    ephemeral=True
+                )
+
+            elif 'NoTrackingData' in str(error.__str__()):
+                embed, view = EmbedFactory().create(
+                    title='Nothing interesting happens.',
+                    description=str(error.__cause__),
+                    thumbnail_url = GRAYSCALE_THUMBNAILS['filler'],
+                    colour=0x8B8B8B,
+                    button_label='Support Server',
+                    button_url=SUPPORT_SERVER
+                )
+                embed.timestamp = inter.created_at
+                embed.set_footer(text=f'Runebot {VER}')
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view,
                     ephemeral=True
@@ -415,7 +692,8 @@ class Bot(commands.InteractionBot):
                 )
                 embed.timestamp = inter.created_at
                 embed.set_footer(text=f'Runebot {VER}')
-                return await inter.response.send_message(
+                return await self.send_error(
+                    inter,
                     embed=embed,
                     view=view,
                     ephemeral=True
@@ -425,6 +703,158 @@ class Bot(commands.InteractionBot):
             f'Ignoring exception in slash command {inter.application_command.name}: {error}')
 
 
+    async def send_error(
+        self,
+        inter: ApplicationCommandInteraction,
+        embed: disnake.Embed,
+        view: disnake.ui.View,
+        ephemeral: bool = False
+    ) -> None:
+        '''
+        Sends an error message in response to a slash command. Commands
+        which defer (Ex: /price, /compare) have already responded, so the
+        message is sent as a follow-up instead.
+
+        :param self: -
+            Represents this object.
+        :param inter: (ApplicationCommandInteraction) -
+            The interaction that resulted in the error.
+        :param embed: (disnake.Embed) -
+            The error message.
+        :param view: (disnake.ui.View) -
+            The error message's buttons.
+        :param ephemeral: (Optional[Boolean]) -
+            Whether only the user can see the message (only applies if the
+            command hasn't deferred.)
+
+        :return: (None)
+        '''
+
+        if inter.response.is_done():
+            return await inter.followup.send(
+                embed=embed,
+                view=view,
+                ephemeral=ephemeral
+            )
+        return await inter.response.send_message(
+            embed=embed,
+            view=view,
+            ephemeral=ephemeral
+        )
+
+
+    @tasks.loop(seconds=PRICE_REFRESH)
+    async def refresh_prices(self) -> None:
+        '''
+        A coroutine that reloads the price snapshot from the real-time
+        prices API (every item in one request) every `PRICE_REFRESH`
+        seconds.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        try:
+            price_data = await parse_price_data(self, LATESTAPI_URL, HEADERS)
+            count = self.bot.price_snapshot.load(price_data)
+        except Exception as exc:
+            # The previous snapshot is kept until the next refresh.
+            return logger.warning(
+                f'Unable to refresh prices: {type(exc).__name__}: {exc}'
+            )
+
+        logger.debug(f'Price snapshot refreshed ({count} items.)')
+
+
+    @tasks.loop(seconds=GRAPH_POLL)
+    async def refresh_graphs(self) -> None:
+        '''
+        A coroutine that checks for a new Grand Exchange update every
+        `GRAPH_POLL` seconds. After each update, graphs from the previous
+        runeday are dropped and the `GRAPH_PRERENDER` most requested
+        graphs are rendered ahead of time.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        try:
+            exchange_info = await parse_price_data(self, GRAPHINFO_URL, HEADERS)
+            runeday = exchange_info['lastConfigUpdateRuneday']
+        except Exception as exc:
+            return logger.warning(
+                f'Unable to check for a GE update: {type(exc).__name__}: {exc}'
+            )
+
+        if not self.bot.graph_cache.roll_over(runeday):
+            return
+        await prune_cached_graphs(self, runeday)
+
+        count = 0
+        for item_id in self.bot.graph_cache.popular(GRAPH_PRERENDER):
+            try:
+                await get_price_graph(
+                    self,
+                    item_id,
+                    GRAPHAPI_URL,
+                    HEADERS,
+                    record=False
+                )
+                count += 1
+            except Exception as exc:
+                logger.warning(
+                    f'Unable to pre-render graph {item_id}: '
+                    f'{type(exc).__name__}: {exc}'
+                )
+
+        logger.info(
+            f'GE updated (runeday {runeday}), '
+            f'{count} graph(s) pre-rendered.'
+        )
+
+
+    @tasks.loop(seconds=TRACKER_INTERVAL)
+    async def snapshot_hiscores(self) -> None:
+        '''
+        A coroutine that snapshots the experience of every player saved
+        with `/setrsn` every `TRACKER_INTERVAL` seconds, and removes
+        snapshots older than `TRACKER_MAX_AGE`.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        try:
+            removed = await prune_hiscore_snapshots(self, TRACKER_MAX_AGE)
+            stats = await track_hiscores(
+                self,
+                await get_all_usernames(self),
+                HISCORE_API_URLS,
+                HEADERS,
+                HISCORES_ORDER,
+                SKILL_ORDER,
+                TRACKER_CONCURRENCY,
+                TRACKER_RATE
+            )
+        except Exception as exc:
+            return logger.warning(
+                f'Unable to snapshot Hiscores: {type(exc).__name__}: {exc}'
+            )
+
+        logger.info(
+            f'Hiscores snapshotted ({stats["players"]} players: '
+            f'{stats["saved"]} saved, {stats["unchanged"]} unchanged, '
+            f'{stats["missing"]} missing and {stats["failed"]} failed; '
+            f'{removed} expired.)'
+        )
+
+
     @tasks.loop(minutes=10.0)
     async def status() -> None:
         '''
@@ -4,14 +4,26 @@
 This module initialises all the submodules in the `utils` package.
 
 Submodules:
-    `calculators`, `database`, `embeds`, `helpers`, `parsers`.
+    `cache`, `calculators`, `colours`, `connection`, `database`, `embeds`,
+    `helpers`, `hiscores`, `items`,
+    `network`, `parsers`, `prices`, `renderers`, `search`, `tracker`.
 
 Note:
     This module doesn't define any classes or functions of its own.
 '''
 
+from .cache import *
 from .calculators import *
+from .colours import *
+from .connection import *
 from .database import *
 from .embeds import *
 from .helpers import *
+from .hiscores import *
+from .items import *
+from .network import *
 from .parsers import *
+from .prices import *
+from .renderers import *
+from .search import *
+from .tracker import *
@@ -0,0 +1,894 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the in-memory caches used by Runebot to avoid
+re-fetching upstream content which rarely changes.
+
+Wiki pages are cached by canonical title, with every query which resolved
+to that title (Ex: 'firecape', 'fire_cape') recorded as an alias. Entries
+are evicted least-recently-used once the cache is full, and entries older
+than the TTL are revalidated with `If-None-Match`/`If-Modified-Since`, so
+an unchanged page only costs a `304 Not Modified`.
+
+Pages are also persisted (zlib-compressed) to the `page_cache` table, so
+the cache survives restarts; see `utils.database`.
+
+Dominant thumbnail colours are cached by (normalised) image URL, since
+wiki thumbnails almost never change. Colours are also persisted to the
+`thumbnail_colours` table, so each image is quantised once ever.
+
+Rendered price graphs are cached per item for the current Grand Exchange
+update (runeday), since the underlying graph data only changes once a
+day. The most recently used graphs are held in memory and every graph is
+written through to the `graph_cache` table.
+
+Guild settings (colour mode) are held in memory for every guild, loaded
+in bulk from the `all_guilds` table at startup and written through on
+every change, so reading them never touches the database.
+
+Hiscores lookups are cached per Hiscores (account type) and normalised
+username for a few minutes, so switching between the views of a player's
+stats doesn't fetch them again.
+
+Saved usernames are cached per Discord user, including users who haven't
+saved one. Writes go to the `all_users` table first and then to memory,
+so the cache never holds a username the database doesn't.
+
+Classes:
+    - `CachedPage`:
+            A class which represents a single cached page.
+    - `ColourCache`:
+            A class which holds a bounded, LRU-evicted set of thumbnail
+            colours.
+    - `GraphCache`:
+            A class which holds the rendered price graphs of the current
+            runeday.
+    - `HiscoreCache`:
+            A class which holds a bounded, LRU-evicted set of recent
+            Hiscores lookups.
+    - `GuildSettings`:
+            A class which holds the settings of every guild.
+    - `PageCache`:
+            A class which holds a bounded, LRU-evicted set of pages.
+    - `UserCache`:
+            A class which holds a bounded, LRU-evicted set of saved
+            usernames.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.hiscores import HiscoreRecord
+
+
+class CachedPage:
+    '''
+    A class which represents a single cached page.
+    '''
+
+    __slots__ = ('key', 'body', 'etag', 'last_modified', 'fetched_at', 'aliases')
+
+    def __init__(
+        self,
+        key: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+        aliases: Iterable[str] = ()
+    ) -> None:
+        '''
+        Initialises a new instance of the CachedPage class.
+
+        :param self: -
+            Represents this object.
+        :param key: (String) -
+            Represents the canonical title of the page.
+        :param body: (Bytes) -
+            Represents the raw HTML of the page.
+        :param etag: (Optional[String]) -
+            Represents the `ETag` response header.
+        :param last_modified: (Optional[String]) -
+            Represents the `Last-Modified` response header.
+        :param fetched_at: (Optional[Float]) -
+            Represents when (epoch seconds) the page was last validated.
+        :param aliases: (Optional[Iterable[String]]) -
+            Represents the queries which resolved to this page.
+
+        :return: (None)
+        '''
+
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.aliases: Set[str] = set(aliases)
+
+
+    def fresh(self, ttl: float) -> bool:
+        '''
+        Whether the page was validated within the last `ttl` seconds.
+
+        :param self: -
+            Represents this object.
+        :param ttl: (Float) -
+            Represents the time-to-live (in seconds.)
+
+        :return: (Boolean) -
+            True if the page can be served without revalidation.
+        '''
+
+        return time.time() - self.fetched_at < ttl
+
+
+    def validators(self) -> Dict[str, str]:
+        '''
+        Returns the conditional request headers for revalidating the page.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The `If-None-Match`/`If-Modified-Since` headers (if known.)
+        '''
+
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class GuildSettings:
+    '''
+    A class which holds the settings (colour mode) of every guild, keyed
+    by guild id.
+    '''
+
+    def __init__(self) -> None:
+        '''
+        Initialises a new instance of the GuildSettings class. Settings
+        are empty until `load` is called.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.colour_modes: Dict[int, bool] = {}
+
+
+    def load(self, guilds: Iterable[Tuple[int, bool]]) -> None:
+        '''
+        Replaces every guild's settings (Ex: from the `all_guilds` table.)
+
+        :param self: -
+            Represents this object.
+        :param guilds: (Iterable[Tuple[Integer, Boolean]]) -
+            Represents the (guild_id, colour_mode) of every guild.
+
+        :return: (None)
+        '''
+
+        self.colour_modes = {
+            guild_id: bool(colour_mode) for guild_id, colour_mode in guilds
+        }
+
+
+    def colour_mode(self, guild_id: int) -> Optional[bool]:
+        '''
+        Returns whether colour mode is enabled for a guild.
+
+        :param self: -
+            Represents this object.
+        :param guild_id: (Integer) -
+            Represents the guild id.
+
+        :return: (Optional[Boolean]) -
+            The colour mode of the guild, or None if it isn't known.
+        '''
+
+        return self.colour_modes.get(guild_id)
+
+
+    def store(self, guild_id: int, colour_mode: bool) -> None:
+        '''
+        Sets the colour mode of a guild.
+
+        :param self: -
+            Represents this object.
+        :param guild_id: (Integer) -
+            Represents the guild id.
+        :param colour_mode: (Boolean) -
+            Represents the colour mode toggle.
+
+        :return: (None)
+        '''
+
+        self.colour_modes[guild_id] = bool(colour_mode)
+
+
+    def discard(self, guild_id: int) -> None:
+        '''
+        Forgets the settings of a guild (Ex: once the bot has left it.)
+
+        :param self: -
+            Represents this object.
+        :param guild_id: (Integer) -
+            Represents the guild id.
+
+        :return: (None)
+        '''
+
+        self.colour_modes.pop(guild_id, None)
+
+
+class HiscoreCache:
+    '''
+    A class which holds a bounded, LRU-evicted set of recent Hiscores
+    lookups, keyed by (Hiscores API URL, normalised username).
+    '''
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 180.0) -> None:
+        '''
+        Initialises a new instance of the HiscoreCache class.
+
+        :param self: -
+            Represents this object.
+        :param max_entries: (Optional[Integer]) -
+            Represents the maximum number of lookups held in memory.
+        :param ttl: (Optional[Float]) -
+            Represents how long (in seconds) a lookup is served for.
+
+        :return: (None)
+        '''
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: 'OrderedDict[Tuple[str, str], Tuple[float, HiscoreRecord]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+    def lookup(self, url: str, username: str) -> Optional[HiscoreRecord]:
+        '''
+        Returns a player's Hiscores record if it was fetched within the
+        TTL, marking it as recently used. The record is shared, so it must
+        not be modified.
+
+        :param self: -
+            Represents this object.
+        :param url: (String) -
+            Represents the Hiscores API URL (one per account type.)
+        :param username: (String) -
+            Represents the normalised username.
+
+        :return: (Optional[HiscoreRecord]) -
+            The parsed Hiscores record, or None if it isn't cached (or has
+            expired.)
+        '''
+
+        key = (url, username)
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[1]
+
+
+    def store(self, url: str, username: str, hiscore_data: HiscoreRecord) -> None:
+        '''
+        Adds a player's Hiscores record to memory, evicting the least
+        recently used lookups beyond `max_entries`.
+
+        :param self: -
+            Represents this object.
+        :param url: (String) -
+            Represents the Hiscores API URL (one per account type.)
+        :param username: (String) -
+            Represents the normalised username.
+        :param hiscore_data: (HiscoreRecord) -
+            Represents the parsed Hiscores record.
+
+        :return: (None)
+        '''
+
+        key = (url, username)
+        self.entries[key] = (time.monotonic(), hiscore_data)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Returns the cache counters, for sizing the cache.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The number of lookups in memory, hits and misses.
+        '''
+
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class PageCache:
+    '''
+    A class which holds a bounded, LRU-evicted set of wiki pages.
+    '''
+
+    def __init__(self, max_entries: int = 256, ttl: float = 900.0) -> None:
+        '''
+        Initialises a new instance of the PageCache class.
+
+        :param self: -
+            Represents this object.
+        :param max_entries: (Optional[Integer]) -
+            Represents the maximum number of pages held in memory.
+        :param ttl: (Optional[Float]) -
+            Represents how long (in seconds) a page is served before it
+            is revalidated.
+
+        :return: (None)
+        '''
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: 'OrderedDict[str, CachedPage]' = OrderedDict()
+        self.aliases: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.loads = 0
+
+
+    def lookup(self, query: str) -> Optional[CachedPage]:
+        '''
+        Returns the cached page for a query (or canonical title), marking
+        it as recently used.
+
+        :param self: -
+            Represents this object.
+        :param query: (String) -
+            Represents the slugified query or canonical title.
+
+        :return: (Optional[CachedPage]) -
+            The cached page, or None if it isn't cached.
+        '''
+
+        key = self.aliases.get(query, query)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+
+    def hit(self, entry: CachedPage) -> bytes:
+        '''
+        Records a cache hit and returns the page body.
+
+        :param self: -
+            Represents this object.
+        :param entry: (CachedPage) -
+            Represents the cached page.
+
+        :return: (Bytes) -
+            The raw HTML of the page.
+        '''
+
+        self.hits += 1
+        return entry.body
+
+
+    def revalidate(self, entry: CachedPage, headers: dict) -> bytes:
+        '''
+        Records a `304 Not Modified` response, restarting the page's TTL.
+
+        :param self: -
+            Represents this object.
+        :param entry: (CachedPage) -
+            Represents the stale cached page.
+        :param headers: (Dictionary) -
+            Represents the headers of the `304` response.
+
+        :return: (Bytes) -
+            The raw HTML of the page.
+        '''
+
+        self.revalidations += 1
+        entry.fetched_at = time.time()
+        entry.etag = headers.get('ETag', entry.etag)
+        entry.last_modified = headers.get('Last-Modified', entry.last_modified)
+        return entry.body
+
+
+    def store(
+        self,
+        query: str,
+        key: str,
+        body: bytes,
+        headers: dict
+    ) -> CachedPage:
+        '''
+        Records a cache miss and stores a freshly fetched page under its
+        canonical title, aliasing the query which fetched it.
+
+        :param self: -
+            Represents this object.
+        :param query: (String) -
+            Represents the slugified query which was requested.
+        :param key: (String) -
+            Represents the canonical title of the page.
+        :param body: (Bytes) -
+            Represents the raw HTML of the page.
+        :param headers: (Dictionary) -
+            Represents the response headers.
+
+        :return: (CachedPage) -
+            The cached page.
+        '''
+
+        self.misses += 1
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = CachedPage(key, body)
+            self.entries[key] = entry
+        else:
+            entry.body = body
+            entry.fetched_at = time.time()
+            self.entries.move_to_end(key)
+        entry.etag = headers.get('ETag')
+        entry.last_modified = headers.get('Last-Modified')
+
+        if query != key:
+            entry.aliases.add(query)
+            self.aliases[query] = key
+
+        self.evict()
+        return entry
+
+
+    def load(self, entry: CachedPage) -> CachedPage:
+        '''
+        Adds a page read back from the persistent page store (without
+        counting it as a miss), restoring its aliases.
+
+        :param self: -
+            Represents this object.
+        :param entry: (CachedPage) -
+            Represents the page read from disk.
+
+        :return: (CachedPage) -
+            The cached page (the in-memory copy, if one already exists.)
+        '''
+
+        if entry.key in self.entries:
+            return self.entries[entry.key]
+
+        self.loads += 1
+        self.entries[entry.key] = entry
+        for alias in entry.aliases:
+            self.aliases[alias] = entry.key
+
+        self.evict()
+        return entry
+
+
+    def evict(self) -> None:
+        '''
+        Evicts the least recently used pages until the cache fits within
+        `max_entries`.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        while len(self.entries) > self.max_entries:
+            _, evicted = self.entries.popitem(last=False)
+            for alias in evicted.aliases:
+                if self.aliases.get(alias) == evicted.key:
+                    del self.aliases[alias]
+            self.evictions += 1
+
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Returns the cache counters, for sizing the cache.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The number of entries, hits, misses, revalidations, evictions
+            and pages loaded from disk.
+        '''
+
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'loads': self.loads
+        }
+
+
+class GraphCache:
+    '''
+    A class which holds the rendered price graphs of the current runeday,
+    and counts how often each item's graph is requested.
+    '''
+
+    def __init__(self, max_entries: int = 128) -> None:
+        '''
+        Initialises a new instance of the GraphCache class.
+
+        :param self: -
+            Represents this object.
+        :param max_entries: (Optional[Integer]) -
+            Represents the maximum number of graphs held in memory.
+
+        :return: (None)
+        '''
+
+        self.max_entries = max_entries
+        self.runeday: Optional[int] = None
+        self.entries: 'OrderedDict[int, bytes]' = OrderedDict()
+        self.requests: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+
+    def roll_over(self, runeday: int) -> bool:
+        '''
+        Moves the cache on to a new runeday (Grand Exchange update),
+        dropping every graph rendered for the previous one.
+
+        :param self: -
+            Represents this object.
+        :param runeday: (Integer) -
+            Represents the runeday of the latest Grand Exchange update.
+
+        :return: (Boolean) -
+            True if the runeday has changed.
+        '''
+
+        if runeday == self.runeday:
+            return False
+
+        self.runeday = runeday
+        self.entries.clear()
+        return True
+
+
+    def lookup(self, item_id: int) -> Optional[bytes]:
+        '''
+        Returns the graph of an item from memory, marking it as recently
+        used.
+
+        :param self: -
+            Represents this object.
+        :param item_id: (Integer) -
+            Represents the item id.
+
+        :return: (Optional[Bytes]) -
+            The graph (as a PNG), or None if it isn't in memory.
+        '''
+
+        graph = self.entries.get(item_id)
+        if graph is not None:
+            self.hits += 1
+            self.entries.move_to_end(item_id)
+        return graph
+
+
+    def store(self, item_id: int, graph: bytes, rendered: bool = True) -> None:
+        '''
+        Adds a graph to memory, evicting the least recently used graphs
+        beyond `max_entries`.
+
+        :param self: -
+            Represents this object.
+        :param item_id: (Integer) -
+            Represents the item id.
+        :param graph: (Bytes) -
+            Represents the graph (as a PNG.)
+        :param rendered: (Optional[Boolean]) -
+            Whether the graph was just rendered (a miss) rather than read
+            back from the `graph_cache` table. (Default: True)
+
+        :return: (None)
+        '''
+
+        if rendered:
+            self.misses += 1
+        else:
+            self.loads += 1
+
+        self.entries[item_id] = graph
+        self.entries.move_to_end(item_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+    def popular(self, limit: int) -> List[int]:
+        '''
+        Returns the items whose graphs are requested most often.
+
+        :param self: -
+            Represents this object.
+        :param limit: (Integer) -
+            Represents the number of items to return.
+
+        :return: (List[Integer]) -
+            The ids of the most requested items.
+        '''
+
+        return [item_id for item_id, _ in self.requests.most_common(limit)]
+
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Returns the cache counters, for sizing the cache.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The number of graphs in memory, hits, misses (renders) and
+            graphs loaded from disk.
+        '''
+
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads
+        }
+
+
+class ColourCache:
+    '''
+    A class which holds a bounded, LRU-evicted set of dominant thumbnail
+    colours, keyed by normalised image URL.
+    '''
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        '''
+        Initialises a new instance of the ColourCache class.
+
+        :param self: -
+            Represents this object.
+        :param max_entries: (Optional[Integer]) -
+            Represents the maximum number of colours held in memory.
+
+        :return: (None)
+        '''
+
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, Tuple[int, int, int]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+
+    def lookup(self, image_url: str) -> Optional[Tuple[int, int, int]]:
+        '''
+        Returns the dominant colour of an image from memory, marking it as
+        recently used.
+
+        :param self: -
+            Represents this object.
+        :param image_url: (String) -
+            Represents the normalised image URL.
+
+        :return: (Optional[Tuple[Integer, Integer, Integer]]) -
+            The RGB colour, or None if it isn't in memory.
+        '''
+
+        colour = self.entries.get(image_url)
+        if colour is not None:
+            self.hits += 1
+            self.entries.move_to_end(image_url)
+        return colour
+
+
+    def store(
+        self,
+        image_url: str,
+        colour: Tuple[int, int, int],
+        computed: bool = True
+    ) -> None:
+        '''
+        Adds the dominant colour of an image to memory, evicting the least
+        recently used colours beyond `max_entries`.
+
+        :param self: -
+            Represents this object.
+        :param image_url: (String) -
+            Represents the normalised image URL.
+        :param colour: (Tuple[Integer, Integer, Integer]) -
+            Represents the RGB colour.
+        :param computed: (Optional[Boolean]) -
+            Whether the colour was just extracted (a miss) rather than read
+            back from the `thumbnail_colours` table. (Default: True)
+
+        :return: (None)
+        '''
+
+        if computed:
+            self.misses += 1
+        else:
+            self.loads += 1
+
+        self.entries[image_url] = tuple(colour)
+        self.entries.move_to_end(image_url)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Returns the cache counters, for sizing the cache.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The number of colours in memory, hits, misses (extractions)
+            and colours loaded from disk.
+        '''
+
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads
+        }
+
+
+class UserCache:
+    '''
+    A class which holds a bounded, LRU-evicted set of saved usernames and
+    account types, keyed by Discord user id.
+    '''
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        '''
+        Initialises a new instance of the UserCache class.
+
+        :param self: -
+            Represents this object.
+        :param max_entries: (Optional[Integer]) -
+            Represents the maximum number of users held in memory.
+
+        :return: (None)
+        '''
+
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[int, Tuple[Optional[str], Optional[str]]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+    def lookup(self, user_id: int) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        '''
+        Returns the saved username and account type of a user from memory,
+        marking them as recently used.
+
+        :param self: -
+            Represents this object.
+        :param user_id: (Integer) -
+            Represents a user id.
+
+        :return: (Optional[Tuple[Optional[String], Optional[String]]]) -
+            The (username, account_type) of the user ((None, None) if they
+            haven't saved a username), or None if they aren't in memory.
+        '''
+
+        user = self.entries.get(user_id)
+        if user is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(user_id)
+        return user
+
+
+    def store(
+        self,
+        user_id: int,
+        username: Optional[str],
+        account_type: Optional[str]
+    ) -> None:
+        '''
+        Adds the saved username and account type of a user to memory,
+        evicting the least recently used users beyond `max_entries`.
+
+        :param self: -
+            Represents this object.
+        :param user_id: (Integer) -
+            Represents a user id.
+        :param username: (Optional[String]) -
+            Represents the player's username (None if it was removed.)
+        :param account_type: (Optional[String]) -
+            Represents the account type (None if it was removed.)
+
+        :return: (None)
+        '''
+
+        self.entries[user_id] = (username, account_type)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+    def fill(
+        self,
+        user_id: int,
+        username: Optional[str],
+        account_type: Optional[str]
+    ) -> None:
+        '''
+        Adds the saved username and account type of a user read from the
+        database, unless they are already in memory. A `/setrsn` or
+        `/unsetrsn` which stored the user while the read was in flight is
+        newer than the read, so it isn't overwritten.
+
+        :param self: -
+            Represents this object.
+        :param user_id: (Integer) -
+            Represents a user id.
+        :param username: (Optional[String]) -
+            Represents the player's username (None if they haven't saved one.)
+        :param account_type: (Optional[String]) -
+            Represents the account type (None if they haven't saved one.)
+
+        :return: (None)
+        '''
+
+        if user_id not in self.entries:
+            self.store(user_id, username, account_type)
+
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Returns the cache counters, for sizing the cache.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The number of users in memory, hits and misses.
+        '''
+
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -20,6 +20,8 @@ docstrings.
 from typing import Union
 from math import trunc
 
+from utils.hiscores import MISSING, HiscoreRecord
+
 
 async def calculate_combat_level(combat_levels: dict) -> int:
     '''
@@ -53,14 +55,14 @@ async def calculate_combat_level(combat_levels: dict) -> int:
 
 async def calculate_combat_exp(
     combat_skills: list,
-    hiscore_data: dict
+    hiscore_data: HiscoreRecord
 ) -> Union[int, str]:
     '''
     Calculator function which calculates the total combat experience of a player.
 
     :param combat_skills: (List) -
         Represents the combat levels of a player.
-    :param hiscore_data: (Dictionary) -
+    :param hiscore_data: (HiscoreRecord) -
         Represents hiscore data of a player.
 
     :return: Union[Integer, String] -
@@ -69,8 +71,8 @@ async def calculate_combat_exp(
 
     combat_experience = 0
     for skill in combat_skills:
-        combat_experience += int(hiscore_data.get(skill).split(',')[2])
-    if combat_experience == int(-7):
+        combat_experience += hiscore_data.experience_of(skill)
+    if combat_experience == MISSING * len(combat_skills):
         combat_experience = 'N/A'
     else:
         combat_experience = f'{int(combat_experience):,}'
@@ -0,0 +1,194 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the thumbnail colour extractor used by colour mode.
+
+ColorThief's median cut quantisation is pure Python, so it runs in a
+dedicated process pool rather than on the event loop. Images are decoded
+and downsampled to a small thumbnail before being quantised, so the cost
+no longer grows with the size of the image. Workers are started with the
+`spawn` method, like the graph renderer.
+
+A job which exceeds its time budget can't be interrupted, so images too
+large to decode quickly are refused before they reach a worker, and the
+pool is replaced after a timeout so later extractions don't queue behind
+the stuck worker (which exits once it finishes.)
+
+Classes:
+    - `ColourExtractor`:
+            A class which owns the colour extraction process pool.
+
+Functions:
+    - `quantise_colour()`:
+            Returns the dominant colour of an image (in a worker.)
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from colorthief import ColorThief as ColourThief
+from PIL import Image
+
+
+def quantise_colour(image_data: bytes, size: int = 128) -> Tuple[int, int, int]:
+    '''
+    Returns the dominant colour of an image, after downsampling it to fit
+    within `size` x `size` pixels. Runs in a worker process.
+
+    :param image_data: (Bytes) -
+        Represents the encoded image.
+    :param size: (Optional[Integer]) -
+        Represents the largest width/height quantised. (Default: 128)
+
+    :return: (Tuple[Integer, Integer, Integer]) -
+        The dominant RGB colour of the image.
+    '''
+
+    colour_thief = ColourThief(io.BytesIO(image_data))
+    image = colour_thief.image.convert('RGBA')
+
+    # Nearest neighbour keeps the original (unblended) pixel colours.
+    image.thumbnail((size, size), Image.NEAREST)
+    colour_thief.image = image
+    return colour_thief.get_color(quality=1)
+
+
+class ColourExtractor:
+    '''
+    A class which owns the process pool that extracts thumbnail colours.
+    '''
+
+    def __init__(
+        self,
+        workers: int = 1,
+        size: int = 128,
+        time_budget: float = 2.0,
+        max_pixels: int = 16000000
+    ) -> None:
+        '''
+        Initialises a new instance of the ColourExtractor class. Worker
+        processes are started on first use (or by `warm`.)
+
+        :param self: -
+            Represents this object.
+        :param workers: (Optional[Integer]) -
+            Represents the number of extraction processes.
+        :param size: (Optional[Integer]) -
+            Represents the largest width/height quantised.
+        :param time_budget: (Optional[Float]) -
+            Represents how long (in seconds) to wait for a colour.
+        :param max_pixels: (Optional[Integer]) -
+            Represents the largest image (width x height) quantised.
+
+        :return: (None)
+        '''
+
+        self.workers = workers
+        self.size = size
+        self.time_budget = time_budget
+        self.max_pixels = max_pixels
+        self.timeouts = 0
+        self.refused = 0
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+
+    async def warm(self) -> None:
+        '''
+        Starts every worker process ahead of the first extraction, so no
+        command has to wait for one to start.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, os.getpid)
+            for _ in range(self.workers)
+        ])
+
+
+    async def extract(self, image_data: bytes) -> Optional[Tuple[int, int, int]]:
+        '''
+        Returns the dominant colour of an image, or None if it can't be
+        extracted within the time budget (or is too large or unreadable.)
+
+        :param self: -
+            Represents this object.
+        :param image_data: (Bytes) -
+            Represents the encoded image.
+
+        :return: (Optional[Tuple[Integer, Integer, Integer]]) -
+            The dominant RGB colour of the image, or None.
+        '''
+
+        # Only the header is read, so the size is known before decoding.
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                width, height = image.size
+        except Exception:
+            self.refused += 1
+            return None
+        if width * height > self.max_pixels:
+            self.refused += 1
+            return None
+
+        extraction = asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            quantise_colour,
+            image_data,
+            self.size
+        )
+        try:
+            return await asyncio.wait_for(extraction, self.time_budget)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.recycle()
+            return None
+
+
+    def recycle(self) -> None:
+        '''
+        Replaces the worker pool after a timeout. The timed out job can't
+        be interrupted, so its worker is left to finish it and exit, while
+        new extractions are sent to fresh workers.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.executor.shutdown(wait=False)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+
+    def close(self) -> None:
+        '''
+        Shuts down the worker processes.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.executor.shutdown(wait=False)
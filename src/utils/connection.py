@@ -0,0 +1,527 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the SQLite connection pool used by Runebot.
+
+The database is opened in WAL (write-ahead logging) mode, so reads don't
+block behind writes (or writes behind reads), and with
+`synchronous=NORMAL`, so a commit appends to the WAL instead of waiting
+for a full fsync of the database file. WAL keeps every committed
+transaction durable across a crash of the bot; only a power loss can roll
+back the last few commits.
+
+Every `aiosqlite` connection runs its queries on its own thread, one at a
+time. The pool keeps one writer connection, which every write (and the
+migrations) goes through, plus a small set of read-only connections which
+lookups are spread across, so a read never queues behind a write or a
+slow read.
+
+A connection has one transaction at a time, so the writer is guarded by
+a lock which is held for a whole transaction: direct writers use
+`transaction()`, and the write queue takes the same lock for each batch.
+Without it, a batch committed at an `await` point could commit half of
+another caller's transaction (or be rolled back by it.)
+
+Small, frequent mutations (guild and user changes) are group-committed: a
+`WriteQueue` collects them for a few milliseconds (or until a batch is
+full) and commits the whole batch in one transaction, so a burst of
+events costs one WAL sync instead of one per event. Each write returns a
+future which resolves once its batch is committed, so callers can await
+durability when they need it. Pending writes are flushed when the pool
+is closed.
+
+Classes:
+    - `ConnectionPool`:
+            A class which owns the writer and reader connections.
+    - `WriteQueue`:
+            A class which group-commits writes on the writer connection.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Tuple
+
+import aiosqlite
+from loguru import logger
+
+
+class WriteQueue:
+    '''
+    A class which collects writes and commits them on a connection in
+    batches (group commit.)
+    '''
+
+    def __init__(
+        self,
+        connection: aiosqlite.Connection,
+        lock: asyncio.Lock,
+        interval: float = 0.01,
+        max_batch: int = 100
+    ) -> None:
+        '''
+        Initialises a new instance of the WriteQueue class, and starts
+        its flushing task. Must be called with the event loop running.
+
+        :param self: -
+            Represents this object.
+        :param connection: (aiosqlite.Connection) -
+            Represents the connection writes are committed on.
+        :param lock: (asyncio.Lock) -
+            Represents the lock held for every transaction on the
+            connection.
+        :param interval: (Optional[Float]) -
+            Represents how long (in seconds) writes are collected for
+            before being committed.
+        :param max_batch: (Optional[Integer]) -
+            Represents the number of writes which are committed
+            immediately, without waiting for the interval.
+
+        :return: (None)
+        '''
+
+        self.connection = connection
+        self.lock = lock
+        self.interval = interval
+        self.max_batch = max_batch
+        self.pending: List[Tuple[str, tuple, asyncio.Future]] = []
+        self.ready = asyncio.Event()
+        self.full = asyncio.Event()
+        self.closed = False
+        self.batches = 0
+        self.writes = 0
+        self.task = asyncio.ensure_future(self.run())
+
+
+    def submit(self, sql: str, parameters: tuple = ()) -> asyncio.Future:
+        '''
+        Queues a write for the next batch.
+
+        :param self: -
+            Represents this object.
+        :param sql: (String) -
+            Represents the statement.
+        :param parameters: (Optional[Tuple]) -
+            Represents the statement's parameters.
+
+        :return: (asyncio.Future) -
+            A future which resolves once the write is committed (or raises
+            if the write failed.)
+        '''
+
+        if self.closed:
+            raise RuntimeError('The write queue is closed.')
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((sql, parameters, future))
+        self.ready.set()
+        if len(self.pending) >= self.max_batch:
+            self.full.set()
+        return future
+
+
+    async def run(self) -> None:
+        '''
+        Commits the pending writes in batches until the queue is closed
+        and empty.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        while True:
+            await self.ready.wait()
+            if not self.closed:
+                try:
+                    await asyncio.wait_for(self.full.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self.take(self.max_batch)
+            if batch:
+                await self.commit(batch)
+            if self.closed and not self.pending:
+                return
+
+
+    def take(self, limit: int = None) -> List[Tuple[str, tuple, asyncio.Future]]:
+        '''
+        Removes (up to `limit`) pending writes from the queue, oldest first.
+
+        :param self: -
+            Represents this object.
+        :param limit: (Optional[Integer]) -
+            Represents the maximum number of writes taken (Default: all.)
+
+        :return: (List[Tuple[String, Tuple, asyncio.Future]]) -
+            The (sql, parameters, future) of each write taken.
+        '''
+
+        batch = self.pending[:limit]
+        del self.pending[:limit]
+        if len(self.pending) < self.max_batch:
+            self.full.clear()
+        if not self.pending:
+            self.ready.clear()
+        return batch
+
+
+    def requeue(self, batch: List[Tuple[str, tuple, asyncio.Future]]) -> None:
+        '''
+        Puts writes which were taken (but not committed) back at the front
+        of the queue.
+
+        :param self: -
+            Represents this object.
+        :param batch: (List[Tuple[String, Tuple, asyncio.Future]]) -
+            Represents the (sql, parameters, future) of each write.
+
+        :return: (None)
+        '''
+
+        self.pending[:0] = batch
+        if self.pending:
+            self.ready.set()
+        if len(self.pending) >= self.max_batch:
+            self.full.set()
+
+
+    async def execute(
+        self,
+        cursor: aiosqlite.Cursor,
+        batch: List[Tuple[str, tuple, asyncio.Future]]
+    ) -> Dict[int, Exception]:
+        '''
+        Runs a batch of writes in the current transaction (the lock must
+        be held.) A write which fails doesn't stop the rest of the batch.
+
+        :param self: -
+            Represents this object.
+        :param cursor: (aiosqlite.Cursor) -
+            Represents a cursor on the connection.
+        :param batch: (List[Tuple[String, Tuple, asyncio.Future]]) -
+            Represents the (sql, parameters, future) of each write.
+
+        :return: (Dictionary[Integer, Exception]) -
+            The error of each write which failed, by its index.
+        '''
+
+        errors = {}
+        for index, (sql, parameters, _) in enumerate(batch):
+            try:
+                await cursor.execute(sql, parameters)
+            except Exception as exc:
+                errors[index] = exc
+        return errors
+
+
+    async def commit(self, batch: List[Tuple[str, tuple, asyncio.Future]]) -> None:
+        '''
+        Runs a batch of writes and commits them in one transaction, holding
+        the connection's lock throughout. A write which fails is reported
+        on its own future, without failing the rest of the batch.
+
+        :param self: -
+            Represents this object.
+        :param batch: (List[Tuple[String, Tuple, asyncio.Future]]) -
+            Represents the (sql, parameters, future) of each write.
+
+        :return: (None)
+        '''
+
+        async with self.lock:
+            try:
+                async with self.connection.cursor() as cursor:
+                    errors = await self.execute(cursor, batch)
+                await self.connection.commit()
+            except Exception as exc:
+                logger.warning(
+                    f'Unable to commit {len(batch)} writes: '
+                    f'{type(exc).__name__}: {exc}'
+                )
+                if self.connection.in_transaction:
+                    await self.connection.rollback()
+                errors = dict.fromkeys(range(len(batch)), exc)
+
+        self.resolve(batch, errors)
+
+
+    def resolve(
+        self,
+        batch: List[Tuple[str, tuple, asyncio.Future]],
+        errors: Dict[int, Exception]
+    ) -> None:
+        '''
+        Resolves the future of each write in a finished batch.
+
+        :param self: -
+            Represents this object.
+        :param batch: (List[Tuple[String, Tuple, asyncio.Future]]) -
+            Represents the (sql, parameters, future) of each write.
+        :param errors: (Dictionary[Integer, Exception]) -
+            Represents the error of each write which failed, by its index.
+
+        :return: (None)
+        '''
+
+        self.batches += 1
+        self.writes += len(batch)
+        for index, (_, _, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(None)
+
+
+    async def flush(self) -> None:
+        '''
+        Waits until every write queued so far has been committed.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        if self.pending:
+            await asyncio.gather(
+                *[future for _, _, future in self.pending],
+                return_exceptions=True
+            )
+
+
+    async def close(self) -> None:
+        '''
+        Commits every pending write and stops the flushing task.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.closed = True
+        self.ready.set()
+        self.full.set()
+        await self.task
+
+
+class ConnectionPool:
+    '''
+    A class which owns one writer connection and a pool of read-only
+    connections to the Runebot database.
+
+    Writes go through `transaction()` (or the write queue, via `write()`),
+    which hold the writer's lock for the whole transaction.
+    '''
+
+    def __init__(
+        self,
+        path: str,
+        readers: int = 4,
+        mmap_size: int = 268435456,
+        cache_size: int = -16384,
+        write_interval: float = 0.01,
+        write_batch: int = 100
+    ) -> None:
+        '''
+        Initialises a new instance of the ConnectionPool class. No
+        connections are opened until `open` is called.
+
+        :param self: -
+            Represents this object.
+        :param path: (String) -
+            Represents the path of the database file.
+        :param readers: (Optional[Integer]) -
+            Represents the number of read-only connections.
+        :param mmap_size: (Optional[Integer]) -
+            Represents the number of bytes of the database memory-mapped by
+            each connection.
+        :param cache_size: (Optional[Integer]) -
+            Represents the page cache of each connection (in pages, or in
+            KiB if negative.)
+        :param write_interval: (Optional[Float]) -
+            Represents how long (in seconds) queued writes are collected
+            for before being committed.
+        :param write_batch: (Optional[Integer]) -
+            Represents the number of queued writes committed at once.
+
+        :return: (None)
+        '''
+
+        self.path = path
+        self.readers = readers
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.write_interval = write_interval
+        self.write_batch = write_batch
+        self.writer: aiosqlite.Connection = None
+        self.lock: asyncio.Lock = None
+        self.writes: WriteQueue = None
+        self.connections: List[aiosqlite.Connection] = []
+        self.idle: asyncio.Queue = None
+
+
+    async def open(self) -> 'ConnectionPool':
+        '''
+        Opens the writer connection (switching the database to WAL mode),
+        its write queue, and then every reader connection.
+
+        :param self: -
+            Represents this object.
+
+        :return: (ConnectionPool) -
+            This pool.
+        '''
+
+        self.writer = await aiosqlite.connect(self.path)
+        await self.writer.execute('PRAGMA journal_mode = WAL')
+        await self.writer.execute('PRAGMA synchronous = NORMAL')
+        await self.configure(self.writer)
+        self.lock = asyncio.Lock()
+        self.writes = WriteQueue(
+            self.writer,
+            self.lock,
+            self.write_interval,
+            self.write_batch
+        )
+
+        self.idle = asyncio.Queue()
+        uri = f'{Path(self.path).resolve().as_uri()}?mode=ro'
+        for _ in range(self.readers):
+            reader = await aiosqlite.connect(uri, uri=True)
+            await self.configure(reader)
+            self.connections.append(reader)
+            self.idle.put_nowait(reader)
+        return self
+
+
+    async def configure(self, connection: aiosqlite.Connection) -> None:
+        '''
+        Applies the per-connection pragmas to a connection.
+
+        :param self: -
+            Represents this object.
+        :param connection: (aiosqlite.Connection) -
+            Represents the connection to configure.
+
+        :return: (None)
+        '''
+
+        await connection.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        await connection.execute(f'PRAGMA cache_size = {int(self.cache_size)}')
+        await connection.execute('PRAGMA busy_timeout = 5000')
+        await connection.execute('PRAGMA temp_store = MEMORY')
+
+
+    @asynccontextmanager
+    async def transaction(self, drain: bool = False) -> AsyncIterator[aiosqlite.Cursor]:
+        '''
+        Holds the writer's lock and yields a cursor on the writer. The
+        transaction is committed once the block exits, or rolled back if
+        it raises, before the lock is released.
+
+        :param self: -
+            Represents this object.
+        :param drain: (Optional[Boolean]) -
+            Whether to run every queued write first, in the same
+            transaction, so the block sees (and can't be overtaken by)
+            them. If the transaction is rolled back, they're queued again.
+
+        :return: (AsyncIterator[aiosqlite.Cursor]) -
+            A cursor on the writer connection.
+        '''
+
+        async with self.lock:
+            batch = self.writes.take() if drain else []
+            try:
+                async with self.writer.cursor() as cursor:
+                    errors = await self.writes.execute(cursor, batch)
+                    yield cursor
+                await self.writer.commit()
+            except BaseException:
+                if self.writer.in_transaction:
+                    await self.writer.rollback()
+                self.writes.requeue(batch)
+                raise
+
+        if batch:
+            self.writes.resolve(batch, errors)
+
+
+    def write(self, sql: str, parameters: tuple = ()) -> asyncio.Future:
+        '''
+        Queues a write to be group-committed on the writer connection.
+
+        :param self: -
+            Represents this object.
+        :param sql: (String) -
+            Represents the statement.
+        :param parameters: (Optional[Tuple]) -
+            Represents the statement's parameters.
+
+        :return: (asyncio.Future) -
+            A future which resolves once the write is committed.
+        '''
+
+        return self.writes.submit(sql, parameters)
+
+
+    @asynccontextmanager
+    async def read_cursor(self) -> AsyncIterator[aiosqlite.Cursor]:
+        '''
+        Borrows an idle reader connection and yields a cursor on it. The
+        connection is returned to the pool once the block exits. Falls
+        back to the writer if the pool has no readers.
+
+        :param self: -
+            Represents this object.
+
+        :return: (AsyncIterator[aiosqlite.Cursor]) -
+            A read-only cursor.
+        '''
+
+        if not self.connections:
+            async with self.lock:
+                async with self.writer.cursor() as cursor:
+                    yield cursor
+            return
+
+        reader = await self.idle.get()
+        try:
+            async with reader.cursor() as cursor:
+                yield cursor
+        finally:
+            self.idle.put_nowait(reader)
+
+
+    async def close(self) -> None:
+        '''
+        Commits every queued write, then closes every reader connection
+        and the writer (which checkpoints the WAL.)
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        if self.writes is not None:
+            await self.writes.close()
+            self.writes = None
+        for reader in self.connections:
+            await reader.close()
+        self.connections.clear()
+        if self.writer is not None:
+            await self.writer.close()
+            self.writer = None
@@ -4,15 +4,48 @@
 This module contains database logic for managing data and interacting
 with the SQLite Runebot database.
 
+`self.bot.runebotdb` is a `ConnectionPool` (see `utils.connection`):
+writes either run in a transaction on its writer connection
+(`transaction()`, committed once the block exits) or are group-committed
+through its write queue (`write()`), and lookups borrow one of its
+read-only connections (`read_cursor()`).
+
 Functions:
     - `add_guild()`:
             Adds a new guild to the 'all_guilds' table.
-    - `add_username()`:
-            Adds a new username to the 'all_users' table.
     - `get_all_articles()`:
             Retrieves all articles from the `all_articles` table.
+    - `get_all_articles_by_category()`:
+            Retrieves all articles and their categories from the
+            `all_articles` table.
     - `get_all_guilds()`:
             Retrieves all guilds from the `all_guilds` table.
+    - `get_all_guild_settings()`:
+            Retrieves the settings of every guild from the `all_guilds`
+            table.
+    - `get_all_items()`:
+            Retrieves the id and icon URL of every item in the `items` table.
+    - `get_all_thumbnail_urls()`:
+            Retrieves every image URL in the `thumbnail_colours` table.
+    - `get_all_usernames()`:
+            Retrieves every saved username (and account type) from the
+            `all_users` table.
+    - `get_cached_graph()`:
+            Retrieves a rendered price graph from the `graph_cache` table.
+    - `get_cached_page()`:
+            Retrieves a page (by canonical title or alias) from the
+            `page_cache` table.
+    - `get_hiscore_snapshots()`:
+            Retrieves the snapshots of a player needed to rebuild their
+            experience from a given time onwards.
+    - `get_item()`:
+            Retrieves an item (by name) from the `items` table.
+    - `get_thumbnail_colour()`:
+            Retrieves the dominant colour of an image from the
+            `thumbnail_colours` table.
+    - `get_recent_cached_pages()`:
+            Retrieves the most recently validated pages from the
+            `page_cache` table.
     - `get_suggestions()`:
             Returns all tradeable item autocomplete suggestions.
     - `get_wikipedia_suggestions()`:
@@ -20,10 +53,42 @@ Functions:
     - `get_colour_mode()`:
             Checks whether `colour_mode` is set to True/False with a given guild
             identifier.
+    - `migrate_database()`:
+            Applies every pending schema migration to the database.
+    - `prune_cached_graphs()`:
+            Removes graphs rendered before a given runeday from the
+            `graph_cache` table.
+    - `prune_cached_pages()`:
+            Removes expired pages from the `page_cache` table.
+    - `prune_hiscore_snapshots()`:
+            Removes expired snapshots from the `hiscore_snapshots` table.
+    - `reconcile_guilds()`:
+            Adds and removes guilds joined or left while the bot was
+            offline.
     - `remove_guild()`:
             Removes a guild from the `all_guilds` table.
     - `remove_username()`:
             Removes a username from the `all_users` table.
+    - `replace_items()`:
+            Replaces every item in the `items` table.
+    - `save_cached_graph()`:
+            Saves a rendered price graph to the `graph_cache` table.
+    - `save_cached_page()`:
+            Saves a (zlib-compressed) page to the `page_cache` table.
+    - `save_hiscore_snapshot()`:
+            Saves a snapshot of a player's experience to the
+            `hiscore_snapshots` table.
+    - `save_thumbnail_colour()`:
+            Saves the dominant colour of an image to the
+            `thumbnail_colours` table.
+    - `save_thumbnail_colours()`:
+            Saves the dominant colours of many images to the
+            `thumbnail_colours` table (in a single transaction.)
+    - `touch_cached_page()`:
+            Updates the fetch time and validators of a revalidated page.
+    - `upsert_username()`:
+            Saves (or replaces) the username of a user in the `all_users`
+            table.
     - `update_colour_mode()`:
             Toggles `colour_mode` for a given guild.
 
@@ -34,14 +99,172 @@ For more information about each function and its usage, refer to the
 docstrings.
 '''
 
-from typing import List, Optional
+import time
+import zlib
+from typing import List, Optional, Set, Tuple
+
+from utils.cache import CachedPage
+from utils.search import normalise_name
+
+# The schema migrations, in order. Migration N (1-indexed) upgrades a
+# database from `PRAGMA user_version` N - 1 to N, and is applied in a
+# single transaction. Existing migrations must never be edited: schema
+# changes are made by appending a new one.
+MIGRATIONS = [
+    # 1: The baseline schema.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS all_articles (
+            article_title TEXT NOT NULL,
+            article_category TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS all_guilds (
+            guild_id INTEGER NOT NULL,
+            guild_owner_id INTEGER NOT NULL,
+            colour_mode BOOLEAN NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS all_users (
+            user_id INTEGER NOT NULL,
+            username STRING NOT NULL,
+            account_type STRING NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS page_cache (
+            page_key TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS page_aliases (
+            alias TEXT PRIMARY KEY,
+            page_key TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS graph_cache (
+            item_id INTEGER NOT NULL,
+            runeday INTEGER NOT NULL,
+            graph BLOB NOT NULL,
+            PRIMARY KEY (item_id, runeday)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS thumbnail_colours (
+            image_url TEXT PRIMARY KEY,
+            red INTEGER NOT NULL,
+            green INTEGER NOT NULL,
+            blue INTEGER NOT NULL,
+            extracted_at REAL NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS items (
+            item_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            normalised_name TEXT NOT NULL,
+            value INTEGER,
+            highalch INTEGER,
+            lowalch INTEGER,
+            buy_limit INTEGER,
+            members BOOLEAN,
+            icon_url TEXT,
+            examine TEXT
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS items_normalised_name
+        ON items (normalised_name)
+        '''
+    ],
+    # 2: Keys and indexes for the guild, user and article tables. Tables
+    # are rebuilt (keeping the latest of any duplicate rows), since SQLite
+    # can't add a key to an existing table.
+    [
+        '''
+        CREATE TABLE all_articles_new (
+            article_title TEXT PRIMARY KEY,
+            article_category TEXT NOT NULL
+        )
+        ''',
+        '''
+        INSERT INTO all_articles_new (article_title, article_category)
+        SELECT article_title, article_category FROM all_articles
+        WHERE rowid IN (
+            SELECT MAX(rowid) FROM all_articles GROUP BY article_title
+        )
+        ''',
+        'DROP TABLE all_articles',
+        'ALTER TABLE all_articles_new RENAME TO all_articles',
+        '''
+        CREATE INDEX all_articles_category
+        ON all_articles (article_category)
+        ''',
+        '''
+        CREATE TABLE all_guilds_new (
+            guild_id INTEGER PRIMARY KEY,
+            guild_owner_id INTEGER NOT NULL,
+            colour_mode BOOLEAN NOT NULL
+        )
+        ''',
+        '''
+        INSERT INTO all_guilds_new (guild_id, guild_owner_id, colour_mode)
+        SELECT guild_id, guild_owner_id, colour_mode FROM all_guilds
+        WHERE rowid IN (
+            SELECT MAX(rowid) FROM all_guilds GROUP BY guild_id
+        )
+        ''',
+        'DROP TABLE all_guilds',
+        'ALTER TABLE all_guilds_new RENAME TO all_guilds',
+        '''
+        CREATE TABLE all_users_new (
+            user_id INTEGER NOT NULL,
+            username STRING NOT NULL,
+            account_type STRING NOT NULL,
+            UNIQUE (user_id)
+        )
+        ''',
+        '''
+        INSERT INTO all_users_new (user_id, username, account_type)
+        SELECT user_id, username, account_type FROM all_users
+        WHERE rowid IN (
+            SELECT MAX(rowid) FROM all_users GROUP BY user_id
+        )
+        ''',
+        'DROP TABLE all_users',
+        'ALTER TABLE all_users_new RENAME TO all_users'
+    ],
+    # 3: Snapshots of every saved player's skill experience, for `/gains`.
+    # Each row is either a keyframe (the experience itself) or the change
+    # since the previous row, encoded by `utils.tracker`.
+    [
+        '''
+        CREATE TABLE hiscore_snapshots (
+            username TEXT NOT NULL,
+            account_type TEXT NOT NULL,
+            taken_at INTEGER NOT NULL,
+            keyframe BOOLEAN NOT NULL,
+            experience BLOB NOT NULL,
+            PRIMARY KEY (username, account_type, taken_at)
+        ) WITHOUT ROWID
+        '''
+    ]
+]
 
 
 async def add_guild(
     self,
     guild_id: int,
     guild_owner_id: int,
-    toggle: bool
+    toggle: bool,
+    wait: bool = True
 ) -> None:
     '''
     Database function which adds a new guild to the 'all_guilds' table.
@@ -54,96 +277,370 @@ async def add_guild(
         Represents the guild owner id.
     :param toggle: (Boolean) -
         Represents the colour mode toggle. (Default: True)
+    :param wait: (Optional[Boolean]) -
+        Whether to wait until the change is committed. (Default: True)
 
     :return: (None)
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
+    write = self.bot.runebotdb.write(
+        '''
+        INSERT OR REPLACE INTO all_guilds (
+            guild_id,
+            guild_owner_id,
+            colour_mode
+        )
+        VALUES (?, ?, ?)
+        ''',
+        (guild_id, guild_owner_id, toggle,)
+    )
+    if wait:
+        await write
+
+    self.bot.guild_settings.store(guild_id, toggle)
+
+
+async def get_all_articles(self) -> List[str]:
+    '''
+    Database function which retrieves all articles from the
+    `all_articles` table.
+
+    :param self: -
+        Represents this object.
+
+    :return: (List[String]) -
+        A list of all article titles.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute('SELECT article_title FROM all_articles')
+        article_titles = [article[0] for article in await cursor.fetchall()]
+        return article_titles
+
+
+async def get_all_articles_by_category(self) -> List[Tuple[str, str]]:
+    '''
+    Database function which retrieves all articles and their categories
+    from the `all_articles` table (used to build the article index.)
+
+    :param self: -
+        Represents this object.
+
+    :return: (List[Tuple[String, String]]) -
+        A list of (article_title, article_category) tuples.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute(
+            'SELECT article_title, article_category FROM all_articles'
+        )
+        return list(await cursor.fetchall())
+
+
+async def get_all_guilds(self) -> List[str]:
+    '''
+    Database function which retrieves all guilds from the
+    `all_guilds` table.
+
+    :param self: -
+        Represents this object.
+
+    :return: (List[String]) -
+        A list of all guild IDs.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute('SELECT guild_id FROM all_guilds')
+        guild_ids = [str(guild_ids) for guild_ids in await cursor.fetchall()]
+        return guild_ids
+
+
+async def get_all_guild_settings(self) -> List[Tuple[int, bool]]:
+    '''
+    Database function which retrieves the settings of every guild from
+    the `all_guilds` table (used to load the guild settings.)
+
+    :param self: -
+        Represents this object.
+
+    :return: (List[Tuple[Integer, Boolean]]) -
+        A list of (guild_id, colour_mode) tuples.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute('SELECT guild_id, colour_mode FROM all_guilds')
+        return list(await cursor.fetchall())
+
+
+async def get_cached_graph(
+    self,
+    item_id: int,
+    runeday: int
+) -> Optional[bytes]:
+    '''
+    Database function which retrieves a rendered price graph from the
+    `graph_cache` table.
+
+    :param self: -
+        Represents this object.
+    :param item_id: (Integer) -
+        Represents the item id.
+    :param runeday: (Integer) -
+        Represents the runeday the graph was rendered for.
+
+    :return: (Optional[Bytes]) -
+        The graph (as a PNG), or None if it isn't stored.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
         await cursor.execute(
             '''
-            INSERT INTO all_guilds (
-                guild_id,
-                guild_owner_id,
-                colour_mode
+            SELECT graph FROM graph_cache WHERE item_id = ? AND runeday = ?
+            ''',
+            (item_id, runeday,)
+        )
+        graph = await cursor.fetchone()
+        return graph[0] if graph else None
+
+
+async def get_cached_page(self, query: str) -> Optional[CachedPage]:
+    '''
+    Database function which retrieves a page from the `page_cache` table
+    by its canonical title or by any query which resolved to it.
+
+    :param self: -
+        Represents this object.
+    :param query: (String) -
+        Represents the slugified query or canonical title.
+
+    :return: (Optional[CachedPage]) -
+        The decompressed page, or None if it isn't stored.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute(
+            '''
+            SELECT page_key, body, etag, last_modified, fetched_at
+            FROM page_cache WHERE page_key = COALESCE(
+                (SELECT page_key FROM page_aliases WHERE alias = ?), ?
             )
-            VALUES (?, ?, ?)
             ''',
-            (guild_id, guild_owner_id, toggle,)
+            (query, query,)
         )
+        page = await cursor.fetchone()
+        if page is None:
+            return None
 
-        return await self.bot.runebotdb.commit()
+        await cursor.execute(
+            'SELECT alias FROM page_aliases WHERE page_key = ?',
+            (page[0],)
+        )
+        aliases = [alias[0] for alias in await cursor.fetchall()]
+
+    page_key, body, etag, last_modified, fetched_at = page
+    return CachedPage(
+        page_key,
+        zlib.decompress(body),
+        etag,
+        last_modified,
+        fetched_at,
+        aliases
+    )
 
 
-async def add_username(
+async def get_hiscore_snapshots(
     self,
-    user_id: int,
     username: str,
-    account_type: str
-) -> None:
+    account_type: str,
+    since: int
+) -> List[Tuple[int, bool, bytes]]:
     '''
-    Database function which adds a new user to the `all_users`
-    table.
+    Database function which retrieves a player's snapshots from the last
+    keyframe taken at (or before) `since` onwards, which is every row
+    needed to rebuild their experience from then until now.
 
     :param self: -
         Represents this object.
-    :param user_id: (Integer) -
-        Represents a user id.
     :param username: (String) -
-        Represents a player's username.
-
-    :return: (None)
+        Represents the normalised username.
+    :param account_type: (String) -
+        Represents an account type (Ex: Ironman, 1 Defence etc.)
+    :param since: (Integer) -
+        Represents the earliest time (Unix seconds) of interest.
+
+    :return: (List[Tuple[Integer, Boolean, Bytes]]) -
+        A list of (taken_at, keyframe, experience) tuples, oldest first.
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
+    async with self.bot.runebotdb.read_cursor() as cursor:
         await cursor.execute(
             '''
-            INSERT INTO all_users (
-                user_id,
-                username,
-                account_type
+            SELECT taken_at, keyframe, experience FROM hiscore_snapshots
+            WHERE username = ? AND account_type = ? AND taken_at >= COALESCE(
+                (
+                    SELECT MAX(taken_at) FROM hiscore_snapshots
+                    WHERE username = ? AND account_type = ? AND keyframe
+                    AND taken_at <= ?
+                ),
+                0
             )
-            VALUES (?, ?, ?)
+            ORDER BY taken_at
             ''',
-            (user_id, username, account_type,)
+            (username, account_type, username, account_type, since,)
         )
+        return await cursor.fetchall()
 
-        return await self.bot.runebotdb.commit()
 
+async def get_item(self, name: str) -> Optional[dict]:
+    '''
+    Database function which retrieves an item from the `items` table by
+    its (normalised) name.
 
-async def get_all_articles(self) -> List[str]:
+    :param self: -
+        Represents this object.
+    :param name: (String) -
+        Represents the item name. (Ex: 'Abyssal whip'.)
+
+    :return: (Optional[Dictionary]) -
+        The item's row as a dictionary, or None if it isn't in the table.
     '''
-    Database function which retrieves all articles from the
-    `all_articles` table.
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute(
+            '''
+            SELECT * FROM items WHERE normalised_name = ?
+            ORDER BY item_id LIMIT 1
+            ''',
+            (normalise_name(name),)
+        )
+        item = await cursor.fetchone()
+        if item is None:
+            return None
+        return {
+            column[0]: value
+            for column, value in zip(cursor.description, item)
+        }
+
+
+async def get_thumbnail_colour(
+    self,
+    image_url: str
+) -> Optional[Tuple[int, int, int]]:
+    '''
+    Database function which retrieves the dominant colour of an image from
+    the `thumbnail_colours` table.
 
     :param self: -
         Represents this object.
+    :param image_url: (String) -
+        Represents the normalised image URL.
 
-    :return: (List[String]) -
-        A list of all article titles.
+    :return: (Optional[Tuple[Integer, Integer, Integer]]) -
+        The RGB colour, or None if it isn't stored.
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
-        await cursor.execute('SELECT article_title FROM all_articles')
-        article_titles = [article[0] for article in await cursor.fetchall()]
-        return article_titles
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute(
+            '''
+            SELECT red, green, blue FROM thumbnail_colours WHERE image_url = ?
+            ''',
+            (image_url,)
+        )
+        colour = await cursor.fetchone()
+        return tuple(colour) if colour else None
 
 
-async def get_all_guilds(self) -> List[str]:
+async def get_recent_cached_pages(self, limit: int) -> List[CachedPage]:
     '''
-    Database function which retrieves all guilds from the
-    `all_guilds` table.
+    Database function which retrieves the most recently validated pages
+    from the `page_cache` table (used to pre-warm the page cache.)
 
     :param self: -
         Represents this object.
+    :param limit: (Integer) -
+        Represents the maximum number of pages to retrieve.
 
-    :return: (List[String]) -
-        A list of all guild IDs.
+    :return: (List[CachedPage]) -
+        The decompressed pages, least recently validated first.
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
-        await cursor.execute('SELECT guild_id FROM all_guilds')
-        guild_ids = [str(guild_ids) for guild_ids in await cursor.fetchall()]
-        return guild_ids
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute(
+            '''
+            SELECT page_key, body, etag, last_modified, fetched_at
+            FROM page_cache ORDER BY fetched_at DESC LIMIT ?
+            ''',
+            (limit,)
+        )
+        pages = list(reversed(await cursor.fetchall()))
+
+        await cursor.execute('SELECT alias, page_key FROM page_aliases')
+        aliases = {}
+        for alias, page_key in await cursor.fetchall():
+            aliases.setdefault(page_key, []).append(alias)
+
+    return [
+        CachedPage(
+            page_key,
+            zlib.decompress(body),
+            etag,
+            last_modified,
+            fetched_at,
+            aliases.get(page_key, ())
+        )
+        for page_key, body, etag, last_modified, fetched_at in pages
+    ]
+
+
+async def get_all_items(self) -> List[Tuple[int, Optional[str]]]:
+    '''
+    Database function which retrieves the id and icon URL of every item
+    in the `items` table.
+
+    :param self: -
+        Represents this object.
+
+    :return: (List[Tuple[Integer, Optional[String]]]) -
+        A list of (item_id, icon_url) tuples.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute('SELECT item_id, icon_url FROM items')
+        return list(await cursor.fetchall())
+
+
+async def get_all_thumbnail_urls(self) -> Set[str]:
+    '''
+    Database function which retrieves every (normalised) image URL in the
+    `thumbnail_colours` table.
+
+    :param self: -
+        Represents this object.
+
+    :return: (Set[String]) -
+        A set of image URLs which already have a colour.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute('SELECT image_url FROM thumbnail_colours')
+        return {image_url[0] for image_url in await cursor.fetchall()}
+
+
+async def get_all_usernames(self) -> List[Tuple[str, str]]:
+    '''
+    Database function which retrieves every saved username (and account
+    type) from the `all_users` table.
+
+    :param self: -
+        Represents this object.
+
+    :return: (List[Tuple[String, String]]) -
+        A list of (username, account_type) tuples.
+    '''
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute('SELECT username, account_type FROM all_users')
+        return await cursor.fetchall()
 
 
 async def get_suggestions(self, categories: list) -> None:
@@ -160,7 +657,7 @@ async def get_suggestions(self, categories: list) -> None:
         A flattened list of article suggestions.
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
+    async with self.bot.runebotdb.read_cursor() as cursor:
         autocomplete_suggestions = []
 
         for category in categories:
@@ -191,7 +688,7 @@ async def get_wikipedia_suggestions(self) -> List[str]:
         A list of article suggestions.
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
+    async with self.bot.runebotdb.read_cursor() as cursor:
         await cursor.execute(
             '''
             SELECT article_title FROM all_articles WHERE article_category != ?
@@ -205,42 +702,30 @@ async def get_wikipedia_suggestions(self) -> List[str]:
         return autocomplete_suggestions
 
 
-async def get_colour_mode(self, guild_id: int, guild_owner_id: int) -> bool:
+async def get_colour_mode(self, guild_id: int) -> bool:
     '''
     Database function which checks whether `colour_mode` is set to True/False
-    with a given guild identifier.
+    with a given guild identifier. Answered from the guild settings, which
+    `reconcile_guilds` keeps in step with the guilds the bot is in.
 
     :param self: -
         Represents this object.
     :param guild_id: (Integer) -
         Represents the guild id.
-    :param guild_owner_id: (Integer) -
-        Represents the owner's id of the guild.
 
     :return: (Boolean) -
-        The colour mode value for the specified guild.
+        The colour mode value for the specified guild (True if the guild
+        isn't known yet.)
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
-        try:
-            await cursor.execute(
-                '''
-                SELECT colour_mode FROM all_guilds WHERE guild_id = ?
-                ''',
-                (guild_id,)
-            )
-
-            colour_mode = await cursor.fetchone()
-            if colour_mode[0]:
-                return True
-            return False
-
-        except TypeError:
-            await add_guild(self, guild_id, guild_owner_id, True)
-            return True
+    colour_mode = self.bot.guild_settings.colour_mode(guild_id)
+    return True if colour_mode is None else colour_mode
 
 
-async def get_username(self, user_id: int) -> Optional[str]:
+async def get_username(
+    self,
+    user_id: int
+) -> Tuple[Optional[str], Optional[str]]:
     '''
     Database function which retrieves a username with a given user_id.
 
@@ -249,25 +734,207 @@ async def get_username(self, user_id: int) -> Optional[str]:
     :param user_id: (Integer) -
         Represents a user id.
 
-    :return: (Optional[String]) -
-        The respective username of the Discord user_id.
+    :return: (Tuple[Optional[String], Optional[String]]) -
+        The respective username and account type of the Discord user_id,
+        or (None, None) if they haven't saved one.
     '''
-    async with self.bot.runebotdb.cursor() as cursor:
-        try:
-            await cursor.execute(
-                '''
-                SELECT username, account_type FROM all_users WHERE user_id = ?
-                ''',
-                (user_id,)
+
+    user = self.bot.user_cache.lookup(user_id)
+    if user is not None:
+        return user
+
+    async with self.bot.runebotdb.read_cursor() as cursor:
+        await cursor.execute(
+            '''
+            SELECT username, account_type FROM all_users WHERE user_id = ?
+            ''',
+            (user_id,)
+        )
+        user = await cursor.fetchone()
+
+    username, account_type = user if user else (None, None)
+    self.bot.user_cache.fill(user_id, username, account_type)
+    return username, account_type
+
+
+async def migrate_database(self) -> int:
+    '''
+    Database function which brings the Runebot database up to the latest
+    schema, applying every migration newer than its `PRAGMA user_version`.
+
+    :param self: -
+        Represents this object.
+
+    :return: (Integer) -
+        The schema version of the database.
+    '''
+
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute('PRAGMA user_version')
+        version = (await cursor.fetchone())[0]
+
+    # DDL doesn't open a transaction implicitly, so each migration is
+    # wrapped in an explicit one (holding the writer's lock throughout.)
+    for target in range(version + 1, len(MIGRATIONS) + 1):
+        async with self.bot.runebotdb.transaction() as cursor:
+            await cursor.execute('BEGIN')
+            for statement in MIGRATIONS[target - 1]:
+                await cursor.execute(statement)
+            await cursor.execute(f'PRAGMA user_version = {target}')
+        version = target
+
+    return version
+
+
+async def prune_cached_graphs(self, runeday: int) -> None:
+    '''
+    Database function which removes graphs rendered before a given runeday
+    from the `graph_cache` table.
+
+    :param self: -
+        Represents this object.
+    :param runeday: (Integer) -
+        Represents the runeday of the latest Grand Exchange update.
+
+    :return: (None)
+    '''
+
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute(
+            'DELETE FROM graph_cache WHERE runeday < ?',
+            (runeday,)
+        )
+
+
+async def prune_cached_pages(self, max_age: float) -> None:
+    '''
+    Database function which removes pages (and their aliases) which
+    haven't been validated within `max_age` seconds from the `page_cache`
+    table.
+
+    :param self: -
+        Represents this object.
+    :param max_age: (Float) -
+        Represents the maximum age (in seconds) of a stored page.
+
+    :return: (None)
+    '''
+
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute(
+            'DELETE FROM page_cache WHERE fetched_at < ?',
+            (time.time() - max_age,)
+        )
+        await cursor.execute(
+            '''
+            DELETE FROM page_aliases WHERE page_key NOT IN (
+                SELECT page_key FROM page_cache
+            )
+            '''
+        )
+
+
+async def prune_hiscore_snapshots(self, max_age: float) -> int:
+    '''
+    Database function which removes snapshots older than `max_age` seconds
+    from the `hiscore_snapshots` table. Each player's last keyframe before
+    the cutoff (and the rows after it) are kept, so their experience at
+    the cutoff can still be rebuilt.
+
+    :param self: -
+        Represents this object.
+    :param max_age: (Float) -
+        Represents the maximum age (in seconds) of a stored snapshot.
+
+    :return: (Integer) -
+        The number of snapshots removed.
+    '''
+
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute(
+            '''
+            SELECT username, account_type, MAX(taken_at)
+            FROM hiscore_snapshots
+            WHERE keyframe AND taken_at <= ?
+            GROUP BY username, account_type
+            ''',
+            (int(time.time() - max_age),)
+        )
+        cutoffs = await cursor.fetchall()
+        await cursor.executemany(
+            '''
+            DELETE FROM hiscore_snapshots
+            WHERE username = ? AND account_type = ? AND taken_at < ?
+            ''',
+            cutoffs
+        )
+        removed = cursor.rowcount
+
+    return removed
+
+
+async def reconcile_guilds(
+    self,
+    guilds: List[Tuple[int, int]]
+) -> Tuple[int, int]:
+    '''
+    Database function which brings the `all_guilds` table in line with the
+    guilds the bot is in, adding guilds joined (and removing guilds left)
+    while it was offline, in a single transaction. Queued guild writes are
+    run first in the same transaction, and writes queued meanwhile wait
+    for it, so none of them are overwritten or interleaved. The guild
+    settings are updated with the changes.
+
+    :param self: -
+        Represents this object.
+    :param guilds: (List[Tuple[Integer, Integer]]) -
+        Represents the (guild_id, guild_owner_id) of every guild the bot
+        is in.
+
+    :return: (Tuple[Integer, Integer]) -
+        The number of guilds added and removed.
+    '''
+
+    owners = dict(guilds)
+    async with self.bot.runebotdb.transaction(drain=True) as cursor:
+        await cursor.execute('SELECT guild_id, colour_mode FROM all_guilds')
+        stored = dict(await cursor.fetchall())
+
+        joined = [
+            (guild_id, owners[guild_id], True)
+            for guild_id in owners.keys() - stored
+        ]
+        left = [(guild_id,) for guild_id in stored - owners.keys()]
+        await cursor.executemany(
+            '''
+            INSERT OR REPLACE INTO all_guilds (
+                guild_id,
+                guild_owner_id,
+                colour_mode
             )
-            username, account_type = await cursor.fetchone()
-            return username, account_type
+            VALUES (?, ?, ?)
+            ''',
+            joined
+        )
+        await cursor.executemany(
+            'DELETE FROM all_guilds WHERE guild_id = ?',
+            left
+        )
 
-        except TypeError:
-            return None, None
+    # Only the changes are applied, so settings changed while the
+    # transaction was running aren't replaced by the snapshot.
+    for guild_id, _, toggle in joined:
+        self.bot.guild_settings.store(guild_id, toggle)
+    for (guild_id,) in left:
+        self.bot.guild_settings.discard(guild_id)
+    return len(joined), len(left)
 
 
-async def remove_guild(self, guild_id: int) -> None:
+async def remove_guild(
+    self,
+    guild_id: int,
+    wait: bool = True
+) -> None:
     '''
     Database function which removes a guild from the `all_guilds` table.
 
@@ -275,45 +942,358 @@ async def remove_guild(self, guild_id: int) -> None:
         Represents this object.
     :param guild_id: (Integer) -
         Represents the guild id.
+    :param wait: (Optional[Boolean]) -
+        Whether to wait until the change is committed. (Default: True)
+
+    :return: (None)
+    '''
+
+    write = self.bot.runebotdb.write(
+        '''
+        DELETE FROM all_guilds WHERE guild_id = ?
+        ''',
+        (guild_id,)
+    )
+    if wait:
+        await write
+
+    self.bot.guild_settings.discard(guild_id)
+
+
+async def remove_username(
+    self,
+    user_id: int,
+    wait: bool = True
+) -> None:
+    '''
+    Database function which removes a username from the `all_users` table.
+
+    :param self: -
+        Represents this object.
+    :param user_id: (Integer) -
+        Represents a user id.
+    :param wait: (Optional[Boolean]) -
+        Whether to wait until the change is committed. (Default: True)
+
+    :return: (None)
+    '''
+
+    write = self.bot.runebotdb.write(
+        '''
+        DELETE FROM all_users WHERE user_id = ?
+        ''',
+        (user_id,)
+    )
+    if wait:
+        await write
+
+    self.bot.user_cache.store(user_id, None, None)
+
+
+async def replace_items(self, items: List[tuple]) -> None:
+    '''
+    Database function which replaces every item in the `items` table (in
+    a single transaction.)
+
+    :param self: -
+        Represents this object.
+    :param items: (List[Tuple]) -
+        Represents the new rows (see `load_item_mapping`.)
 
     :return: (None)
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute('DELETE FROM items')
+        await cursor.executemany(
+            '''
+            INSERT OR REPLACE INTO items (
+                item_id,
+                name,
+                normalised_name,
+                value,
+                highalch,
+                lowalch,
+                buy_limit,
+                members,
+                icon_url,
+                examine
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            items
+        )
+
+
+async def save_cached_graph(
+    self,
+    item_id: int,
+    runeday: int,
+    graph: bytes
+) -> None:
+    '''
+    Database function which saves a rendered price graph to the
+    `graph_cache` table.
+
+    :param self: -
+        Represents this object.
+    :param item_id: (Integer) -
+        Represents the item id.
+    :param runeday: (Integer) -
+        Represents the runeday the graph was rendered for.
+    :param graph: (Bytes) -
+        Represents the graph (as a PNG.)
+
+    :return: (None)
+    '''
+
+    async with self.bot.runebotdb.transaction() as cursor:
         await cursor.execute(
             '''
-            DELETE FROM all_guilds WHERE guild_id = ?
+            INSERT OR REPLACE INTO graph_cache (item_id, runeday, graph)
+            VALUES (?, ?, ?)
             ''',
-            (guild_id,)
+            (item_id, runeday, graph,)
         )
 
-        return await self.bot.runebotdb.commit()
 
+async def save_cached_page(self, entry: CachedPage) -> None:
+    '''
+    Database function which saves a page (compressed with zlib) and its
+    aliases to the `page_cache` table.
+
+    :param self: -
+        Represents this object.
+    :param entry: (CachedPage) -
+        Represents the page to be saved.
 
-async def remove_username(self, user_id: int):
+    :return: (None)
     '''
-    Database function which removes a username from the `all_users` table.
+
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute(
+            '''
+            INSERT OR REPLACE INTO page_cache (
+                page_key,
+                body,
+                etag,
+                last_modified,
+                fetched_at
+            )
+            VALUES (?, ?, ?, ?, ?)
+            ''',
+            (
+                entry.key,
+                zlib.compress(entry.body),
+                entry.etag,
+                entry.last_modified,
+                entry.fetched_at,
+            )
+        )
+        await cursor.executemany(
+            '''
+            INSERT OR REPLACE INTO page_aliases (alias, page_key)
+            VALUES (?, ?)
+            ''',
+            [(alias, entry.key,) for alias in entry.aliases]
+        )
+
+
+async def save_hiscore_snapshot(
+    self,
+    username: str,
+    account_type: str,
+    taken_at: int,
+    keyframe: bool,
+    experience: bytes,
+    wait: bool = True
+) -> None:
+    '''
+    Database function which saves a snapshot of a player's experience to
+    the `hiscore_snapshots` table.
 
     :param self: -
         Represents this object.
-    :param user_id: (Integer) -
-        Represents a user id.
+    :param username: (String) -
+        Represents the normalised username.
+    :param account_type: (String) -
+        Represents an account type (Ex: Ironman, 1 Defence etc.)
+    :param taken_at: (Integer) -
+        Represents the time (Unix seconds) the snapshot was taken.
+    :param keyframe: (Boolean) -
+        Whether the snapshot holds the experience itself, rather than the
+        change since the previous snapshot.
+    :param experience: (Bytes) -
+        Represents the encoded experience (see `utils.tracker`.)
+    :param wait: (Optional[Boolean]) -
+        Whether to wait until the snapshot is committed. (Default: True)
+
+    :return: (None)
+    '''
+
+    write = self.bot.runebotdb.write(
+        '''
+        INSERT OR REPLACE INTO hiscore_snapshots (
+            username,
+            account_type,
+            taken_at,
+            keyframe,
+            experience
+        )
+        VALUES (?, ?, ?, ?, ?)
+        ''',
+        (username, account_type, taken_at, keyframe, experience,)
+    )
+    if wait:
+        await write
+
+
+async def save_thumbnail_colour(
+    self,
+    image_url: str,
+    colour: Tuple[int, int, int]
+) -> None:
+    '''
+    Database function which saves the dominant colour of an image to the
+    `thumbnail_colours` table.
+
+    :param self: -
+        Represents this object.
+    :param image_url: (String) -
+        Represents the normalised image URL.
+    :param colour: (Tuple[Integer, Integer, Integer]) -
+        Represents the RGB colour.
 
     :return: (None)
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
+    async with self.bot.runebotdb.transaction() as cursor:
         await cursor.execute(
             '''
-            DELETE FROM all_users WHERE user_id = ?
+            INSERT OR REPLACE INTO thumbnail_colours (
+                image_url,
+                red,
+                green,
+                blue,
+                extracted_at
+            )
+            VALUES (?, ?, ?, ?, ?)
             ''',
-            (user_id,)
+            (image_url, *colour, time.time(),)
         )
 
-        return await self.bot.runebotdb.commit()
 
+async def save_thumbnail_colours(
+    self,
+    colours: List[Tuple[str, Tuple[int, int, int]]]
+) -> None:
+    '''
+    Database function which saves the dominant colours of many images to
+    the `thumbnail_colours` table (in a single transaction.)
 
-async def update_colour_mode(self, guild_id: int, toggle: bool) -> None:
+    :param self: -
+        Represents this object.
+    :param colours: (List[Tuple[String, Tuple[Integer, Integer, Integer]]]) -
+        Represents a list of (normalised image URL, RGB colour) tuples.
+
+    :return: (None)
+    '''
+
+    extracted_at = time.time()
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.executemany(
+            '''
+            INSERT OR REPLACE INTO thumbnail_colours (
+                image_url,
+                red,
+                green,
+                blue,
+                extracted_at
+            )
+            VALUES (?, ?, ?, ?, ?)
+            ''',
+            [
+                (image_url, *colour, extracted_at,)
+                for image_url, colour in colours
+            ]
+        )
+
+
+async def touch_cached_page(self, entry: CachedPage) -> None:
+    '''
+    Database function which updates the fetch time and validators of a
+    revalidated (`304 Not Modified`) page in the `page_cache` table.
+
+    :param self: -
+        Represents this object.
+    :param entry: (CachedPage) -
+        Represents the revalidated page.
+
+    :return: (None)
+    '''
+
+    async with self.bot.runebotdb.transaction() as cursor:
+        await cursor.execute(
+            '''
+            UPDATE page_cache SET fetched_at = ?, etag = ?, last_modified = ?
+            WHERE page_key = ?
+            ''',
+            (entry.fetched_at, entry.etag, entry.last_modified, entry.key,)
+        )
+
+
+async def upsert_username(
+    self,
+    user_id: int,
+    username: str,
+    account_type: str,
+    wait: bool = True
+) -> None:
+    '''
+    Database function which saves a username (and account type) for a
+    user in the `all_users` table, replacing any username they had saved,
+    in a single statement.
+
+    :param self: -
+        Represents this object.
+    :param user_id: (Integer) -
+        Represents a user id.
+    :param username: (String) -
+        Represents a player's username.
+    :param account_type: (String) -
+        Represents an account type (Ex: Ironman, 1 Defence etc.)
+    :param wait: (Optional[Boolean]) -
+        Whether to wait until the change is committed. (Default: True)
+
+    :return: (None)
+    '''
+
+    write = self.bot.runebotdb.write(
+        '''
+        INSERT INTO all_users (
+            user_id,
+            username,
+            account_type
+        )
+        VALUES (?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET
+            username = excluded.username,
+            account_type = excluded.account_type
+        ''',
+        (user_id, username, account_type,)
+    )
+    if wait:
+        await write
+
+    self.bot.user_cache.store(user_id, username, account_type)
+
+
+async def update_colour_mode(
+    self,
+    guild_id: int,
+    toggle: bool,
+    wait: bool = True
+) -> None:
     '''
     Database function which toggles `colour_mode` for a given guild.
 
@@ -323,15 +1303,19 @@ async def update_colour_mode(self, guild_id: int, toggle: bool) -> None:
         Represents the guild id.
     :param toggle: (Boolean) -
         Represents the colour mode toggle.
+    :param wait: (Optional[Boolean]) -
+        Whether to wait until the change is committed. (Default: True)
 
     :return: (None)
     '''
 
-    async with self.bot.runebotdb.cursor() as cursor:
-        await cursor.execute(
-            '''
-            UPDATE all_guilds SET colour_mode = ? WHERE guild_id = ?
-            ''',
-            (toggle, guild_id,))
+    write = self.bot.runebotdb.write(
+        '''
+        UPDATE all_guilds SET colour_mode = ? WHERE guild_id = ?
+        ''',
+        (toggle, guild_id,)
+    )
+    if wait:
+        await write
 
-        return await self.bot.runebotdb.commit()
+    self.bot.guild_settings.store(guild_id, toggle)
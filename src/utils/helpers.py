@@ -11,8 +11,12 @@ Functions:
             Reads the configuration file (config.json) and returns its contents as a dictionary.
     - `extract_colour()`:
             Extracts the most frequent colour from an image with a given URL.
+    - `normalise_image_url()`:
+            Normalises an image URL into a stable thumbnail colour cache key.
     - `normalise_price()`:
             Reformats (normalises) price integers into RuneScape currency.
+    - `normalise_username()`:
+            Normalises a player's username into a stable Hiscores cache key.
     - `slugify()`:
             Replaces spaces with underscores in a search query for parsing purposes (URL formatting).
 
@@ -25,17 +29,20 @@ docstrings.
 
 import sys
 import os
-import io
 import json
+import re
+from urllib.parse import urlsplit, urlunsplit
 
 from typing import Optional, Tuple
-from urllib.request import Request, urlopen
 from loguru import logger
 from humanfriendly import format_timespan
 import disnake
-from colorthief import ColorThief as ColourThief
 
-from .database import get_colour_mode
+from .database import (
+    get_colour_mode,
+    get_thumbnail_colour,
+    save_thumbnail_colour
+)
 
 
 def convert_date_to_duration(date_1, date_2) -> str:
@@ -79,7 +86,6 @@ def configuration() -> dict:
 async def extract_colour(
     self,
     guild_id: int,
-    guild_owner_id: int,
     image_url: str,
     headers: str) -> Optional[Tuple[int, int, int]]:
     '''
@@ -87,12 +93,15 @@ async def extract_colour(
     a given URL, using color-thief-py.
     (https://github.com/fengsp/color-thief-py)
 
+    Colours are cached by normalised image URL (in memory and in the
+    `thumbnail_colours` table), so each image is only downloaded and
+    quantised once. Quantisation runs in the colour extraction process
+    pool, falling back to `og_blurple` if it exceeds its time budget.
+
     :param self: -
         Represents this object.
     :param guild_id: (Integer) -
         Represents the guild id.
-    :param guild_owner_id: (Integer) -
-        Represents the id of the guild owner.
     :param image_url: (String) -
         Represents the URL/to/image.
     :param headers: (String) -
@@ -104,15 +113,43 @@ async def extract_colour(
     '''
 
     if image_url:
-        colour_mode = await get_colour_mode(self, guild_id, guild_owner_id)
+        colour_mode = await get_colour_mode(self, guild_id)
         if colour_mode:
+            cache_key = normalise_image_url(image_url)
+            dominant_colour = self.bot.colour_cache.lookup(cache_key)
+            if dominant_colour is not None:
+                return dominant_colour
+
+            dominant_colour = await get_thumbnail_colour(self, cache_key)
+            if dominant_colour is not None:
+                self.bot.colour_cache.store(
+                    cache_key, dominant_colour, computed=False
+                )
+                return dominant_colour
+
             try:
-                request_image = Request(image_url, headers=headers)
-                open_image = urlopen(request_image)
-                image_data = io.BytesIO(open_image.read())
-                colour_thief = ColourThief(image_data)
-                dominant_colour = colour_thief.get_color(quality=1)
-                return (dominant_colour)
+                image = await self.bot.http_client.fetch(image_url, headers)
+                if not image.ok:
+                    # The default colour isn't cached, so the thumbnail is
+                    # fetched again next time.
+                    dominant_colour = None
+                    logger.warning(
+                        f'Unable to fetch the thumbnail ({image.status}.) '
+                        'Using the default colour.'
+                    )
+                else:
+                    dominant_colour = await self.bot.colour_extractor.extract(
+                        image.body
+                    )
+                    if dominant_colour is None:
+                        logger.warning(
+                            'Colour extraction exceeded its time budget (or the '
+                            'image was too large.) Using the default colour.'
+                        )
+                if dominant_colour is not None:
+                    self.bot.colour_cache.store(cache_key, dominant_colour)
+                    await save_thumbnail_colour(self, cache_key, dominant_colour)
+                    return (dominant_colour)
             except Exception:
                 logger.error(
                     'Empty pixels when quantize. Ignoring colour extraction.'
@@ -124,6 +161,27 @@ async def extract_colour(
     ))
 
 
+def normalise_image_url(image_url: str) -> str:
+    '''
+    Helper function which normalises an image URL into a stable key for the
+    thumbnail colour cache. Duplicate slashes are collapsed (Ex: wiki
+    thumbnails parsed as 'https://oldschool.runescape.wiki//images/...'),
+    and the version prefix of official item sprites (which changes with
+    every Grand Exchange update) is removed.
+
+    :param image_url: (String) -
+        Represents the URL/to/image.
+
+    :return: (String) -
+        The normalised image URL.
+    '''
+
+    scheme, netloc, path, query, _ = urlsplit(image_url)
+    path = re.sub(r'/{2,}', '/', path)
+    path = re.sub(r'/\d+_(obj_big|obj_sprite)\.gif$', r'/\1.gif', path)
+    return urlunsplit((scheme.lower(), netloc.lower(), path, query, ''))
+
+
 def normalise_price(price: int) -> Optional[str]:
     '''
     Helper function which reformats (normalises) price integers into
@@ -149,6 +207,23 @@ def normalise_price(price: int) -> Optional[str]:
     return normalised_price
 
 
+def normalise_username(username: str) -> str:
+    '''
+    Helper function which normalises a player's username into a stable key
+    for the Hiscores cache. Usernames are case-insensitive, and spaces,
+    underscores and hyphens are interchangeable (Ex: 'Lynx_Titan' and
+    'lynx titan' are the same player.)
+
+    :param username: (String) -
+        Represents a player's username.
+
+    :return: (String) -
+        The normalised username.
+    '''
+
+    return re.sub(r'[\s_-]+', ' ', username).strip().lower()
+
+
 def slugify(search_query: str) -> str:
     '''
     Helper function which replaces spaces (' ' characters) with underscores
@@ -0,0 +1,201 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the compact, parsed form of a player's Hiscores.
+
+The Hiscores API returns one `rank,level,experience` (or, for activities,
+`rank,score`) row per entry of `HISCORES_ORDER`. Each row is parsed once,
+into three integer arrays indexed by the entry's position, so renderers
+read typed values without re-splitting strings, and a cached player costs
+three small arrays instead of a dictionary of strings. The name to
+position mapping is shared between every record with the same order.
+
+Classes:
+    - `HiscoreRecord`:
+            A class which holds the ranks, levels and experience of a
+            single player.
+
+Functions:
+    - `hiscore_positions()`:
+            Returns the position of every entry of a Hiscores order.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+MISSING = -1 # Represents a rank, level or experience which isn't ranked.
+
+
+@lru_cache(maxsize=8)
+def hiscore_positions(hiscores_order: Tuple[str, ...]) -> Dict[str, int]:
+    '''
+    Returns the position of every entry of a Hiscores order. The mapping
+    is shared, so it must not be modified.
+
+    :param hiscores_order: (Tuple[String, ...]) -
+        Represents the hiscores in order (from 'config.py').
+
+    :return: (Dictionary[String, Integer]) -
+        A dictionary mapping each entry to its position.
+    '''
+
+    return {name: position for position, name in enumerate(hiscores_order)}
+
+
+class HiscoreRecord:
+    '''
+    A class which holds the ranks, levels (or scores) and experience of a
+    single player, as `HISCORES_ORDER` indexed integer arrays.
+    '''
+
+    __slots__ = ('positions', 'rank', 'level', 'experience')
+
+    def __init__(
+        self,
+        positions: Dict[str, int],
+        rank: array,
+        level: array,
+        experience: array
+    ) -> None:
+        '''
+        Initialises a new instance of the HiscoreRecord class.
+
+        :param self: -
+            Represents this object.
+        :param positions: (Dictionary[String, Integer]) -
+            Represents the position of every entry (see
+            `hiscore_positions`.)
+        :param rank: (array) -
+            Represents the rank of every entry.
+        :param level: (array) -
+            Represents the level (or score) of every entry.
+        :param experience: (array) -
+            Represents the experience of every entry (MISSING for
+            activities.)
+
+        :return: (None)
+        '''
+
+        self.positions = positions
+        self.rank = rank
+        self.level = level
+        self.experience = experience
+
+
+    @classmethod
+    def parse(
+        cls,
+        rows: List[str],
+        hiscores_order: list
+    ) -> Optional['HiscoreRecord']:
+        '''
+        Parses the rows returned by the Hiscores API. Rows beyond the
+        order (entries newer than 'config.py') are ignored.
+
+        :param cls: -
+            Represents this class.
+        :param rows: (List[String]) -
+            Represents the `rank,level,experience` rows, in order.
+        :param hiscores_order: (List) -
+            Represents a list of the hiscores in order (from 'config.py').
+
+        :return: (Optional[HiscoreRecord]) -
+            The parsed record, or None if there are too few rows (or a row
+            isn't numeric.)
+        '''
+
+        size = len(hiscores_order)
+        if len(rows) < size:
+            return None
+
+        rank = array('q', [MISSING]) * size
+        level = array('q', [MISSING]) * size
+        experience = array('q', [MISSING]) * size
+        try:
+            for position in range(size):
+                values = rows[position].split(',')
+                rank[position] = int(values[0])
+                level[position] = int(values[1])
+                if len(values) > 2:
+                    experience[position] = int(values[2])
+        except (IndexError, ValueError):
+            return None
+
+        return cls(
+            hiscore_positions(tuple(hiscores_order)),
+            rank,
+            level,
+            experience
+        )
+
+
+    def __contains__(self, name: str) -> bool:
+        '''
+        Whether the record has an entry.
+
+        :param self: -
+            Represents this object.
+        :param name: (String) -
+            Represents the entry (Ex: 'Attack', 'Zulrah'.)
+
+        :return: (Boolean) -
+            True if the entry is part of the record's order.
+        '''
+
+        return name in self.positions
+
+
+    def rank_of(self, name: str) -> int:
+        '''
+        Returns the rank of an entry.
+
+        :param self: -
+            Represents this object.
+        :param name: (String) -
+            Represents the entry (Ex: 'Attack', 'Zulrah'.)
+
+        :return: (Integer) -
+            The rank, or MISSING if the player isn't ranked.
+        '''
+
+        return self.rank[self.positions[name]]
+
+
+    def level_of(self, name: str) -> int:
+        '''
+        Returns the level of a skill, or the score of an activity.
+
+        :param self: -
+            Represents this object.
+        :param name: (String) -
+            Represents the entry (Ex: 'Attack', 'Zulrah'.)
+
+        :return: (Integer) -
+            The level (or score), or MISSING if the player isn't ranked.
+        '''
+
+        return self.level[self.positions[name]]
+
+
+    def experience_of(self, name: str) -> int:
+        '''
+        Returns the experience of a skill.
+
+        :param self: -
+            Represents this object.
+        :param name: (String) -
+            Represents the skill (Ex: 'Attack'.)
+
+        :return: (Integer) -
+            The experience, or MISSING if the player isn't ranked (or the
+            entry is an activity.)
+        '''
+
+        return self.experience[self.positions[name]]
@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the logic for the local item mapping, which lets the
+`price` and `alchemy` commands look up tradeable items without fetching
+or parsing their wiki pages.
+
+The mapping (name, id, value, alch values, buy limit, icon and examine
+text of every tradeable item) is loaded in bulk from the real-time prices
+API `mapping` dataset, or from a local JSON copy of it, into the `items`
+table (see `utils.database`.)
+
+Functions:
+    - `load_item_mapping()`:
+            Loads the item mapping dataset from the API or a local file.
+    - `item_infobox()`:
+            Converts an `items` row into the same shape as a parsed infobox.
+
+Each function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import json
+from typing import List, Optional
+from urllib.parse import quote
+
+from utils.helpers import slugify
+from utils.parsers import parse_price_data
+from utils.search import normalise_name
+
+
+async def load_item_mapping(
+    self,
+    url: str,
+    image_url: str,
+    headers: dict,
+    path: Optional[str] = None
+) -> List[tuple]:
+    '''
+    Loads the item mapping dataset and converts it into `items` rows.
+
+    :param self: -
+        Represents this object.
+    :param url: (String) -
+        Represents the real-time prices API `mapping` URL.
+    :param image_url: (String) -
+        Represents the base URL of wiki images (used for item icons.)
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+    :param path: (Optional[String]) -
+        Represents a local copy of the dataset, used instead of the API
+        when given (Ex: for offline testing.)
+
+    :return: (List[Tuple]) -
+        A list of (item_id, name, normalised_name, value, highalch,
+        lowalch, buy_limit, members, icon_url, examine) rows.
+    '''
+
+    if path:
+        with open(path, encoding='utf-8') as json_file:
+            mapping = json.load(json_file)
+    else:
+        mapping = await parse_price_data(self, url, headers)
+
+    return [
+        (
+            item['id'],
+            item['name'],
+            normalise_name(item['name']),
+            item.get('value'),
+            item.get('highalch'),
+            item.get('lowalch'),
+            item.get('limit'),
+            item.get('members'),
+            f'{image_url}{quote(slugify(item["icon"]))}'
+            if item.get('icon') else None,
+            item.get('examine')
+        )
+        for item in mapping
+    ]
+
+
+def item_infobox(item: dict) -> dict:
+    '''
+    Converts an `items` row into the same shape (and formatting) as an
+    infobox from `parse_infobox`, so cogs can treat both alike. Properties
+    which aren't known are left out.
+
+    :param item: (Dictionary) -
+        Represents an `items` row.
+
+    :return: (Dictionary) -
+        A dictionary containing the item's infobox properties.
+    '''
+
+    def coins(value: int) -> str:
+        return f'{value:,} coin' if value == 1 else f'{value:,} coins'
+
+    infobox = {
+        'Item ID': str(item['item_id']),
+        'Buy limit': f'{item["buy_limit"]:,}'
+        if item['buy_limit'] is not None else 'Unknown'
+    }
+    if item['examine']:
+        infobox['Examine'] = item['examine']
+    for prop, column in (
+        ('Value', 'value'),
+        ('High alch', 'highalch'),
+        ('Low alch', 'lowalch')
+    ):
+        if item[column] is not None:
+            infobox[prop] = coins(item[column])
+    return infobox
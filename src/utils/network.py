@@ -0,0 +1,384 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the shared asynchronous HTTP client used by Runebot
+to talk to upstream services (the Old School RuneScape wiki, the official
+Hiscores/Exchange APIs and the real-time prices API.)
+
+Each upstream host gets its own pooled, keep-alive `aiohttp` session so
+that concurrent commands overlap their network waits instead of blocking
+the event loop one request at a time.
+
+Identical requests which are already in flight are coalesced
+(single-flight): concurrent callers asking for the same URL (with the same
+headers) share one upstream request and its response. A shared request is
+only cancelled once every caller waiting on it has been cancelled.
+
+Background jobs which make many requests to one host (Ex: the XP tracker)
+pace themselves with a `RateLimiter`, so they never crowd out commands.
+
+Classes:
+    - `HttpClient`:
+            A class which owns one pooled session per upstream host.
+    - `HttpResponse`:
+            A class which represents a fully-read HTTP response.
+    - `RateLimiter`:
+            A class which spaces out requests to a steady rate.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+class HttpResponse:
+    '''
+    A class which represents a fully-read HTTP response.
+    '''
+
+    __slots__ = ('url', 'status', 'headers', 'body')
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: dict,
+        body: bytes
+    ) -> None:
+        '''
+        Initialises a new instance of the HttpResponse class.
+
+        :param self: -
+            Represents this object.
+        :param url: (String) -
+            Represents the final URL of the response.
+        :param status: (Integer) -
+            Represents the HTTP status code.
+        :param headers: (Dictionary) -
+            Represents the (case-insensitive) response headers.
+        :param body: (Bytes) -
+            Represents the raw response body.
+
+        :return: (None)
+        '''
+
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+    @property
+    def ok(self) -> bool:
+        '''
+        Whether the response has a successful (2xx/3xx) status code.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Boolean) -
+            True if the status code is below 400.
+        '''
+
+        return self.status < 400
+
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        '''
+        Decodes the response body as text.
+
+        :param self: -
+            Represents this object.
+        :param encoding: (Optional[String]) -
+            Represents the character encoding. (Default: 'utf-8')
+
+        :return: (String) -
+            The decoded response body.
+        '''
+
+        return self.body.decode(encoding, errors='replace')
+
+
+    def json(self):
+        '''
+        Decodes the response body as JSON.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Any) -
+            The decoded JSON document.
+        '''
+
+        return json.loads(self.body)
+
+
+class HttpClient:
+    '''
+    A class which owns one pooled, keep-alive session per upstream host.
+    '''
+
+    def __init__(
+        self,
+        headers: Optional[dict] = None,
+        timeout: float = 60.0,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30.0
+    ) -> None:
+        '''
+        Initialises a new instance of the HttpClient class.
+
+        :param self: -
+            Represents this object.
+        :param headers: (Optional[Dictionary]) -
+            Represents default request headers sent with every request.
+        :param timeout: (Optional[Float]) -
+            Represents the total timeout (in seconds) of a request.
+        :param limit_per_host: (Optional[Integer]) -
+            Represents the maximum number of open connections per host.
+        :param keepalive_timeout: (Optional[Float]) -
+            Represents how long (in seconds) idle connections are kept alive.
+
+        :return: (None)
+        '''
+
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.in_flight: Dict[Tuple, asyncio.Task] = {}
+        self.waiters: Dict[Tuple, int] = {}
+        self.requests = 0
+        self.collapsed = 0
+
+
+    def session(self, url: str) -> aiohttp.ClientSession:
+        '''
+        Returns the pooled session for the host of a given URL, creating it
+        on first use.
+
+        :param self: -
+            Represents this object.
+        :param url: (String) -
+            Represents the URL to be requested.
+
+        :return: (aiohttp.ClientSession) -
+            The session responsible for the URL's host.
+        '''
+
+        host = urlsplit(url).netloc
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300
+                ),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self.sessions[host] = session
+        return session
+
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[dict] = None
+    ) -> HttpResponse:
+        '''
+        Performs a GET request, sharing the response with any identical
+        request (same URL and headers) which is already in flight.
+        Unsuccessful status codes are returned, not raised. If every caller
+        waiting on the request is cancelled, so is the request.
+
+        :param self: -
+            Represents this object.
+        :param url: (String) -
+            Represents the URL to be requested.
+        :param headers: (Optional[Dictionary]) -
+            Represents a series of request headers.
+
+        :return: (HttpResponse) -
+            The fully-read response.
+        '''
+
+        key = (url, tuple(sorted((headers or {}).items())))
+        self.requests += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.request(url, headers))
+            task.add_done_callback(lambda task: self.forget(key, task))
+            self.in_flight[key] = task
+        else:
+            self.collapsed += 1
+
+        # Shielded, so a cancelled caller doesn't cancel the shared request
+        # while another caller is still waiting on it.
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                del self.waiters[key]
+                if not task.done():
+                    task.cancel()
+
+
+    def forget(self, key: Tuple, task: asyncio.Task) -> None:
+        '''
+        Removes a finished request from the in-flight table.
+
+        :param self: -
+            Represents this object.
+        :param key: (Tuple) -
+            Represents the (URL, headers) key of the request.
+        :param task: (asyncio.Task) -
+            Represents the finished request.
+
+        :return: (None)
+        '''
+
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Marks the exception as retrieved.
+
+
+    def stats(self) -> Dict[str, int]:
+        '''
+        Returns the request counters.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Dictionary) -
+            The number of requests, how many were collapsed into an
+            in-flight request and how many are currently in flight.
+        '''
+
+        return {
+            'requests': self.requests,
+            'collapsed': self.collapsed,
+            'in_flight': len(self.in_flight)
+        }
+
+
+    async def request(
+        self,
+        url: str,
+        headers: Optional[dict] = None
+    ) -> HttpResponse:
+        '''
+        Performs a GET request and reads the full response body.
+        Unsuccessful status codes are returned, not raised.
+
+        :param self: -
+            Represents this object.
+        :param url: (String) -
+            Represents the URL to be requested.
+        :param headers: (Optional[Dictionary]) -
+            Represents a series of request headers.
+
+        :return: (HttpResponse) -
+            The fully-read response.
+        '''
+
+        async with self.session(url).get(url, headers=headers) as response:
+            body = await response.read()
+            return HttpResponse(
+                str(response.url),
+                response.status,
+                response.headers.copy(),
+                body
+            )
+
+
+    async def close(self) -> None:
+        '''
+        Cancels any in-flight requests and closes every pooled session.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        for task in list(self.in_flight.values()):
+            task.cancel()
+        for session in self.sessions.values():
+            if not session.closed:
+                await session.close()
+        self.sessions.clear()
+
+
+class RateLimiter:
+    '''
+    A class which spaces out requests to a steady rate (a token bucket),
+    allowing short bursts of up to `burst` requests.
+    '''
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        '''
+        Initialises a new instance of the RateLimiter class. Must be called
+        with the event loop running.
+
+        :param self: -
+            Represents this object.
+        :param rate: (Float) -
+            Represents the number of requests allowed per second.
+        :param burst: (Optional[Integer]) -
+            Represents the number of requests allowed at once after an idle
+            period.
+
+        :return: (None)
+        '''
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.waited = 0.0
+
+
+    async def acquire(self) -> None:
+        '''
+        Waits until another request is allowed. Callers are let through
+        one at a time, in the order they arrived.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst,
+                self.tokens + max(now - self.updated_at, 0) * self.rate
+            )
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            delay = (1 - self.tokens) / self.rate
+            self.waited += delay
+            await asyncio.sleep(delay)
+            self.tokens = 0.0
+            self.updated_at = now + delay
@@ -14,6 +14,9 @@ Key Functions:
     - `parse_page()`:
             A parser function which parses all page content from an Old School
             RuneScape wikipedia page.
+    - `fetch_page()`:
+            A function which fetches a single wikipedia page through the
+            page cache.
     - `parse_description()`:
             A parser function which parses a description from an Old School
             RuneScape wikipedia page.
@@ -28,11 +31,12 @@ Key Functions:
     - `parse_title()`:
             A parser function which parses a title from an Old School RuneScape
             wikipedia page.
-    - `generate_graph()`:
-            A function which generates a graph with given API price data.
     - `parse_hiscores()`:
-            A parser function which parses values from the official OSRS
-            Hiscores API.
+            A parser function which concurrently parses values for one or
+            more players from the official OSRS Hiscores API.
+    - `probe_hiscores()`:
+            A parser function which concurrently looks a player up on
+            several Hiscores, returning the first one that has them.
 
 Each class and function has an associated docstring, providing details
 about its functionality, parameters, and return values.
@@ -41,19 +45,15 @@ For more information about each function and its usage, refer to the
 docstrings.
 '''
 
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
-import uuid
-from typing import List, Optional
-import requests
+import asyncio
+from typing import Dict, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
-import matplotlib
-import matplotlib.pyplot as plotter
-matplotlib.use('Agg')
 
 import exceptions
-from utils.helpers import normalise_price, slugify
+from utils.database import get_cached_page, save_cached_page, touch_cached_page
+from utils.helpers import normalise_username, slugify
+from utils.hiscores import HiscoreRecord
 
 
 def parse_all(page_content: BeautifulSoup) -> dict:
@@ -90,11 +90,18 @@ def parse_all(page_content: BeautifulSoup) -> dict:
              'thumbnail_url': page_thumbnail}
 
 
-def parse_page(url: str, search_query: str, headers: dict) -> BeautifulSoup:
+async def parse_page(
+    self,
+    url: str,
+    search_query: str,
+    headers: dict
+) -> BeautifulSoup:
     '''
     Parser function whichs parses all page content from an
     Old School RuneScape wikipedia page.
 
+    :param self: -
+        Represents this object.
     :param url: (String) -
         Represents the base URL.
     :param search_query: (String) -
@@ -114,19 +121,92 @@ def parse_page(url: str, search_query: str, headers: dict) -> BeautifulSoup:
     queries = [new_query, slugify(search_query).rstrip('\u200a')]
 
     for query in queries:
-        try:
-            request = Request(f'{url}{query}', headers=headers)
-            page = urlopen(request)
-            page_content = BeautifulSoup(page, 'html.parser')
+        page_content = await fetch_page(self, url, query, headers)
+        if page_content is not None:
             break
-        except HTTPError:
-            continue
     else:
-        raise exceptions.Nonexistence()
+        raise exceptions.Nonexistence(
+            suggestions=self.bot.article_index.suggest('wikipedia', search_query)
+        )
 
     return page_content
 
 
+async def fetch_page(
+    self,
+    url: str,
+    query: str,
+    headers: dict
+) -> Optional[BeautifulSoup]:
+    '''
+    Fetches a single Old School RuneScape wikipedia page through the page
+    cache. Fresh pages are served from memory (or the `page_cache` table),
+    stale pages are revalidated with a conditional request and new pages
+    are cached under their canonical title. If a stale page can't be
+    revalidated (Ex: a timeout or a 5xx), the stale copy is served.
+
+    `Special:` pages (Ex: 'Special:Random/main') can resolve to a
+    different article on every request, so they're never cached, aliased
+    or shared with another in-flight request.
+
+    :param self: -
+        Represents this object.
+    :param url: (String) -
+        Represents the base URL.
+    :param query: (String) -
+        Represents the slugified query. (Ex: 'fire_cape'.)
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+
+    :return: (Optional[BeautifulSoup]) -
+        The parsed page, or None if the page doesn't exist.
+    '''
+
+    if query.lower().startswith('special:'):
+        page = await self.bot.http_client.request(f'{url}{query}', headers)
+        if not page.ok:
+            return None
+        return BeautifulSoup(page.body, 'html.parser')
+
+    page_cache = self.bot.page_cache
+    entry = page_cache.lookup(query)
+    if entry is None:
+        entry = await get_cached_page(self, query)
+        if entry is not None:
+            entry = page_cache.load(entry)
+
+    if entry is not None and entry.fresh(page_cache.ttl):
+        return BeautifulSoup(page_cache.hit(entry), 'html.parser')
+
+    if entry is not None:
+        try:
+            page = await self.bot.http_client.fetch(
+                f'{url}{entry.key}', {**headers, **entry.validators()}
+            )
+        except Exception:
+            page = None
+        if page is not None and page.status == 304:
+            body = page_cache.revalidate(entry, page.headers)
+            await touch_cached_page(self, entry)
+            return BeautifulSoup(body, 'html.parser')
+        # Only a 404 means the page is gone, anything else (Ex: a wiki
+        # outage) keeps serving the stale copy.
+        if page is None or (not page.ok and page.status != 404):
+            return BeautifulSoup(page_cache.hit(entry), 'html.parser')
+    else:
+        page = await self.bot.http_client.fetch(f'{url}{query}', headers)
+
+    if not page.ok:
+        return None
+
+    page_content = BeautifulSoup(page.body, 'html.parser')
+    canonical = page_content.find('link', rel='canonical')
+    key = canonical.attrs['href'].rsplit('/w/', 1)[-1] if canonical else query
+    entry = page_cache.store(query, key, page.body, page.headers)
+    await save_cached_page(self, entry)
+    return page_content
+
+
 def parse_description(page_content) -> List[str]:
     '''
     Parser function which parses a description from an
@@ -307,10 +387,12 @@ def parse_levelup_table(page_div: BeautifulSoup) -> str:
     return ''.join(levelup_details)
 
 
-def parse_price_data(url: str, headers: dict) -> dict:
+async def parse_price_data(self, url: str, headers: dict) -> dict:
     '''
     Parser function which parses price data using the official API.
 
+    :param self: -
+        Represents this object.
     :param url: (String) -
         Represents the full URL with an item_id.
     :param headers: (Dictionary) -
@@ -321,8 +403,8 @@ def parse_price_data(url: str, headers: dict) -> dict:
     '''
 
     try:
-        request = requests.get(url, headers=headers, timeout=60)
-        data = request.json()
+        response = await self.bot.http_client.fetch(url, headers)
+        data = response.json()
     except BaseException as exc:
         raise exceptions.NoPriceData from exc
     return data
@@ -427,58 +509,29 @@ def parse_title(page_content: BeautifulSoup) -> str:
     return page_title
 
 
-async def generate_graph(data: dict) -> str:
-    '''
-    Generates a graph with given api price data.
-
-    :param data: (Dictionary) -
-        Represents a dictionary of price data.
-
-    :return: (String) -
-        The filename of the generated graph.
-    '''
-
-    prices = data['daily'].values()
-    average = data['average'].values()
-    filename = str(uuid.uuid4())
-
-    plotter.rcParams['ytick.color'] = 'lightslategrey'
-    plotter.rcParams['figure.figsize'] = 8, 3
-    plotter.box(on=None)
-    plotter.yticks(
-        [
-            max(prices),
-            sum(prices) / len(prices),
-            min(prices)
-        ],
-        [
-            normalise_price(max(prices)),
-            normalise_price(sum(prices) / len(prices)),
-            normalise_price(min(prices))
-        ]
-    )
-    plotter.xticks([])
-    plotter.axhline(y=sum(prices) / len(prices), dashes=[1, 3])
-    plotter.plot(average, color='#5865F2')
-    plotter.plot(prices, color='lightslategrey')
-    plotter.title('Past 180 Days', loc='right', color='lightslategrey')
-    plotter.savefig(f'assets/{filename}', transparent=True)
-    plotter.close()
-    return f'{filename}.png'
-
-
-def parse_hiscores(
+async def parse_hiscores(
+    self,
     url: str,
     headers: dict,
     hiscores_order: list,
     usernames: list
-) -> dict:
+) -> Dict[str, Optional[HiscoreRecord]]:
     '''
     Parser function which parses values from the official
-    OSRS Hiscores API
-
+    OSRS Hiscores API for one or more players.
+
+    Every player is fetched concurrently through the shared HTTP client
+    (which caps the connections open to the Hiscores at once), so looking
+    up N players takes about as long as the slowest single lookup. Players
+    looked up within the last few minutes are served from the Hiscores
+    cache instead. Cached records are shared, so they must not be
+    modified. A lookup which fails (Ex: a timeout) only affects its own
+    player, who is mapped to None.
+
+    :param self: -
+        Represents this object.
     :param url: (String) -
-        Represents the full URL with an item_id.
+        Represents the Hiscores API URL (without a player.)
     :param headers: (Dictionary) -
         Represents a series of request headers.
     :param hiscores_order: (List) -
@@ -486,18 +539,93 @@ def parse_hiscores(
     :param usernames: (List) -
         Represents a list of usernames.
 
-    :return: (Dictionary) -
-        A dictionary containing the parsed hiscores data
-        for the given usernames.
+    :return: (Dictionary[String, Optional[HiscoreRecord]]) -
+        A dictionary mapping each username to its parsed hiscores record,
+        or to None if the player isn't on these Hiscores (or couldn't be
+        looked up.)
     '''
 
-    responses = []
-    for user in usernames:
-        request = requests.get(f'{url}{user}', headers=headers, timeout=60)
-        player_info = request.text[:-1]
-        responses.append(player_info.split('\n'))
-    for resp in responses:
-        hiscore_data =(
-            {hiscores_order[i]: resp[i] for i in range(len(hiscores_order))}
+    hiscore_cache = self.bot.hiscore_cache
+    hiscore_data = {
+        username: hiscore_cache.lookup(url, normalise_username(username))
+        for username in usernames
+    }
+
+    missing = [
+        username for username, data in hiscore_data.items() if data is None
+    ]
+    pages = await asyncio.gather(*[
+        self.bot.http_client.fetch(f'{url}{username}', headers)
+        for username in missing
+    ], return_exceptions=True)
+    for username, page in zip(missing, pages):
+        if isinstance(page, BaseException) or not page.ok:
+            continue
+        record = HiscoreRecord.parse(page.text().strip().split('\n'), hiscores_order)
+        if record is None:
+            continue
+        hiscore_data[username] = record
+        hiscore_cache.store(
+            url,
+            normalise_username(username),
+            hiscore_data[username]
         )
     return hiscore_data
+
+
+async def probe_hiscores(
+    self,
+    account_types: List[Tuple[str, str]],
+    headers: dict,
+    hiscores_order: list,
+    username: str
+) -> Tuple[Optional[str], Optional[HiscoreRecord]]:
+    '''
+    Parser function which looks a player up on several Hiscores at once
+    and returns the first one (in the given order) that has them.
+
+    Every lookup is started concurrently. They are then checked in order,
+    and the probe returns as soon as one has the player, so probing costs
+    about as long as the slowest lookup it has to wait for, rather than the
+    sum of them. The remaining lookups are then cancelled, along with their
+    requests (unless another command is sharing a request, which then
+    carries on for it.)
+
+    :param self: -
+        Represents this object.
+    :param account_types: (List[Tuple[String, String]]) -
+        Represents the (account_type, Hiscores API URL) of each Hiscores,
+        most preferred first.
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+    :param hiscores_order: (List) -
+        Represents a list of the hiscores in order (from 'config.py').
+    :param username: (String) -
+        Represents a player's username.
+
+    :return: (Tuple[Optional[String], Optional[HiscoreRecord]]) -
+        The account type and parsed Hiscores record of the first Hiscores
+        with the player, or (None, None) if none of them have the player.
+    '''
+
+    lookups = [
+        asyncio.ensure_future(
+            parse_hiscores(self, url, headers, hiscores_order, [username])
+        )
+        for _, url in account_types
+    ]
+    try:
+        for (account_type, _), lookup in zip(account_types, lookups):
+            hiscore_data = (await lookup)[username]
+            if hiscore_data is not None:
+                return account_type, hiscore_data
+        return None, None
+    finally:
+        # Lookups which already failed are retrieved, so their errors
+        # aren't reported as unhandled.
+        for lookup in lookups:
+            if not lookup.done():
+                lookup.cancel()
+            elif not lookup.cancelled():
+                lookup.exception()
+
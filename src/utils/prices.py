@@ -0,0 +1,226 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the in-memory Grand Exchange price snapshot used by
+the `price` and `alchemy` commands.
+
+Rather than requesting the real-time prices API once per item per
+command, the whole `latest` dataset is pulled in a single request on a
+schedule (see `Bot.refresh_prices`) and held as four dense, item id
+indexed integer arrays.
+
+Classes:
+    - `PriceSnapshot`:
+            A class which holds the latest price of every item in memory.
+
+Functions:
+    - `get_latest_price()`:
+            Returns the latest price of an item, from the snapshot if it has
+            loaded and from the real-time prices API otherwise.
+    - `get_exchange_price()`:
+            Returns the Grand Exchange guide price of an item read from the
+            item mapping.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import time
+from array import array
+from typing import Dict, Optional
+
+import exceptions
+from utils.parsers import parse_price_data
+
+MISSING = -1 # Represents a price (or time) which isn't known.
+
+
+class PriceSnapshot:
+    '''
+    A class which holds the latest price of every item in memory, as
+    item id indexed `high`, `highTime`, `low` and `lowTime` arrays.
+    '''
+
+    __slots__ = ('high', 'high_time', 'low', 'low_time', 'updated_at')
+
+    def __init__(self) -> None:
+        '''
+        Initialises a new (empty) instance of the PriceSnapshot class.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.high = array('q')
+        self.high_time = array('q')
+        self.low = array('q')
+        self.low_time = array('q')
+        self.updated_at = 0.0
+
+
+    @property
+    def ready(self) -> bool:
+        '''
+        Whether the snapshot has been loaded.
+
+        :param self: -
+            Represents this object.
+
+        :return: (Boolean) -
+            True once the first dataset has been loaded.
+        '''
+
+        return self.updated_at > 0
+
+
+    def load(self, data: dict) -> int:
+        '''
+        Replaces the snapshot with a `latest` dataset from the real-time
+        prices API. The arrays are built first and swapped in together.
+
+        :param self: -
+            Represents this object.
+        :param data: (Dictionary) -
+            Represents the `latest` response. (Ex: {'data': {'4151':
+            {'high': ..., 'highTime': ..., 'low': ..., 'lowTime': ...}}})
+
+        :return: (Integer) -
+            The number of items loaded.
+        '''
+
+        items = {int(item_id): item for item_id, item in data['data'].items()}
+        size = max(items, default=-1) + 1
+
+        columns = [array('q', [MISSING]) * size for _ in range(4)]
+        fields = ('high', 'highTime', 'low', 'lowTime')
+        for item_id, item in items.items():
+            for column, field in zip(columns, fields):
+                value = item.get(field)
+                if value is not None:
+                    column[item_id] = value
+
+        self.high, self.high_time, self.low, self.low_time = columns
+        self.updated_at = time.time()
+        return len(items)
+
+
+    def get(self, item_id: int) -> Optional[Dict[str, Optional[int]]]:
+        '''
+        Returns the latest price of an item, in the same shape as an item
+        from the real-time prices API.
+
+        :param self: -
+            Represents this object.
+        :param item_id: (Integer) -
+            Represents the item id.
+
+        :return: (Optional[Dictionary]) -
+            The `high`, `highTime`, `low` and `lowTime` of the item (None
+            where unknown), or None if the item has never been traded.
+        '''
+
+        if not 0 <= item_id < len(self.high):
+            return None
+
+        values = (
+            self.high[item_id],
+            self.high_time[item_id],
+            self.low[item_id],
+            self.low_time[item_id]
+        )
+        if all(value == MISSING for value in values):
+            return None
+
+        return dict(zip(
+            ('high', 'highTime', 'low', 'lowTime'),
+            (None if value == MISSING else value for value in values)
+        ))
+
+
+async def get_latest_price(
+    self,
+    item_id: str,
+    url: str,
+    headers: dict
+) -> Dict[str, Optional[int]]:
+    '''
+    Returns the latest price of an item from the price snapshot. Until the
+    snapshot has loaded, the item is requested from the real-time prices
+    API instead.
+
+    :param self: -
+        Represents this object.
+    :param item_id: (String) -
+        Represents the item id. (Ex: '4151'.)
+    :param url: (String) -
+        Represents the per-item real-time prices API URL.
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+
+    :return: (Dictionary) -
+        The `high`, `highTime`, `low` and `lowTime` of the item.
+
+    :raises KeyError: -
+        If there is no price data for the item.
+    '''
+
+    price_snapshot = self.bot.price_snapshot
+    if not price_snapshot.ready:
+        price_data = await parse_price_data(self, f'{url}{item_id}', headers)
+        return price_data['data'][item_id]
+
+    try:
+        price = price_snapshot.get(int(item_id))
+    except ValueError:
+        price = None
+    if price is None:
+        raise KeyError(item_id)
+    return price
+
+
+async def get_exchange_price(
+    self,
+    item_id: str,
+    url: str,
+    headers: dict,
+    api_data: Optional[dict] = None
+) -> Optional[str]:
+    '''
+    Returns the Exchange value shown for an item read from the item
+    mapping, which (unlike the wiki infobox) doesn't include the Grand
+    Exchange guide price. The guide price is taken from the official
+    Exchange API instead, so `price` and `alchemy` show the same value as
+    the infobox would.
+
+    :param self: -
+        Represents this object.
+    :param item_id: (String) -
+        Represents the item id. (Ex: '4151'.)
+    :param url: (String) -
+        Represents the official Exchange API URL (without an item id.)
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+    :param api_data: (Optional[Dictionary]) -
+        Represents the item's official Exchange API data, if it has
+        already been requested.
+
+    :return: (Optional[String]) -
+        The guide price (Ex: '1,234 coins' or '1.2m coins'), or None if it
+        isn't known.
+    '''
+
+    try:
+        if api_data is None:
+            api_data = await parse_price_data(self, f'{url}{item_id}', headers)
+        guide_price = api_data['item']['current']['price']
+    except (exceptions.NoPriceData, KeyError, TypeError):
+        return None
+    # Cheaper items are given as integers, the rest abbreviated (Ex: '1.2m'.)
+    if isinstance(guide_price, int):
+        return f'{guide_price:,} coins'
+    return f'{str(guide_price).strip()} coins'
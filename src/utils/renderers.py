@@ -0,0 +1,241 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the graph renderer used by the `price` command.
+
+Rendering runs in a dedicated process pool, so drawing a graph never
+stalls the event loop (or competes with it for the GIL.) Each worker
+builds its Figure/Axes once when it starts and re-uses them for every
+graph, and graphs are returned as PNG bytes rather than written to disk.
+
+Workers are started with the `spawn` method, since forking a process
+which is already running an event loop and database threads isn't safe.
+
+Rendered graphs are cached per item and runeday (see `GraphCache`), so a
+graph is fetched and rendered at most once per Grand Exchange update.
+
+Classes:
+    - `GraphRenderer`:
+            A class which owns the rendering process pool.
+
+Functions:
+    - `get_price_graph()`:
+            Returns the price graph of an item, from the graph cache if
+            possible.
+    - `initialise_worker()`:
+            Builds the Figure/Axes re-used by a rendering worker.
+    - `render_price_graph()`:
+            Renders a price graph (in a worker) and returns it as PNG bytes.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from utils.database import get_cached_graph, save_cached_graph
+from utils.helpers import normalise_price
+from utils.parsers import parse_price_data
+
+# The Figure/Axes of the current worker process (see `initialise_worker`.)
+FIGURE = None
+AXES = None
+
+
+def initialise_worker() -> None:
+    '''
+    Builds the Figure/Axes re-used by a rendering worker. Runs once in
+    each worker process as it starts.
+
+    :return: (None)
+    '''
+
+    global FIGURE, AXES
+    FIGURE = Figure(figsize=(8, 3))
+    FigureCanvasAgg(FIGURE)
+    AXES = FIGURE.add_subplot()
+
+
+def render_price_graph(prices: List[int], average: List[int]) -> bytes:
+    '''
+    Renders the past 180 days of daily and average prices of an item as a
+    graph. Runs in a worker process.
+
+    :param prices: (List[Integer]) -
+        Represents the daily prices.
+    :param average: (List[Integer]) -
+        Represents the average prices.
+
+    :return: (Bytes) -
+        The graph, as a transparent PNG.
+    '''
+
+    if FIGURE is None:
+        initialise_worker()
+
+    mean = sum(prices) / len(prices)
+
+    AXES.clear()
+    AXES.set_frame_on(False)
+    AXES.tick_params(axis='y', colors='lightslategrey')
+    AXES.set_yticks(
+        [max(prices), mean, min(prices)],
+        [
+            normalise_price(max(prices)),
+            normalise_price(mean),
+            normalise_price(min(prices))
+        ]
+    )
+    AXES.set_xticks([])
+    AXES.axhline(y=mean, dashes=[1, 3])
+    AXES.plot(average, color='#5865F2')
+    AXES.plot(prices, color='lightslategrey')
+    AXES.set_title('Past 180 Days', loc='right', color='lightslategrey')
+
+    graph = io.BytesIO()
+    FIGURE.savefig(graph, format='png', transparent=True)
+    return graph.getvalue()
+
+
+class GraphRenderer:
+    '''
+    A class which owns the process pool that renders price graphs.
+    '''
+
+    def __init__(self, workers: int = 1) -> None:
+        '''
+        Initialises a new instance of the GraphRenderer class. Worker
+        processes are started on first use (or by `warm`.)
+
+        :param self: -
+            Represents this object.
+        :param workers: (Optional[Integer]) -
+            Represents the number of rendering processes.
+
+        :return: (None)
+        '''
+
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=initialise_worker
+        )
+
+
+    async def warm(self) -> None:
+        '''
+        Starts every worker process ahead of the first graph, so no command
+        has to wait for one to start.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, os.getpid)
+            for _ in range(self.workers)
+        ])
+
+
+    async def render(self, data: dict) -> bytes:
+        '''
+        Renders a price graph from official graph API data.
+
+        :param self: -
+            Represents this object.
+        :param data: (Dictionary) -
+            Represents the graph API data (with `daily` and `average`
+            prices.)
+
+        :return: (Bytes) -
+            The graph, as a transparent PNG.
+        '''
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            render_price_graph,
+            list(data['daily'].values()),
+            list(data['average'].values())
+        )
+
+
+    def close(self) -> None:
+        '''
+        Shuts down the worker processes.
+
+        :param self: -
+            Represents this object.
+
+        :return: (None)
+        '''
+
+        self.executor.shutdown(wait=False)
+
+
+async def get_price_graph(
+    self,
+    item_id: int,
+    url: str,
+    headers: dict,
+    record: bool = True
+) -> bytes:
+    '''
+    Returns the price graph of an item for the current runeday. Graphs are
+    read from memory or the `graph_cache` table when possible, and are
+    only fetched and rendered when neither has them.
+
+    :param self: -
+        Represents this object.
+    :param item_id: (Integer) -
+        Represents the item id.
+    :param url: (String) -
+        Represents the base URL of the official graph API.
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+    :param record: (Optional[Boolean]) -
+        Whether to count this as a request for the item (used to pick
+        which graphs are pre-rendered.) (Default: True)
+
+    :return: (Bytes) -
+        The graph, as a transparent PNG.
+    '''
+
+    graph_cache = self.bot.graph_cache
+    if record:
+        graph_cache.requests[item_id] += 1
+
+    # Until the first runeday is known, graphs can't be keyed, so they're
+    # rendered without being cached.
+    runeday = graph_cache.runeday
+    if runeday is not None:
+        graph = graph_cache.lookup(item_id)
+        if graph is not None:
+            return graph
+
+        graph = await get_cached_graph(self, item_id, runeday)
+        if graph is not None:
+            graph_cache.store(item_id, graph, rendered=False)
+            return graph
+
+    graph_data = await parse_price_data(self, f'{url}{item_id}.json', headers)
+    graph = await self.bot.graph_renderer.render(graph_data)
+
+    if runeday is not None and runeday == graph_cache.runeday:
+        graph_cache.store(item_id, graph)
+        await save_cached_graph(self, item_id, runeday, graph)
+    return graph
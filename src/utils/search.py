@@ -0,0 +1,497 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the in-memory article index which powers every
+autocomplete handler in Runebot.
+
+The index is loaded once from the `all_articles` table, partitioned by
+`article_category` (with blacklists already applied) and keeps the
+lowercase keys precomputed, so autocomplete never touches the database.
+
+Each partition also keeps a trigram posting list (trigram -> sorted title
+positions), so substring queries of three or more characters are answered
+by intersecting postings instead of scanning every title.
+
+Misspelled queries are resolved locally with a SymSpell-style deletion
+dictionary, so typos (Ex: 'abysal whip') map to a canonical title before
+any network call, and power "did you mean" suggestions.
+
+Classes:
+    - `ArticleIndex`:
+            A class which holds every article partition in memory.
+    - `ArticlePartition`:
+            A class which represents a single searchable partition.
+    - `FuzzyMatcher`:
+            A class which matches misspelled queries to known titles.
+
+Functions:
+    - `edit_distance()`:
+            Calculates the (optimal string alignment) edit distance between
+            two strings.
+    - `deletes()`:
+            Returns every variant of a string with up to N characters deleted.
+    - `normalise_name()`:
+            Normalises an article or item name for exact lookups.
+    - `trigrams()`:
+            Returns the set of trigrams of a string.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    '''
+    Calculates the optimal string alignment (Damerau-Levenshtein without
+    substring edits) distance between two strings, giving up early once
+    the distance exceeds `max_distance`.
+
+    :param source: (String) -
+        Represents the first string.
+    :param target: (String) -
+        Represents the second string.
+    :param max_distance: (Integer) -
+        Represents the largest distance of interest.
+
+    :return: (Integer) -
+        The edit distance, or `max_distance + 1` if it is exceeded.
+    '''
+
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_row = None
+    row = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        previous_row, row = row, [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = source[i - 1] != target[j - 1]
+            row[j] = min(
+                previous_row[j] + 1,
+                row[j - 1] + 1,
+                previous_row[j - 1] + cost
+            )
+            if (i > 1 and j > 1 and source[i - 1] == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                row[j] = min(row[j], transposition_row[j - 2] + 1)
+        if min(row) > max_distance:
+            return max_distance + 1
+        transposition_row = previous_row
+    return row[-1]
+
+
+def deletes(text: str, max_distance: int) -> Set[str]:
+    '''
+    Returns every variant of a string with up to `max_distance` characters
+    deleted (including the string itself.)
+
+    :param text: (String) -
+        Represents the string.
+    :param max_distance: (Integer) -
+        Represents the maximum number of deletions.
+
+    :return: (Set[String]) -
+        A set of deletion variants.
+    '''
+
+    variants = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:i] + variant[i + 1:]
+            for variant in frontier for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def normalise_name(name: str) -> str:
+    '''
+    Normalises an article or item name for exact lookups, so that
+    'Abyssal_whip', 'abyssal whip' and 'Abyssal whip\u200a' all match.
+
+    :param name: (String) -
+        Represents the name to normalise.
+
+    :return: (String) -
+        The name without autocomplete markers, with underscores as spaces,
+        collapsed whitespace and case folded.
+    '''
+
+    name = name.replace('\u200a', '').replace('_', ' ')
+    return ' '.join(name.split()).casefold()
+
+
+def trigrams(text: str) -> Set[str]:
+    '''
+    Returns the set of trigrams (three character substrings) of a string.
+
+    :param text: (String) -
+        Represents the string to split.
+
+    :return: (Set[String]) -
+        A set of trigrams (empty if the string is shorter than three
+        characters.)
+    '''
+
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ArticlePartition:
+    '''
+    A class which represents a single searchable partition of article
+    titles.
+    '''
+
+    __slots__ = ('titles', 'keys', 'canonical', 'postings')
+
+    def __init__(self, titles: List[str]) -> None:
+        '''
+        Initialises a new instance of the ArticlePartition class.
+
+        :param self: -
+            Represents this object.
+        :param titles: (List[String]) -
+            Represents the article titles in this partition.
+
+        :return: (None)
+        '''
+
+        self.titles = titles
+        self.keys = [title.lower() for title in titles]
+        self.canonical = dict(zip(self.keys, titles))
+        self.postings: Dict[str, array] = {}
+        for position, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                self.postings.setdefault(trigram, array('I')).append(position)
+
+
+    def search(self, search_query: str, limit: int = 25) -> List[str]:
+        '''
+        Returns the titles which contain the search query
+        (case-insensitive), in table order. Queries shorter than three
+        characters fall back to a linear scan.
+
+        :param self: -
+            Represents this object.
+        :param search_query: (String) -
+            Represents a search query.
+        :param limit: (Optional[Integer]) -
+            Represents the maximum number of results. (Default: 25)
+
+        :return: (List[String]) -
+            A list of matching article titles.
+        '''
+
+        search_query = search_query.lower()
+        results = []
+
+        if len(search_query) < 3:
+            for title, key in zip(self.titles, self.keys):
+                if search_query in key:
+                    results.append(title)
+                    if len(results) == limit:
+                        break
+            return results
+
+        postings = []
+        for trigram in trigrams(search_query):
+            posting = self.postings.get(trigram)
+            if posting is None:
+                return results
+            postings.append(posting)
+
+        # Intersects from the shortest posting list upwards, then verifies
+        # each candidate (trigrams can match out of order.)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return results
+
+        for position in sorted(candidates):
+            if search_query in self.keys[position]:
+                results.append(self.titles[position])
+                if len(results) == limit:
+                    break
+        return results
+
+
+class FuzzyMatcher:
+    '''
+    A class which matches misspelled queries to known titles using a
+    SymSpell-style deletion dictionary (only the first `prefix_length`
+    characters are indexed, which keeps the dictionary compact.)
+    '''
+
+    def __init__(
+        self,
+        titles: List[str],
+        max_distance: int = 2,
+        prefix_length: int = 7
+    ) -> None:
+        '''
+        Initialises a new instance of the FuzzyMatcher class.
+
+        :param self: -
+            Represents this object.
+        :param titles: (List[String]) -
+            Represents the titles to match against.
+        :param max_distance: (Optional[Integer]) -
+            Represents the maximum edit distance. (Default: 2)
+        :param prefix_length: (Optional[Integer]) -
+            Represents the number of leading characters indexed. (Default: 7)
+
+        :return: (None)
+        '''
+
+        self.titles = titles
+        self.keys = [title.lower() for title in titles]
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.dictionary: Dict[str, array] = {}
+        for position, key in enumerate(self.keys):
+            for variant in deletes(key[:prefix_length], max_distance):
+                self.dictionary.setdefault(variant, array('I')).append(position)
+
+
+    def lookup(
+        self,
+        search_query: str,
+        max_distance: Optional[int] = None,
+        limit: int = 5
+    ) -> List[Tuple[int, str]]:
+        '''
+        Returns the closest titles to a (possibly misspelled) query.
+
+        :param self: -
+            Represents this object.
+        :param search_query: (String) -
+            Represents a search query.
+        :param max_distance: (Optional[Integer]) -
+            Represents the maximum edit distance. (Default: `max_distance`)
+        :param limit: (Optional[Integer]) -
+            Represents the maximum number of results. (Default: 5)
+
+        :return: (List[Tuple[Integer, String]]) -
+            A list of (distance, title) tuples, closest first.
+        '''
+
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        search_query = search_query.lower()
+
+        candidates = set()
+        for variant in deletes(search_query[:self.prefix_length], max_distance):
+            candidates.update(self.dictionary.get(variant, ()))
+
+        matches = []
+        for position in candidates:
+            distance = edit_distance(
+                search_query, self.keys[position], max_distance
+            )
+            if distance <= max_distance:
+                matches.append((
+                    distance,
+                    abs(len(self.keys[position]) - len(search_query)),
+                    position
+                ))
+
+        matches.sort()
+        return [
+            (distance, self.titles[position])
+            for distance, _, position in matches[:limit]
+        ]
+
+
+class ArticleIndex:
+    '''
+    A class which holds every article partition in memory.
+    '''
+
+    def __init__(self, partitions: Dict[str, dict]) -> None:
+        '''
+        Initialises a new (empty) instance of the ArticleIndex class.
+
+        :param self: -
+            Represents this object.
+        :param partitions: (Dictionary) -
+            Represents the partition specifications (from 'config.py'),
+            mapping a partition name to its `categories` (or
+            `exclude_categories`), `blacklist` (substrings) and `exclude`
+            (exact titles.)
+
+        :return: (None)
+        '''
+
+        self.specifications = partitions
+        self.partitions: Dict[str, ArticlePartition] = {
+            name: ArticlePartition([]) for name in partitions
+        }
+        self.fuzzy = FuzzyMatcher([])
+
+
+    def reload(self, articles: Iterable[Tuple[str, str]]) -> None:
+        '''
+        Rebuilds every partition from the given articles. Should be called
+        whenever the `all_articles` table changes.
+
+        :param self: -
+            Represents this object.
+        :param articles: (Iterable[Tuple[String, String]]) -
+            Represents (article_title, article_category) rows.
+
+        :return: (None)
+        '''
+
+        articles = [(str(title), category) for title, category in articles]
+        by_category: Dict[str, List[str]] = {}
+        for title, category in articles:
+            by_category.setdefault(category, []).append(title)
+
+        partitions = {}
+        for name, spec in self.specifications.items():
+            if 'categories' in spec:
+                titles = [
+                    title for category in spec['categories']
+                    for title in by_category.get(category, [])
+                ]
+            else:
+                excluded = spec.get('exclude_categories', [])
+                titles = [
+                    title for title, category in articles
+                    if category not in excluded
+                ]
+
+            blacklist = spec.get('blacklist', [])
+            exclude = spec.get('exclude', [])
+            titles = [
+                title for title in titles
+                if title not in exclude
+                and not any(word in title for word in blacklist)
+            ]
+            partitions[name] = ArticlePartition(list(dict.fromkeys(titles)))
+
+        # One deletion dictionary serves every partition; matches are
+        # filtered by partition membership when resolving.
+        self.fuzzy = FuzzyMatcher(list(dict.fromkeys(
+            title for partition in partitions.values()
+            for title in partition.titles
+        )))
+        self.partitions = partitions
+
+
+    def search(
+        self,
+        partition: str,
+        search_query: str,
+        limit: int = 25
+    ) -> List[str]:
+        '''
+        Returns the titles of a partition which contain the search query.
+
+        :param self: -
+            Represents this object.
+        :param partition: (String) -
+            Represents the partition name (Ex: 'items', 'monsters'.)
+        :param search_query: (String) -
+            Represents a search query.
+        :param limit: (Optional[Integer]) -
+            Represents the maximum number of results. (Default: 25)
+
+        :return: (List[String]) -
+            A list of matching article titles.
+        '''
+
+        return self.partitions[partition].search(search_query, limit)
+
+
+    def titles(self, partition: str) -> List[str]:
+        '''
+        Returns every title of a partition (Ex: for "I'm feeling lucky".)
+
+        :param self: -
+            Represents this object.
+        :param partition: (String) -
+            Represents the partition name (Ex: 'items', 'monsters'.)
+
+        :return: (List[String]) -
+            A list of article titles.
+        '''
+
+        return self.partitions[partition].titles
+
+
+    def suggest(
+        self,
+        partition: str,
+        search_query: str,
+        max_distance: Optional[int] = None,
+        limit: int = 5
+    ) -> List[str]:
+        '''
+        Returns the closest titles of a partition to a (possibly
+        misspelled) query, for "did you mean" suggestions.
+
+        :param self: -
+            Represents this object.
+        :param partition: (String) -
+            Represents the partition name (Ex: 'items', 'monsters'.)
+        :param search_query: (String) -
+            Represents a search query.
+        :param max_distance: (Optional[Integer]) -
+            Represents the maximum edit distance.
+        :param limit: (Optional[Integer]) -
+            Represents the maximum number of suggestions. (Default: 5)
+
+        :return: (List[String]) -
+            A list of suggested titles, closest first.
+        '''
+
+        canonical = self.partitions[partition].canonical
+        search_query = search_query.rstrip('\u200a').replace('_', ' ').strip()
+        return [
+            title for _, title in self.fuzzy.lookup(
+                search_query, max_distance, limit=len(self.fuzzy.titles)
+            ) if title.lower() in canonical
+        ][:limit]
+
+
+    def resolve(self, partition: str, search_query: str) -> str:
+        '''
+        Resolves a (possibly misspelled) query to the closest canonical
+        title of a partition before any network call. Autocomplete
+        selections, exact matches and queries with no close match are
+        returned unchanged.
+
+        :param self: -
+            Represents this object.
+        :param partition: (String) -
+            Represents the partition name (Ex: 'items', 'monsters'.)
+        :param search_query: (String) -
+            Represents a search query.
+
+        :return: (String) -
+            The canonical title, or the original search query.
+        '''
+
+        if search_query.endswith('\u200a'):
+            return search_query
+
+        key = search_query.replace('_', ' ').strip().lower()
+        if key in self.partitions[partition].canonical:
+            return search_query
+
+        # Short queries are often abbreviations or redirects (Ex: 'dds'),
+        # so they're only allowed smaller corrections.
+        max_distance = 0 if len(key) < 5 else 1 if len(key) < 9 else 2
+        suggestions = self.suggest(partition, key, max_distance, limit=1)
+        return suggestions[0] if suggestions else search_query
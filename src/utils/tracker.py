@@ -0,0 +1,402 @@
+#! /usr/bin/env python3
+
+'''
+This module contains the XP tracker, which snapshots the skill experience
+of every player saved with `/setrsn` on a schedule (see
+`Bot.snapshot_hiscores`), so `/gains` can answer from local data without
+a live Hiscores lookup.
+
+Snapshots are stored compactly in the `hiscore_snapshots` table. Every
+`keyframe_interval`-th snapshot of a player is a keyframe holding their
+experience in each skill; the rest only hold the change in each skill
+since the previous snapshot. Values are zigzag varint encoded, so an
+unchanged skill costs one byte, and a snapshot identical to the previous
+one isn't stored at all. Keyframes bound how many rows have to be read to
+rebuild a player's experience at any point.
+
+Players are snapshotted by a few workers at once, with their Hiscores
+requests paced by a `RateLimiter`, so a sweep never crowds out commands.
+
+Classes:
+    - `HiscoreTracker`:
+            A class which holds the last snapshot of every tracked player.
+
+Functions:
+    - `encode_experience()`:
+            Encodes a snapshot (as a keyframe or a delta.)
+    - `decode_experience()`:
+            Decodes a snapshot.
+    - `track_player()`:
+            Snapshots players taken off a queue (a sweep worker.)
+    - `track_hiscores()`:
+            Snapshots the experience of every saved player.
+    - `get_gains()`:
+            Returns a player's experience at the start and end of a period.
+
+Each class and function has an associated docstring, providing details
+about its functionality, parameters, and return values.
+
+For more information about each function and its usage, refer to the
+docstrings.
+'''
+
+import asyncio
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from utils.database import get_hiscore_snapshots, save_hiscore_snapshot
+from utils.helpers import normalise_username
+from utils.network import RateLimiter
+from utils.parsers import parse_hiscores
+
+
+def encode_experience(
+    experience: Sequence[int],
+    previous: Optional[Sequence[int]] = None
+) -> bytes:
+    '''
+    Encodes a snapshot as zigzag varints. If a previous snapshot is given,
+    the change in each skill is encoded (a delta), otherwise the
+    experience itself (a keyframe.)
+
+    :param experience: (Sequence[Integer]) -
+        Represents the experience in each skill.
+    :param previous: (Optional[Sequence[Integer]]) -
+        Represents the experience in each skill at the previous snapshot.
+
+    :return: (Bytes) -
+        The encoded snapshot.
+    '''
+
+    encoded = bytearray()
+    for position, value in enumerate(experience):
+        if previous is not None:
+            value -= previous[position]
+        value = (value << 1) ^ (value >> 63)
+        while value > 0x7F:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+    return bytes(encoded)
+
+
+def decode_experience(
+    encoded: bytes,
+    previous: Optional[Sequence[int]] = None
+) -> array:
+    '''
+    Decodes a snapshot encoded by `encode_experience`.
+
+    :param encoded: (Bytes) -
+        Represents the encoded snapshot.
+    :param previous: (Optional[Sequence[Integer]]) -
+        Represents the experience in each skill at the previous snapshot
+        (required for deltas.)
+
+    :return: (array) -
+        The experience in each skill.
+    '''
+
+    experience = array('q')
+    value = shift = 0
+    for byte in encoded:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        value = (value >> 1) ^ -(value & 1)
+        if previous is not None:
+            value += previous[len(experience)]
+        experience.append(value)
+        value = shift = 0
+    return experience
+
+
+class HiscoreTracker:
+    '''
+    A class which holds the last snapshot of every tracked player, keyed
+    by (normalised username, account type), and decides how each new
+    snapshot is stored.
+    '''
+
+    def __init__(self, keyframe_interval: int = 28) -> None:
+        '''
+        Initialises a new instance of the HiscoreTracker class.
+
+        :param self: -
+            Represents this object.
+        :param keyframe_interval: (Optional[Integer]) -
+            Represents the number of snapshots per keyframe.
+
+        :return: (None)
+        '''
+
+        self.keyframe_interval = keyframe_interval
+        self.last: Dict[Tuple[str, str], Tuple[array, int]] = {}
+
+
+    def encode(
+        self,
+        player: Tuple[str, str],
+        experience: array
+    ) -> Optional[Tuple[bool, bytes]]:
+        '''
+        Encodes a player's new snapshot against their last one, and makes
+        it their last snapshot. A player's first snapshot (since the bot
+        started) is always a keyframe.
+
+        :param self: -
+            Represents this object.
+        :param player: (Tuple[String, String]) -
+            Represents the (normalised username, account type) of the player.
+        :param experience: (array) -
+            Represents the experience in each skill.
+
+        :return: (Optional[Tuple[Boolean, Bytes]]) -
+            Whether the snapshot is a keyframe and the encoded snapshot, or
+            None if nothing has changed since the last snapshot.
+        '''
+
+        last = self.last.get(player)
+        if last is not None and last[0] == experience:
+            return None
+
+        if last is None or last[1] + 1 >= self.keyframe_interval:
+            self.last[player] = (experience, 0)
+            return True, encode_experience(experience)
+
+        self.last[player] = (experience, last[1] + 1)
+        return False, encode_experience(experience, last[0])
+
+
+    def discard(self, player: Tuple[str, str]) -> None:
+        '''
+        Forgets a player's last snapshot (Ex: if it couldn't be saved), so
+        their next snapshot is a keyframe.
+
+        :param self: -
+            Represents this object.
+        :param player: (Tuple[String, String]) -
+            Represents the (normalised username, account type) of the player.
+
+        :return: (None)
+        '''
+
+        self.last.pop(player, None)
+
+
+    def retain(self, players: Iterable[Tuple[str, str]]) -> None:
+        '''
+        Forgets the last snapshot of every player who is no longer tracked.
+
+        :param self: -
+            Represents this object.
+        :param players: (Iterable[Tuple[String, String]]) -
+            Represents the players still tracked.
+
+        :return: (None)
+        '''
+
+        for player in self.last.keys() - set(players):
+            del self.last[player]
+
+
+async def track_player(
+    self,
+    players: asyncio.Queue,
+    limiter: RateLimiter,
+    api_urls: dict,
+    headers: dict,
+    hiscores_order: list,
+    skill_order: list,
+    stats: dict
+) -> None:
+    '''
+    Takes players off the queue until it is empty, snapshotting each one.
+
+    :param self: -
+        Represents this object.
+    :param players: (asyncio.Queue) -
+        Represents the queue of (username, account_type) players.
+    :param limiter: (RateLimiter) -
+        Represents the rate limit of Hiscores requests.
+    :param api_urls: (Dictionary) -
+        Represents the Hiscores API URL of each account type.
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+    :param hiscores_order: (List) -
+        Represents a list of the hiscores in order (from 'config.py').
+    :param skill_order: (List) -
+        Represents a list of the skills tracked (from 'config.py').
+    :param stats: (Dictionary) -
+        Represents the sweep counters.
+
+    :return: (None)
+    '''
+
+    while True:
+        try:
+            username, account_type = players.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        player = (normalise_username(username), account_type)
+        try:
+            await limiter.acquire()
+            record = (await parse_hiscores(
+                self,
+                api_urls.get(account_type),
+                headers,
+                hiscores_order,
+                [username]
+            ))[username]
+            if record is None:
+                stats['missing'] += 1
+                continue
+
+            encoded = self.bot.hiscore_tracker.encode(
+                player,
+                array('q', [record.experience_of(skill) for skill in skill_order])
+            )
+            if encoded is None:
+                stats['unchanged'] += 1
+                continue
+
+            keyframe, experience = encoded
+            await save_hiscore_snapshot(
+                self,
+                *player,
+                int(time.time()),
+                keyframe,
+                experience
+            )
+            stats['saved'] += 1
+        except Exception as exc:
+            # The next snapshot is a keyframe, so a lost delta can't
+            # corrupt the ones after it.
+            self.bot.hiscore_tracker.discard(player)
+            stats['failed'] += 1
+            logger.debug(f'{username}: {type(exc).__name__}: {exc}')
+
+
+async def track_hiscores(
+    self,
+    players: List[Tuple[str, str]],
+    api_urls: dict,
+    headers: dict,
+    hiscores_order: list,
+    skill_order: list,
+    concurrency: int = 2,
+    rate: float = 2.0
+) -> Dict[str, int]:
+    '''
+    Snapshots the experience of every saved player. Players saved by
+    several users (or with different capitalisation) are only looked up
+    once, and unknown account types are tracked on the Normal Hiscores.
+
+    :param self: -
+        Represents this object.
+    :param players: (List[Tuple[String, String]]) -
+        Represents the (username, account_type) of every saved player.
+    :param api_urls: (Dictionary) -
+        Represents the Hiscores API URL of each account type.
+    :param headers: (Dictionary) -
+        Represents a series of request headers.
+    :param hiscores_order: (List) -
+        Represents a list of the hiscores in order (from 'config.py').
+    :param skill_order: (List) -
+        Represents a list of the skills tracked (from 'config.py').
+    :param concurrency: (Optional[Integer]) -
+        Represents the number of players looked up at once.
+    :param rate: (Optional[Float]) -
+        Represents the number of Hiscores requests allowed per second.
+
+    :return: (Dictionary) -
+        The number of players, and how many snapshots were saved,
+        unchanged, missing from the Hiscores or failed.
+    '''
+
+    queue = asyncio.Queue()
+    tracked = set()
+    for username, account_type in players:
+        if account_type not in api_urls:
+            account_type = 'Normal'
+        player = (normalise_username(username), account_type)
+        if player not in tracked:
+            tracked.add(player)
+            queue.put_nowait((username, account_type))
+    self.bot.hiscore_tracker.retain(tracked)
+
+    limiter = RateLimiter(rate)
+    stats = {
+        'players': len(tracked),
+        'saved': 0,
+        'unchanged': 0,
+        'missing': 0,
+        'failed': 0
+    }
+    await asyncio.gather(*[
+        track_player(
+            self,
+            queue,
+            limiter,
+            api_urls,
+            headers,
+            hiscores_order,
+            skill_order,
+            stats
+        )
+        for _ in range(concurrency)
+    ])
+    return stats
+
+
+async def get_gains(
+    self,
+    username: str,
+    account_type: str,
+    since: int
+) -> Optional[Tuple[int, array, int, array]]:
+    '''
+    Returns a player's experience at the start of a period (their last
+    snapshot at or before `since`, or their first snapshot if tracking
+    started later) and their latest experience, from local data only.
+
+    :param self: -
+        Represents this object.
+    :param username: (String) -
+        Represents a player's username.
+    :param account_type: (String) -
+        Represents an account type (Ex: Ironman, 1 Defence etc.)
+    :param since: (Integer) -
+        Represents the start (Unix seconds) of the period.
+
+    :return: (Optional[Tuple[Integer, array, Integer, array]]) -
+        The time and experience of the first and last snapshots of the
+        period, or None if the player has no snapshots.
+    '''
+
+    snapshots = await get_hiscore_snapshots(
+        self,
+        normalise_username(username),
+        account_type,
+        since
+    )
+
+    start = experience = None
+    for taken_at, keyframe, encoded in snapshots:
+        if not keyframe and experience is None:
+            continue
+        experience = decode_experience(
+            encoded,
+            None if keyframe else experience
+        )
+        if start is None or taken_at <= since:
+            start = (taken_at, experience)
+
+    if start is None:
+        return None
+    return start[0], start[1], taken_at, experience